@@ -1,4 +1,9 @@
+from functools import partial
+
+import numpy as np
+
 from .Matrice import villes as default_villes, M as default_M
+from . import memoire_partagee
 
 def floyd_warshall(matrix=None, labels=None):
     """
@@ -34,4 +39,235 @@ def floyd_warshall(matrix=None, labels=None):
                 if dist[i][k] + dist[k][j] < dist[i][j]:
                     dist[i][j] = dist[i][k] + dist[k][j]
     
-    return dist
\ No newline at end of file
+    return dist
+
+# ----------------------------------------------------------------------
+# Version par blocs (tuiles), multi-cœurs
+# ----------------------------------------------------------------------
+TAILLE_BLOC_DEFAUT = 256     # 256 x 256 float64 = 512 Ko : tient dans le cache L2
+SEUIL_PARALLELE = 1024       # En dessous, le coût des processus dépasse le gain
+
+# Précisions disponibles : float32 et int32 divisent la mémoire par deux
+PRECISIONS = {
+    'float64': np.float64,
+    'float32': np.float32,
+    'int64': np.int64,
+    'int32': np.int32,
+}
+
+
+def est_entier(dtype):
+    return np.issubdtype(np.dtype(dtype), np.integer)
+
+
+def infini(dtype):
+    """
+    Valeur représentant l'absence de chemin.
+
+    En entier, on prend max // 2 : la somme de deux « infinis » ne déborde
+    pas. Toute valeur >= infini // 2 est considérée comme infinie (les poids
+    négatifs peuvent légèrement faire baisser la sentinelle).
+    """
+    if est_entier(dtype):
+        return np.iinfo(dtype).max // 2
+    return np.inf
+
+
+def masque_infini(D):
+    """Masque booléen des cases sans chemin, quelle que soit la précision."""
+    if est_entier(D.dtype):
+        return D >= infini(D.dtype) // 2
+    return np.isinf(D)
+
+
+def remplir_matrice_initiale(D, matrix, n):
+    """
+    Remplit D (n x n, de précision quelconque) avec les mêmes règles que
+    floyd_warshall, ligne par ligne : aucune copie n x n en float64.
+
+    Raises:
+        ValueError: Si la précision est entière et qu'un poids ne l'est pas
+    """
+    sentinelle = infini(D.dtype)
+    for i in range(n):
+        ligne = np.asarray(matrix[i], dtype=np.float64)
+        absent = (ligne == 0) | np.isnan(ligne) | np.isinf(ligne)
+        if est_entier(D.dtype):
+            presents = ligne[~absent]
+            if np.any(presents != np.round(presents)):
+                raise ValueError(f"Poids non entier sur la ligne {i} : précision {D.dtype} impossible")
+            D[i] = sentinelle
+            D[i, ~absent] = presents.astype(D.dtype)
+        else:
+            ligne[absent] = np.inf
+            D[i] = ligne
+        D[i, i] = 0
+
+
+def matrice_initiale(matrix, n, dtype=np.float64):
+    """Matrice des distances initiale (numpy), avec les mêmes règles que floyd_warshall."""
+    D = np.empty((n, n), dtype=dtype)
+    remplir_matrice_initiale(D, matrix, n)
+    return D
+
+
+def _relaxer_bloc(D, i0, i1, j0, j1, k0, k1):
+    """Relâche la tuile D[i0:i1, j0:j1] en passant par les sommets k0..k1-1."""
+    bloc = D[i0:i1, j0:j1]
+    for k in range(k0, k1):
+        np.minimum(bloc, D[i0:i1, k, None] + D[k, j0:j1], out=bloc)
+
+
+def _tache_blocs(source, n, dtype, taches):
+    """
+    Relâche des tuiles de la matrice partagée, dans un worker du pool :
+    segment mémoire ('shm', nom) ou fichier ('fichier', chemin), attaché le
+    temps de la tâche.
+    """
+    genre, nom = source
+    if genre == 'fichier':
+        D = np.load(nom, mmap_mode='r+')
+        for tache in taches:
+            _relaxer_bloc(D, *tache)
+        D.flush()
+        return
+    with memoire_partagee.attaches({'D': (nom, (n, n), np.dtype(dtype).str)}) as vues:
+        for tache in taches:
+            _relaxer_bloc(vues['D'], *tache)
+
+
+def _phases(D, n, taille_bloc, executer):
+    """
+    Les trois phases de chaque étape k du Floyd-Warshall par blocs :
+      1. la tuile diagonale (k, k), qui ne dépend que d'elle-même ;
+      2. les tuiles de la ligne k et de la colonne k, qui ne dépendent que de (k, k) ;
+      3. toutes les autres tuiles, qui ne dépendent que de la ligne et de la colonne k.
+    Les tuiles d'une même phase sont indépendantes : executer peut les répartir.
+    """
+    bornes = [(d, min(d + taille_bloc, n)) for d in range(0, n, taille_bloc)]
+    for kb, (k0, k1) in enumerate(bornes):
+        _relaxer_bloc(D, k0, k1, k0, k1, k0, k1)
+
+        ligne_colonne = []
+        for b, (d0, d1) in enumerate(bornes):
+            if b != kb:
+                ligne_colonne.append((k0, k1, d0, d1, k0, k1))
+                ligne_colonne.append((d0, d1, k0, k1, k0, k1))
+        executer(ligne_colonne)
+
+        reste = [
+            (i0, i1, j0, j1, k0, k1)
+            for ib, (i0, i1) in enumerate(bornes) if ib != kb
+            for jb, (j0, j1) in enumerate(bornes) if jb != kb
+        ]
+        executer(reste)
+
+
+def floyd_warshall_blocs(matrix=None, labels=None, taille_bloc=TAILLE_BLOC_DEFAUT, workers=None,
+                         dtype=np.float64, fichier=None):
+    """
+    Floyd-Warshall par tuiles, réparti sur plusieurs processus.
+
+    La matrice est découpée en tuiles qui tiennent en cache ; à chaque étape,
+    les tuiles indépendantes sont traitées en parallèle par des processus
+    qui travaillent directement sur une matrice partagée (segment mémoire,
+    ou fichier projeté en mémoire si fichier est fourni).
+
+    Args:
+        matrix, labels: Graphe (valeurs de Matrice.py par défaut)
+        taille_bloc (int): Côté des tuiles
+        workers (int, optional): Parallélisme visé, en tâches par phase sur le
+            pool commun (memoire_partagee.calcul_parallele ; tous les cœurs
+            par défaut). Les petits graphes (< SEUIL_PARALLELE sommets)
+            restent dans le processus courant.
+        dtype: Précision du calcul (voir PRECISIONS) ; en entier, les chemins
+            absents valent infini(dtype) et se repèrent avec masque_infini.
+        fichier (str, optional): Chemin d'un fichier .npy où écrire la matrice
+            (projeté en mémoire : une matrice plus grande que la RAM tient sur disque).
+
+    Returns:
+        numpy.ndarray: Matrice des distances minimales (n x n) ; np.memmap si fichier.
+    """
+    if matrix is None:
+        matrix = default_M
+    if labels is None:
+        labels = default_villes
+
+    n = len(labels)
+    dtype = np.dtype(dtype)
+    workers = memoire_partagee.nb_workers(workers)
+    parallele = n >= SEUIL_PARALLELE and workers > 1
+
+    shm = None
+    if fichier:
+        D = np.lib.format.open_memmap(fichier, mode='w+', dtype=dtype, shape=(n, n))
+        source = ('fichier', fichier)
+    elif parallele:
+        shm, D = memoire_partagee.creer_tableau((n, n), dtype)
+        source = ('shm', shm.name)
+    else:
+        D = np.empty((n, n), dtype=dtype)
+
+    try:
+        remplir_matrice_initiale(D, matrix, n)
+
+        if not parallele:
+            def executer(taches):
+                for tache in taches:
+                    _relaxer_bloc(D, *tache)
+
+            _phases(D, n, taille_bloc, executer)
+        else:
+            if fichier:
+                D.flush()
+            tache = partial(_tache_blocs, source, n, dtype.str)
+            with memoire_partagee.calcul_parallele() as pool:
+
+                def executer(taches):
+                    # Tuiles entrelacées en 4 × workers lots ; list() attend la fin
+                    # de la phase avant de passer à la suivante
+                    lots = [taches[i::4 * workers] for i in range(min(len(taches), 4 * workers))]
+                    list(pool.map(tache, lots))
+
+                _phases(D, n, taille_bloc, executer)
+
+        if fichier:
+            D.flush()
+            return D
+        return D.copy() if shm is not None else D
+    finally:
+        if shm is not None:
+            del D
+            memoire_partagee.liberer(shm)
+
+
+# ----------------------------------------------------------------------
+# Lecture des résultats (par pages, sans copie complète)
+# ----------------------------------------------------------------------
+def ouvrir_matrice(fichier):
+    """Ouvre en lecture seule une matrice écrite par floyd_warshall_blocs(fichier=...)."""
+    return np.load(fichier, mmap_mode='r')
+
+
+def lignes_lisibles(D):
+    """Lignes de D en listes Python, avec « ∞ » pour les chemins absents."""
+    absent = masque_infini(D)
+    return [
+        ["∞" if a else x for x, a in zip(ligne, ligne_absent)]
+        for ligne, ligne_absent in zip(D.tolist(), absent.tolist())
+    ]
+
+
+def noeud_central(D, labels, taille_page=1024):
+    """
+    Sommet dont la somme des distances (finies) est minimale, calculée
+    par paquets de lignes pour ne jamais matérialiser la matrice entière.
+    """
+    min_sum, central = float('inf'), None
+    for debut in range(0, len(labels), taille_page):
+        page = np.asarray(D[debut:debut + taille_page])
+        sommes = np.where(masque_infini(page), 0, page).sum(axis=1, dtype=np.float64)
+        for i, s in enumerate(sommes.tolist(), start=debut):
+            if 0 < s < min_sum:
+                min_sum, central = s, labels[i]
+    return central
@@ -0,0 +1,147 @@
+import numpy as np
+
+from .composantes import index_composantes, index_par_graphe as composantes_par_graphe
+from .graphe import resoudre_graphe, liste_successeurs, empreinte_graphe, CacheLRU
+
+# Un index par graphe (clé : empreinte du graphe)
+index_par_graphe = CacheLRU(taille_max=32)
+
+_UN = np.uint64(1)
+
+
+class IndexAccessibilite:
+    """
+    Index d'accessibilité : « A peut-il atteindre B ? » en O(1), sans parcours.
+
+    Le graphe est condensé en DAG de ses composantes fortement connexes (CFC),
+    puis la fermeture transitive du DAG est stockée en ensembles de bits.
+    Tarjan numérote les CFC dans l'ordre topologique inverse : une CFC c
+    n'atteint que des CFC de numéro <= c, sa ligne ne garde donc que c + 1
+    bits (matrice triangulaire, deux fois moins de mémoire qu'un carré).
+    """
+
+    def __init__(self, matrix, labels):
+        self.labels = list(labels)
+        self.position = {ville: i for i, ville in enumerate(self.labels)}
+        n = len(self.labels)
+        cfc = index_composantes(matrix, self.labels)    # CFC déjà en cache le plus souvent
+        forte = cfc.forte
+        self.composante = np.asarray(forte, dtype=np.int64)
+        k = self.nb_composantes = cfc.nb_fortes
+
+        # 1. DAG condensé : arcs entre CFC différentes
+        dag = [set() for _ in range(k)]
+        for u, voisins in enumerate(liste_successeurs(matrix, n)):
+            for v in voisins:
+                if forte[v] != forte[u]:
+                    dag[forte[u]].add(forte[v])
+
+        # 2. Fermeture transitive, ligne c sur c // 64 + 1 mots de 64 bits
+        longueurs = np.arange(k, dtype=np.int64) // 64 + 1
+        self.debut = np.zeros(k + 1, dtype=np.int64)
+        np.cumsum(longueurs, out=self.debut[1:])
+        self.bits = np.zeros(int(self.debut[-1]), dtype=np.uint64)
+        for c in range(k):
+            ligne = self.bits[self.debut[c]:self.debut[c + 1]]
+            ligne[c >> 6] |= _UN << np.uint64(c & 63)
+            # Successeurs déjà fermés (numéros inférieurs), les plus hauts d'abord :
+            # une CFC déjà couverte par un autre successeur n'apporte rien
+            for d in sorted(dag[c], reverse=True):
+                if not (ligne[d >> 6] >> np.uint64(d & 63)) & _UN:
+                    ligne[:longueurs[d]] |= self.bits[self.debut[d]:self.debut[d + 1]]
+
+    def accessible_indices(self, i, j):
+        """True s'il existe un chemin du sommet i au sommet j (i atteint toujours i)."""
+        ci, cj = int(self.composante[i]), int(self.composante[j])
+        if cj > ci:
+            return False
+        mot = int(self.bits[self.debut[ci] + (cj >> 6)])
+        return bool((mot >> (cj & 63)) & 1)
+
+    def accessibles_indices(self, sources, cibles):
+        """Version vectorisée : tableau de booléens, une case par paire (sources[p], cibles[p])."""
+        ci = self.composante[np.asarray(sources, dtype=np.int64)]
+        cj = self.composante[np.asarray(cibles, dtype=np.int64)]
+        possible = cj <= ci
+        if not len(self.bits):
+            return possible
+        mots = self.bits[np.where(possible, self.debut[ci] + (cj >> 6), 0)]
+        return possible & (((mots >> (cj & 63).astype(np.uint64)) & _UN) == _UN)
+
+    def accessibles(self, paires):
+        """
+        Réponses à un lot de questions d'accessibilité.
+
+        Args:
+            paires (list): Paires (depart, arrivee) de noms de villes
+
+        Returns:
+            dict: {'accessibles': list[bool]} ou {'error': ...}
+        """
+        inconnues = sorted({ville for paire in paires for ville in paire if ville not in self.position})
+        if inconnues:
+            return {"error": f"Villes inconnues : {', '.join(inconnues)}"}
+        sources = [self.position[a] for a, _ in paires]
+        cibles = [self.position[b] for _, b in paires]
+        return {"accessibles": self.accessibles_indices(sources, cibles).tolist()}
+
+    def accessibles_depuis(self, ville):
+        """
+        Villes atteignables depuis ville (elle comprise), dans l'ordre des labels.
+
+        Returns:
+            dict: {'villes': list[str]} ou {'error': ...}
+        """
+        if ville not in self.position:
+            return {"error": f"Ville de départ inconnue : {ville}"}
+        c = int(self.composante[self.position[ville]])
+        ligne = self.bits[self.debut[c]:self.debut[c + 1]]
+        atteintes = np.zeros(self.nb_composantes, dtype=bool)
+        atteintes[:c + 1] = np.unpackbits(ligne.astype('<u8', copy=False).view(np.uint8),
+                                          bitorder='little')[:c + 1]
+        masque = atteintes[self.composante]
+        return {"villes": [v for v, ok in zip(self.labels, masque) if ok]}
+
+    def taille_octets(self):
+        return int(self.bits.nbytes + self.debut.nbytes + self.composante.nbytes)
+
+
+def index_accessibilite(matrix=None, labels=None):
+    """Index d'accessibilité du graphe, calculé une seule fois puis mis en cache."""
+    matrix, labels = resoudre_graphe(matrix, labels)
+    cle = empreinte_graphe(matrix, labels)
+    return index_par_graphe.get_ou_calcule(cle, lambda: IndexAccessibilite(matrix, labels))
+
+
+def sans_chemin_en_cache(cle, i, j):
+    """
+    True si un index déjà en cache prouve qu'aucun chemin ne relie i à j :
+    celui d'accessibilité (exact), sinon celui des composantes. Rien n'est
+    calculé, pour que l'appelant (Dijkstra, planificateur) reste en O(1).
+
+    Args:
+        cle (str): Empreinte du graphe (graphe.empreinte_graphe)
+        i, j (int): Positions du départ et de l'arrivée
+    """
+    index = index_par_graphe.get(cle)
+    if index is not None:
+        return not index.accessible_indices(i, j)
+    cfc = composantes_par_graphe.get(cle)
+    return cfc is not None and cfc.inaccessible(i, j)
+
+
+def sans_chemin(matrix, labels, i, j, cle=None):
+    """
+    True si aucun chemin i -> j n'est possible, en O(1) une fois les index en
+    cache : index des composantes (construit au besoin), puis index
+    d'accessibilité s'il est déjà en cache. À consulter avant toute recherche
+    de chemin (Dijkstra, ALT, k plus courts chemins).
+
+    Args:
+        matrix, labels: Graphe (déjà résolu)
+        i, j (int): Positions du départ et de l'arrivée
+        cle (str, optional): Empreinte du graphe, si l'appelant l'a déjà calculée
+    """
+    if cle is None:
+        cle = empreinte_graphe(matrix, labels)
+    return index_composantes(matrix, labels, cle).inaccessible(i, j) or sans_chemin_en_cache(cle, i, j)
@@ -3,3 +3,5 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = "core"
+    # Les réponses du graphe par défaut sont précalculées à la première
+    # utilisation (core/precalcul.py) ou par « manage.py precalculer »
@@ -0,0 +1,65 @@
+from array import array
+
+
+class ArbreChemins:
+    """
+    Arbre des plus courts chemins depuis une source, stocké de façon compacte :
+    distances (array 'd') et prédécesseurs (array 'i', -1 pour aucun).
+
+    Un même arbre sert toutes les cibles : les chemins ne sont matérialisés
+    qu'à la demande, en temps linéaire dans leur longueur.
+    """
+
+    __slots__ = ('source', 'labels', 'index', 'distances', 'predecesseurs')
+
+    def __init__(self, source, labels, distances, predecesseurs):
+        """
+        Args:
+            source (int): Index du sommet de départ
+            labels (list[str]): Noms des sommets
+            distances (iterable[float]): Distance depuis la source (inf si non atteint)
+            predecesseurs (iterable[int]): Prédécesseur de chaque sommet (-1 pour aucun)
+        """
+        self.source = source
+        self.labels = labels
+        self.index = None
+        self.distances = array('d', distances)
+        self.predecesseurs = array('i', predecesseurs)
+
+    def _indice(self, cible):
+        """Index d'une cible donnée par son nom ou son index."""
+        if isinstance(cible, str):
+            if self.index is None:
+                self.index = {ville: i for i, ville in enumerate(self.labels)}
+            return self.index[cible]
+        return cible
+
+    def atteint(self, cible):
+        return self.distances[self._indice(cible)] != float('inf')
+
+    def distance(self, cible):
+        return self.distances[self._indice(cible)]
+
+    def chemin_indices(self, cible):
+        """Index des sommets de la source à la cible ([] si non atteinte)."""
+        v = self._indice(cible)
+        if self.distances[v] == float('inf'):
+            return []
+        chemin = []
+        while v != -1:
+            chemin.append(v)
+            if v == self.source or len(chemin) > len(self.predecesseurs):
+                break
+            v = self.predecesseurs[v]
+        chemin.reverse()
+        return chemin
+
+    def chemin(self, cible):
+        """Noms des sommets de la source à la cible ([] si non atteinte)."""
+        return [self.labels[i] for i in self.chemin_indices(cible)]
+
+    def distances_dict(self):
+        return {ville: self.distances[i] for i, ville in enumerate(self.labels)}
+
+    def taille_octets(self):
+        return self.distances.itemsize * len(self.distances) + self.predecesseurs.itemsize * len(self.predecesseurs)
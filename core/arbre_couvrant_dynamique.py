@@ -0,0 +1,236 @@
+import threading
+from collections import deque
+
+from . import prim_kruskal
+from .graphe import (resoudre_graphe, empreinte_graphe, est_arete, identifiant_version,
+                     lire_evenements, CacheLRU)
+
+# Arbres couvrants maintenus entre deux requêtes, indexés par identifiant de version
+arbres = CacheLRU(taille_max=64)
+
+
+class ArbreCouvrantDynamique:
+    """
+    Arbre (forêt) couvrant minimum maintenu sous insertions, suppressions
+    et changements de poids d'arêtes, sans relancer Prim ou Kruskal.
+
+    Réparations :
+      - arête hors arbre qui apparaît ou baisse : elle ferme un cycle dans
+        l'arbre ; on retire l'arête la plus lourde du cycle si elle l'est plus.
+      - arête de l'arbre supprimée ou qui augmente : l'arbre se coupe en deux ;
+        on cherche l'arête de remplacement la plus légère entre les deux
+        morceaux, en parcourant les voisins du plus petit des deux seulement.
+
+    Le graphe est non orienté, comme pour prim_kruskal.
+    """
+
+    def __init__(self, matrix, labels):
+        """
+        Args:
+            matrix, labels: Graphe de départ, matrice symétrique (l'arbre
+                initial est celui de prim_kruskal.kruskal)
+
+        Raises:
+            ValueError: Matrice non symétrique (graphe orienté)
+        """
+        self.labels = list(labels)
+        self.index = {ville: i for i, ville in enumerate(self.labels)}
+        self.n = len(self.labels)
+        self.verrou = threading.Lock()
+        self.identifiant = None     # Version courante (arbre_id), fixée par arbre_couvrant_dynamique
+
+        # Graphe complet (symétrique) : voisins[u][v] = poids, lu ligne par ligne
+        self.voisins = [dict() for _ in range(self.n)]
+        for i in range(self.n):
+            ligne = matrix[i]
+            for j in range(self.n):
+                w = ligne[j]
+                if j != i and est_arete(w):
+                    self.voisins[i][j] = float(w)
+        if any(self.voisins[j].get(i) != w for i in range(self.n) for j, w in self.voisins[i].items()):
+            raise ValueError("Arbre couvrant dynamique : la matrice doit être symétrique (graphe non orienté).")
+
+        resultat = prim_kruskal.kruskal(matrix=matrix, labels=self.labels)
+
+        # Arêtes de l'arbre : arbre[u][v] = poids
+        self.arbre = [dict() for _ in range(self.n)]
+        self.poids_total = 0
+        for lu, lv in resultat['edges']:
+            u, v = self.index[lu], self.index[lv]
+            self._ajouter_arbre(u, v, self.voisins[u][v])
+
+    # ------------------------------------------------------------------
+    # Manipulations élémentaires
+    # ------------------------------------------------------------------
+    def _ajouter_arbre(self, u, v, w):
+        self.arbre[u][v] = w
+        self.arbre[v][u] = w
+        self.poids_total += w
+
+    def _retirer_arbre(self, u, v):
+        w = self.arbre[u].pop(v)
+        del self.arbre[v][u]
+        self.poids_total -= w
+
+    def _chemin_arbre(self, u, v):
+        """Arêtes (a, b) du chemin u -> v dans l'arbre, ou None si non relié."""
+        parent = {u: -1}
+        file = deque([u])
+        while file and v not in parent:
+            x = file.popleft()
+            for y in self.arbre[x]:
+                if y not in parent:
+                    parent[y] = x
+                    file.append(y)
+        if v not in parent:
+            return None
+        aretes = []
+        x = v
+        while parent[x] != -1:
+            aretes.append((parent[x], x))
+            x = parent[x]
+        return aretes
+
+    def _plus_petit_morceau(self, u, v):
+        """
+        Après la coupure de (u, v), explore les deux morceaux en alternance
+        et renvoie le premier entièrement exploré (donc le plus petit).
+        """
+        vus = ({u}, {v})
+        files = (deque([u]), deque([v]))
+        while True:
+            for cote in (0, 1):
+                if not files[cote]:
+                    return vus[cote]
+                x = files[cote].popleft()
+                for y in self.arbre[x]:
+                    if y not in vus[cote]:
+                        vus[cote].add(y)
+                        files[cote].append(y)
+
+    def _reconnecter(self, u, v):
+        """Ajoute l'arête de remplacement la plus légère entre les morceaux de u et v."""
+        morceau = self._plus_petit_morceau(u, v)
+        meilleur = None
+        for x in morceau:
+            for y, w in self.voisins[x].items():
+                if y not in morceau and (meilleur is None or w < meilleur[0]):
+                    meilleur = (w, x, y)
+        if meilleur is not None:
+            w, x, y = meilleur
+            self._ajouter_arbre(x, y, w)
+
+    def _echanger_cycle(self, u, v, w):
+        """L'arête (u, v) de poids w est candidate : remplace le maximum du cycle."""
+        chemin = self._chemin_arbre(u, v)
+        if chemin is None:
+            self._ajouter_arbre(u, v, w)  # Relie deux morceaux de la forêt
+            return
+        a, b = max(chemin, key=lambda arete: self.arbre[arete[0]][arete[1]])
+        if w < self.arbre[a][b]:
+            self._retirer_arbre(a, b)
+            self._ajouter_arbre(u, v, w)
+
+    # ------------------------------------------------------------------
+    # Événements
+    # ------------------------------------------------------------------
+    def modifier_arete(self, u, v, poids):
+        """Insère, supprime (poids nul, infini ou None) ou repondère l'arête {u, v}."""
+        if u == v:
+            return
+        ancien = self.voisins[u].get(v)
+        nouveau = float(poids) if est_arete(poids) else None
+        dans_arbre = v in self.arbre[u]
+
+        if nouveau is None:
+            if ancien is None:
+                return
+            del self.voisins[u][v]
+            del self.voisins[v][u]
+            if dans_arbre:
+                self._retirer_arbre(u, v)
+                self._reconnecter(u, v)
+            return
+
+        self.voisins[u][v] = nouveau
+        self.voisins[v][u] = nouveau
+
+        if dans_arbre:
+            if nouveau <= ancien:
+                self.poids_total += nouveau - ancien
+                self.arbre[u][v] = self.arbre[v][u] = nouveau
+            else:
+                # L'arête elle-même reste candidate au remplacement
+                self._retirer_arbre(u, v)
+                self._reconnecter(u, v)
+        elif ancien is None or nouveau < ancien:
+            self._echanger_cycle(u, v, nouveau)
+
+    def appliquer(self, evenements):
+        """
+        Applique une liste d'événements au format :
+            {'type': 'inserer' | 'supprimer' | 'modifier',
+             'de': str, 'vers': str, 'poids': float}
+
+        Raises:
+            ValueError: Événement invalide (rien n'est alors modifié)
+        """
+        aretes = lire_evenements(evenements, self.index)
+
+        for u, v, poids in aretes:
+            self.modifier_arete(u, v, poids)
+
+    def resultat(self):
+        """Arbre courant au format de prim_kruskal : {'edges', 'weight'}."""
+        edges = []
+        for u in range(self.n):
+            for v in self.arbre[u]:
+                if u < v:
+                    edges.append((self.labels[u], self.labels[v]))
+        return {"edges": edges, "weight": self.poids_total}
+
+
+def arbre_couvrant_dynamique(matrix=None, labels=None, evenements=None, arbre_id=None):
+    """
+    Récupère (ou construit) un arbre couvrant minimum maintenu et lui applique
+    des événements de mise à jour.
+
+    Args:
+        matrix, labels: Graphe de base si l'arbre doit être construit
+        evenements (list[dict]): Mises à jour (voir ArbreCouvrantDynamique.appliquer)
+        arbre_id (str, optional): Identifiant renvoyé par un appel précédent
+
+    Returns:
+        dict: {'arbre_id': str, 'edges': list[tuple], 'weight': float} ou {'error': str}
+    """
+    arbre = arbres.get(arbre_id) if arbre_id else None
+
+    if arbre is None:
+        if arbre_id and matrix is None:
+            return {"error": f"Arbre inconnu ou expiré : '{arbre_id}'. Renvoyez la matrice."}
+        matrix, labels = resoudre_graphe(matrix, labels)
+        try:
+            arbre = ArbreCouvrantDynamique(matrix, labels)
+        except ValueError as e:
+            return {"error": str(e)}
+        arbre_id = arbre.identifiant = empreinte_graphe(matrix, labels) + ":mst"
+
+    evenements = evenements or []
+    with arbre.verrou:
+        # L'arbre est modifié sur place : une seule requête peut le faire avancer depuis arbre_id
+        if arbre.identifiant != arbre_id:
+            return {"error": f"Arbre '{arbre_id}' déjà mis à jour par une autre requête "
+                             f"(version courante : '{arbre.identifiant}')."}
+        try:
+            arbre.appliquer(evenements)
+        except ValueError as e:
+            return {"error": str(e)}
+        ancien_id, arbre_id = arbre_id, identifiant_version(arbre_id, evenements)
+        arbre.identifiant = arbre_id
+        resultat = arbre.resultat()
+        arbres.put(arbre_id, arbre)
+        if ancien_id != arbre_id:
+            arbres.pop(ancien_id)
+
+    resultat["arbre_id"] = arbre_id
+    return resultat
@@ -18,6 +18,11 @@ except ImportError:
         [INF, INF, INF, INF, 100, INF,  70,  90,  40,   0]
     ])
 
+try:
+    from .arbre_chemins import ArbreChemins
+except ImportError:
+    ArbreChemins = None
+
 
 def bellman_ford(ville_depart, matrix=None, labels=None):
     """
@@ -41,6 +46,7 @@ def bellman_ford(ville_depart, matrix=None, labels=None):
                 'type': 'distances',
                 'distances': list[float],
                 'predecesseurs': list[int],
+                'arbre': ArbreChemins (chemins vers toutes les cibles),
                 'distances_dict': dict[str, float]
               }
             - En cas d'erreur : {'error': str}
@@ -173,6 +179,7 @@ def bellman_ford(ville_depart, matrix=None, labels=None):
         "type": "distances",
         "distances": distances,
         "predecesseurs": predecesseurs,
+        "arbre": ArbreChemins(src, labels, distances, predecesseurs) if ArbreChemins else None,
         "distances_dict": distances_dict,
         "ville_depart": ville_depart,
         "nombre_iterations": min(iteration + 1, n - 1) if 'iteration' in locals() else n - 1
@@ -206,12 +213,12 @@ def reconstruire_chemin(ville_depart, ville_arrivee, predecesseurs, labels):
             'message': f"Aucun chemin de {ville_depart} vers {ville_arrivee}"
         }
     
-    # Reconstruction du chemin en remontant les prédécesseurs
+    # Reconstruction du chemin en remontant les prédécesseurs (puis retournement)
     chemin_indices = []
     current = idx_arrivee
     
     while current != -1:
-        chemin_indices.insert(0, current)
+        chemin_indices.append(current)
         if current == idx_depart:
             break
         current = predecesseurs[current]
@@ -219,6 +226,7 @@ def reconstruire_chemin(ville_depart, ville_arrivee, predecesseurs, labels):
         # Sécurité anti-boucle infinie
         if len(chemin_indices) > len(labels):
             return {'existe': False, 'erreur': "Erreur dans le tableau des prédécesseurs"}
+    chemin_indices.reverse()
     
     chemin_noms = [labels[i] for i in chemin_indices]
     
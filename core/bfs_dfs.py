@@ -1,44 +1,83 @@
+from collections import deque
+
+import numpy as np
+
 from .Matrice import villes as default_villes, M as default_M
+from .graphe import construire_csr
 
-def bfs(ville_depart, matrix=None, labels=None):
+def iter_bfs(start_idx, matrix, n):
     """
-    Parcours en Largeur (BFS).
-    Renvoie les arêtes de l'arbre de découverte pour un affichage correct.
+    Parcours en largeur paresseux : produit (sommet, parent, profondeur) à
+    chaque visite (parent -1 pour le départ), sans rien accumuler.
     """
-    if matrix is None: matrix = default_M
-    if labels is None: labels = default_villes
-
-    try:
-        start_idx = labels.index(ville_depart)
-    except ValueError:
-        return {"error": f"Ville de départ inconnue : {ville_depart}"}
-
-    n = len(labels)
     visited = [False] * n
-    queue = [start_idx]
     visited[start_idx] = True
-    
-    parcours = []           # Ordre simple (pour info texte)
-    discovery_edges = []    # Arêtes de l'arbre (pour le dessin)
+    queue = deque([(start_idx, -1, 0)])
 
     while queue:
-        u = queue.pop(0)
-        parcours.append(labels[u])
+        u, parent, profondeur = queue.popleft()
+        yield u, parent, profondeur
 
+        ligne = matrix[u]
         for v in range(n):
-            weight = matrix[u][v]
-            # Si on trouve un voisin non visité
+            weight = ligne[v]
+            if weight != 0 and weight != float('inf') and not visited[v]:
+                visited[v] = True
+                queue.append((v, u, profondeur + 1))
+
+def iter_dfs(start_idx, matrix, n):
+    """
+    Parcours en profondeur paresseux, même ordre que la version récursive,
+    avec une pile explicite (pas de limite de récursion sur les grands graphes).
+    Produit (sommet, parent, profondeur) à chaque visite.
+    """
+    visited = [False] * n
+    visited[start_idx] = True
+    yield start_idx, -1, 0
+    pile = [(start_idx, 0)]     # (sommet, prochain voisin à examiner)
+
+    while pile:
+        u, debut = pile[-1]
+        ligne = matrix[u]
+        for v in range(debut, n):
+            weight = ligne[v]
             if weight != 0 and weight != float('inf') and not visited[v]:
+                pile[-1] = (u, v + 1)
                 visited[v] = True
-                queue.append(v)
-                # C'est ici qu'on capture le lien "u a découvert v"
-                discovery_edges.append((labels[u], labels[v]))
+                yield v, u, len(pile)
+                pile.append((v, 0))
+                break
+        else:
+            pile.pop()
 
+def _parcours_complet(iterateur, labels):
+    """Ordre de visite et arêtes de l'arbre de découverte (dans l'ordre de découverte)."""
+    parcours = []
+    discovery_edges = []
+    for u, parent, _ in iterateur:
+        parcours.append(labels[u])
+        if parent != -1:
+            discovery_edges.append((labels[parent], labels[u]))
     return {
         "parcours": parcours,
         "edges": discovery_edges
     }
 
+def bfs(ville_depart, matrix=None, labels=None):
+    """
+    Parcours en Largeur (BFS).
+    Renvoie les arêtes de l'arbre de découverte pour un affichage correct.
+    """
+    if matrix is None: matrix = default_M
+    if labels is None: labels = default_villes
+
+    try:
+        start_idx = labels.index(ville_depart)
+    except ValueError:
+        return {"error": f"Ville de départ inconnue : {ville_depart}"}
+
+    return _parcours_complet(iter_bfs(start_idx, matrix, len(labels)), labels)
+
 def dfs(ville_depart, matrix=None, labels=None):
     """
     Parcours en Profondeur (DFS).
@@ -51,25 +90,85 @@ def dfs(ville_depart, matrix=None, labels=None):
     except ValueError:
         return {"error": f"Ville de départ inconnue : {ville_depart}"}
 
+    return _parcours_complet(iter_dfs(start_idx, matrix, len(labels)), labels)
+
+
+def bfs_multi(villes_sources, matrix=None, labels=None):
+    """
+    BFS depuis plusieurs sources à la fois (MS-BFS bit-parallèle).
+
+    Chaque sommet porte un ensemble de bits (une ligne de mots de 64 bits) :
+    le bit k indique que la source k l'a atteint. Un niveau de parcours pour
+    toutes les sources se résume à propager les bits nouveaux de la frontière
+    le long de ses arcs sortants (OU sur chaque sommet atteint) : seuls les
+    arcs des sommets de la frontière sont lus, et le coût est proche d'un
+    seul parcours, multiplié par le nombre de mots (une source sur 64 ne
+    coûte rien de plus).
+
+    Args:
+        villes_sources (list[str]): Villes de départ
+        matrix, labels: Graphe (valeurs de Matrice.py par défaut)
+
+    Returns:
+        dict: {
+            'sources': list[str],
+            'distances': numpy.ndarray   # int32, sources × sommets, en nombre
+                                         # d'arcs (-1 si inaccessible)
+        } ou {'error': str}
+    """
+    if matrix is None: matrix = default_M
+    if labels is None: labels = default_villes
+
+    inconnues = [v for v in villes_sources if v not in labels]
+    if inconnues or not villes_sources:
+        return {"error": f"Villes de départ inconnues ou absentes : {', '.join(inconnues)}"}
+
     n = len(labels)
-    visited = [False] * n
-    parcours = []
-    discovery_edges = []
+    sources = [labels.index(v) for v in villes_sources]
+    nb = len(sources)
+    mots = (nb + 63) // 64
 
-    def _dfs_recursive(u):
-        visited[u] = True
-        parcours.append(labels[u])
-        
-        for v in range(n):
-            weight = matrix[u][v]
-            if weight != 0 and weight != float('inf') and not visited[v]:
-                # On note l'arête AVANT de plonger récursivement
-                discovery_edges.append((labels[u], labels[v]))
-                _dfs_recursive(v)
+    indptr, indices, _ = construire_csr(matrix, n)
+
+    distances = np.full((nb, n), -1, dtype=np.int32)
+    vus = np.zeros((n, mots), dtype=np.uint64)
+    for k, s in enumerate(sources):
+        vus[s, k // 64] |= np.uint64(1) << np.uint64(k % 64)
+        distances[k, s] = 0
+    frontiere = np.unique(sources)      # Sommets atteints au dernier niveau
+    bits = vus[frontiere]               # ... et leurs bits nouveaux
+
+    niveau = 0
+    while len(frontiere):
+        niveau += 1
+        # Arcs sortants de la frontière : positions indptr[f]:indptr[f + 1] mises bout à bout
+        debuts = indptr[frontiere]
+        degres = indptr[frontiere + 1] - debuts
+        if not degres.sum():
+            break
+        origines = np.repeat(np.arange(len(frontiere)), degres)
+        positions = np.arange(len(origines)) - np.repeat(np.cumsum(degres) - degres - debuts, degres)
+        cibles = indices[positions]
+
+        # Bits qui arrivent sur chaque cible : OU, cible par cible, des bits des origines
+        ordre = np.argsort(cibles, kind='stable')
+        cibles = cibles[ordre]
+        groupes = np.flatnonzero(np.r_[True, cibles[1:] != cibles[:-1]])
+        atteints = cibles[groupes]
+        nouveaux = np.bitwise_or.reduceat(bits[origines[ordre]], groupes, axis=0) & ~vus[atteints]
+        gardes = nouveaux.any(axis=1)
+        atteints, nouveaux = atteints[gardes], nouveaux[gardes]
+        if not len(atteints):
+            break
+        vus[atteints] |= nouveaux
+
+        # Bit k du sommet v -> distances[k, v] = niveau
+        octets = nouveaux.astype('<u8').view(np.uint8)
+        r, k = np.nonzero(np.unpackbits(octets, axis=1, bitorder='little')[:, :nb])
+        distances[k, atteints[r]] = niveau
+        frontiere, bits = atteints, nouveaux
 
-    _dfs_recursive(start_idx)
-    
     return {
-        "parcours": parcours,
-        "edges": discovery_edges
-    }
\ No newline at end of file
+        "sources": list(villes_sources),
+        "distances": distances
+    }
@@ -0,0 +1,337 @@
+import heapq
+import math
+import random
+from collections import deque
+from functools import partial
+
+import numpy as np
+
+from .graphe import resoudre_graphe, construire_csr, transposer_csr
+from .dijkstra import distances_csr
+from . import memoire_partagee, registre_graphes
+
+# En dessous, lancer des processus coûte plus cher que le calcul
+SEUIL_PARALLELE = 512
+
+
+def _distances_bfs(src, indptr, indices, poids, n):
+    """Parcours en largeur : distances en nombre d'arcs × le poids (unique) des arcs."""
+    pas = float(poids[0]) if len(poids) else 1.0
+    distances = [float('inf')] * n
+    distances[src] = 0
+    file = deque([src])
+    while file:
+        u = file.popleft()
+        for v in indices[indptr[u]:indptr[u + 1]].tolist():
+            if distances[v] == float('inf'):
+                distances[v] = distances[u] + pas
+                file.append(v)
+    return distances
+
+
+def _calculateur(poids):
+    """BFS si tous les arcs ont le même poids, Dijkstra sinon."""
+    if len(poids) == 0 or np.all(poids == poids[0]):
+        return _distances_bfs
+    return distances_csr
+
+
+def _tache_partagee(tache, descripteurs, sources):
+    """Exécute tache dans un worker du pool, sur le CSR partagé attaché le temps de la tâche."""
+    with memoire_partagee.attaches(descripteurs) as vues:
+        return tache(sources, (vues['indptr'], vues['indices'], vues['poids']))
+
+
+def _tache_exacte(sources, csr):
+    """Pour chaque source : (source, somme des distances finies, nombre de sommets atteints)."""
+    indptr, indices, poids = csr
+    n = len(indptr) - 1
+    calcul = _calculateur(poids)
+    resultats = []
+    for src in sources:
+        finies = [d for d in calcul(src, indptr, indices, poids, n) if d != float('inf')]
+        resultats.append((src, sum(finies), len(finies)))
+    return resultats
+
+
+def _tache_echantillon(sources, csr):
+    """Somme, sur les sources échantillonnées, des distances finies vers chaque sommet."""
+    indptr, indices, poids = csr
+    n = len(indptr) - 1
+    calcul = _calculateur(poids)
+    sommes = np.zeros(n)
+    atteints = np.zeros(n, dtype=np.int64)
+    diametre = 0.0
+    for src in sources:
+        d = np.asarray(calcul(src, indptr, indices, poids, n))
+        finies = np.isfinite(d)
+        sommes[finies] += d[finies]
+        atteints += finies
+        diametre = max(diametre, float(d[finies].max()))
+    return sommes, atteints, diametre
+
+
+def _executer(csr, tache, sources, workers, descripteurs=None):
+    """
+    Applique tache à des paquets de sources, en parallèle si le graphe est assez grand.
+
+    tache(paquet, csr) reçoit le CSR en argument : celui du processus
+    courant (plusieurs threads du serveur peuvent calculer en même temps),
+    ou, dans un worker du pool commun, le segment partagé qu'il attache le
+    temps de la tâche. descripteurs (ceux d'un graphe du registre) évitent
+    de recopier le CSR en mémoire partagée.
+    """
+    indptr, indices, poids = csr
+    n = len(indptr) - 1
+    paquets = [sources[i::4 * workers] for i in range(4 * workers)]
+    paquets = [p for p in paquets if p]
+
+    if n < SEUIL_PARALLELE or workers == 1:
+        return [tache(p, csr) for p in paquets]
+
+    if descripteurs is not None:
+        segments, vues = [], {}
+    else:
+        segments, descripteurs, vues = memoire_partagee.partager(
+            {'indptr': indptr, 'indices': indices, 'poids': poids})
+    try:
+        with memoire_partagee.calcul_parallele() as pool:
+            return list(pool.map(partial(_tache_partagee, tache, descripteurs), paquets))
+    finally:
+        vues.clear()
+        for shm in segments:
+            memoire_partagee.liberer(shm)
+
+
+def centralite_proximite(matrix=None, labels=None, workers=None):
+    """
+    Centralité de proximité exacte, sans matrice des distances complète.
+
+    Un BFS (graphe non pondéré) ou un Dijkstra par source, répartis sur un
+    pool de processus ; chaque source ne renvoie que sa somme de distances.
+    Mémoire en O(V + E) au lieu de O(V²) pour Floyd-Warshall.
+
+    Returns:
+        dict: {
+            'eloignement': dict[str, float],   # somme des distances finies
+            'proximite': dict[str, float],     # (atteints - 1) / somme
+            'noeud_central': str | None        # même règle que le mode floyd
+        }
+    """
+    matrix, labels = resoudre_graphe(matrix, labels)
+    n = len(labels)
+    workers = memoire_partagee.nb_workers(workers)
+    graphe = registre_graphes.graphe_partage(matrix, labels, positifs=True)
+
+    sommes = [0.0] * n
+    atteints = [0] * n
+    for paquet in _executer(graphe.csr, _tache_exacte, list(range(n)), workers, graphe.descripteurs):
+        for src, somme, nb in paquet:
+            sommes[src], atteints[src] = somme, nb
+
+    min_sum, central = float('inf'), None
+    for i, s in enumerate(sommes):
+        if 0 < s < min_sum:
+            min_sum, central = s, labels[i]
+
+    return {
+        "eloignement": {ville: sommes[i] for i, ville in enumerate(labels)},
+        "proximite": {ville: ((atteints[i] - 1) / sommes[i] if sommes[i] > 0 else 0.0)
+                      for i, ville in enumerate(labels)},
+        "noeud_central": central
+    }
+
+
+def centralite_proximite_approchee(matrix=None, labels=None, echantillon=None, workers=None, graine=None):
+    """
+    Estimation de la centralité de proximité par échantillonnage de sources
+    (Eppstein & Wang) : k parcours au lieu de n.
+
+    Les parcours se font sur le graphe inversé, pour estimer comme en exact
+    la somme des distances DEPUIS chaque sommet. Pour k sources, l'éloignement
+    moyen de chaque sommet est estimé à ± epsilon · diamètre près avec une
+    probabilité >= 1 - 2/n, où epsilon = sqrt(ln(n) / k) (Hoeffding + union).
+
+    Args:
+        echantillon (int, optional): Nombre de sources k (défaut : ln(n) / 0.1², borné par n)
+        graine (int, optional): Graine du tirage, pour des résultats reproductibles
+
+    Returns:
+        dict: comme centralite_proximite, plus 'echantillon', 'epsilon'
+            et 'erreur_max' (borne sur l'éloignement moyen estimé)
+    """
+    matrix, labels = resoudre_graphe(matrix, labels)
+    n = len(labels)
+    if n == 0:
+        return {"eloignement": {}, "proximite": {}, "noeud_central": None,
+                "echantillon": 0, "epsilon": 0.0, "erreur_max": 0.0}
+    workers = memoire_partagee.nb_workers(workers)
+
+    k = echantillon or math.ceil(math.log(max(n, 2)) / 0.01)
+    k = max(1, min(int(k), n))
+    sources = random.Random(graine).sample(range(n), k)
+    csr = transposer_csr(*construire_csr(matrix, n, positifs=True), n)
+
+    sommes = np.zeros(n)
+    atteints = np.zeros(n, dtype=np.int64)
+    diametre = 0.0
+    for s, a, d in _executer(csr, _tache_echantillon, sources, workers):
+        sommes += s
+        atteints += a
+        diametre = max(diametre, d)
+
+    # Extrapolation à toutes les sources : n / k
+    eloignement = sommes * (n / k)
+    epsilon = math.sqrt(math.log(max(n, 2)) / k) if k < n else 0.0
+
+    min_sum, central = float('inf'), None
+    for i, s in enumerate(eloignement.tolist()):
+        if 0 < s < min_sum:
+            min_sum, central = s, labels[i]
+
+    return {
+        "eloignement": {ville: float(eloignement[i]) for i, ville in enumerate(labels)},
+        "proximite": {ville: (float((n - 1) / eloignement[i]) if eloignement[i] > 0 else 0.0)
+                      for i, ville in enumerate(labels)},
+        "noeud_central": central,
+        "echantillon": k,
+        "epsilon": epsilon,
+        "erreur_max": epsilon * diametre
+    }
+
+
+def _brandes_source(s, indptr, indices, poids, n, noeuds, aretes, uniforme):
+    """
+    Une étape de Brandes : plus courts chemins depuis s (BFS ou Dijkstra),
+    puis accumulation des dépendances dans l'ordre inverse de fermeture.
+    """
+    distances = [float('inf')] * n
+    sigma = [0] * n                 # Nombre de plus courts chemins
+    preds = [[] for _ in range(n)]  # (prédécesseur, indice de l'arc CSR)
+    ordre = []
+    distances[s] = 0
+    sigma[s] = 1
+
+    if uniforme:
+        file = deque([s])
+        while file:
+            u = file.popleft()
+            ordre.append(u)
+            debut = indptr[u]
+            for pos, v in enumerate(indices[debut:indptr[u + 1]].tolist(), start=debut):
+                if distances[v] == float('inf'):
+                    distances[v] = distances[u] + 1
+                    file.append(v)
+                if distances[v] == distances[u] + 1:
+                    sigma[v] += sigma[u]
+                    preds[v].append((u, pos))
+    else:
+        fermes = [False] * n
+        file_prioritaire = [(0, s)]
+        while file_prioritaire:
+            dist_actuelle, u = heapq.heappop(file_prioritaire)
+            if fermes[u] or dist_actuelle > distances[u]:
+                continue
+            fermes[u] = True
+            ordre.append(u)
+            debut, fin = indptr[u], indptr[u + 1]
+            for pos, v, w in zip(range(debut, fin), indices[debut:fin].tolist(), poids[debut:fin].tolist()):
+                distance = dist_actuelle + w
+                if distance < distances[v]:
+                    distances[v] = distance
+                    sigma[v] = sigma[u]
+                    preds[v] = [(u, pos)]
+                    heapq.heappush(file_prioritaire, (distance, v))
+                elif distance == distances[v] and not fermes[v]:
+                    sigma[v] += sigma[u]
+                    preds[v].append((u, pos))
+
+    delta = [0.0] * n
+    for w in reversed(ordre):
+        for v, pos in preds[w]:
+            c = sigma[v] / sigma[w] * (1 + delta[w])
+            aretes[pos] += c
+            delta[v] += c
+        if w != s:
+            noeuds[w] += delta[w]
+
+
+def _tache_brandes(sources, csr):
+    """Contributions partielles (nœuds, arcs) d'un paquet de sources."""
+    indptr, indices, poids = csr
+    n = len(indptr) - 1
+    uniforme = len(poids) == 0 or bool(np.all(poids == poids[0]))
+    noeuds = [0.0] * n
+    aretes = [0.0] * len(indices)
+    for s in sources:
+        _brandes_source(s, indptr, indices, poids, n, noeuds, aretes, uniforme)
+    return np.asarray(noeuds), np.asarray(aretes)
+
+
+def centralite_intermediarite(matrix=None, labels=None, echantillon=None, workers=None, graine=None):
+    """
+    Centralité d'intermédiarité des nœuds et des arêtes (algorithme de Brandes).
+
+    Repère les goulots d'étranglement du réseau : les villes et routes par
+    lesquelles passent le plus de plus courts chemins. Les sources sont
+    réparties sur un pool de processus (graphe CSR en mémoire partagée) et
+    les contributions partielles sont additionnées.
+
+    Args:
+        matrix, labels: Graphe (valeurs de Matrice.py par défaut) ; une matrice
+            symétrique est traitée comme un graphe non orienté.
+        echantillon (int, optional): Si fourni, seules k sources tirées au
+            hasard sont utilisées et les scores sont extrapolés (× n / k).
+        graine (int, optional): Graine du tirage
+
+    Returns:
+        dict: {
+            'noeuds': dict[str, float],
+            'aretes': list[{'de': str, 'vers': str, 'score': float}] (décroissant),
+            'echantillon': int
+        }
+    """
+    matrix, labels = resoudre_graphe(matrix, labels)
+    n = len(labels)
+    workers = memoire_partagee.nb_workers(workers)
+    graphe = registre_graphes.graphe_partage(matrix, labels, positifs=True)
+    indptr, indices, poids = csr = graphe.csr
+
+    sources = list(range(n))
+    if echantillon and int(echantillon) < n:
+        sources = random.Random(graine).sample(sources, int(echantillon))
+    k = len(sources)
+
+    noeuds = np.zeros(n)
+    aretes = np.zeros(len(indices))
+    if sources:
+        for partiel_noeuds, partiel_aretes in _executer(csr, _tache_brandes, sources, workers,
+                                                         graphe.descripteurs):
+            noeuds += partiel_noeuds
+            aretes += partiel_aretes
+    if k:
+        noeuds *= n / k
+        aretes *= n / k
+
+    # Graphe non orienté (CSR égal à sa transposée) : chaque chemin est
+    # compté dans les deux sens
+    indptr_t, indices_t, poids_t = transposer_csr(indptr, indices, poids, n)
+    non_oriente = (np.array_equal(indptr, indptr_t) and np.array_equal(indices, indices_t)
+                   and np.array_equal(poids, poids_t))
+    origines = np.repeat(np.arange(n), np.diff(indptr))
+    scores = {}
+    for u, v, score in zip(origines.tolist(), indices.tolist(), aretes.tolist()):
+        cle = (min(u, v), max(u, v)) if non_oriente else (u, v)
+        scores[cle] = scores.get(cle, 0.0) + score
+    if non_oriente:
+        noeuds /= 2
+        scores = {cle: score / 2 for cle, score in scores.items()}
+
+    return {
+        "noeuds": {ville: float(noeuds[i]) for i, ville in enumerate(labels)},
+        "aretes": [
+            {"de": labels[u], "vers": labels[v], "score": score}
+            for (u, v), score in sorted(scores.items(), key=lambda item: -item[1])
+        ],
+        "echantillon": k
+    }
@@ -0,0 +1,243 @@
+import heapq
+import threading
+
+from .graphe import (resoudre_graphe, liste_successeurs, empreinte_graphe, est_arete,
+                     identifiant_version, lire_evenements, CacheLRU)
+
+# Arbres maintenus entre deux requêtes, indexés par leur identifiant de version
+arbres = CacheLRU(taille_max=64)
+
+
+class ArbreCheminsDynamique:
+    """
+    Arbre des plus courts chemins depuis une source, maintenu sous mises à jour.
+
+    Au lieu de relancer Dijkstra à chaque modification du réseau (fermeture
+    de route, trafic...), on ne répare que la partie de l'arbre concernée :
+      - insertion / baisse de poids : propagation de Dijkstra depuis l'arc modifié
+      - suppression / hausse de poids d'un arc de l'arbre : seul le sous-arbre
+        qui pendait à cet arc est recalculé, à partir de ses voisins intacts.
+
+    Les arcs sont orientés (comme la matrice) et les poids doivent être
+    strictement positifs, comme pour dijkstra.dijkstra.
+    """
+
+    def __init__(self, src, matrix, labels):
+        self.labels = list(labels)
+        self.index = {ville: i for i, ville in enumerate(self.labels)}
+        self.n = len(self.labels)
+        self.src = src
+        self.verrou = threading.Lock()
+        self.identifiant = None     # Version courante (arbre_id), fixée par arbre_dynamique
+
+        # Arcs sortants et entrants, pour réparer dans les deux sens
+        self.succ = liste_successeurs(matrix, self.n, positifs=True)
+        self.pred = [dict() for _ in range(self.n)]
+        for u in range(self.n):
+            for v, poids in self.succ[u].items():
+                self.pred[v][u] = poids
+
+        self.distances = [float('inf')] * self.n
+        self.predecesseurs = [-1] * self.n
+        self.enfants = [set() for _ in range(self.n)]
+        self.distances[src] = 0
+        self._propager([(0, src)])
+
+    # ------------------------------------------------------------------
+    # Réparations
+    # ------------------------------------------------------------------
+    def _rattacher(self, v, parent):
+        ancien = self.predecesseurs[v]
+        if ancien != -1:
+            self.enfants[ancien].discard(v)
+        self.predecesseurs[v] = parent
+        if parent != -1:
+            self.enfants[parent].add(v)
+
+    def _propager(self, file_prioritaire, modifies=None):
+        """Dijkstra classique à partir des sommets déjà placés dans la file."""
+        heapq.heapify(file_prioritaire)
+        while file_prioritaire:
+            dist_actuelle, u = heapq.heappop(file_prioritaire)
+            if dist_actuelle > self.distances[u]:
+                continue
+            if modifies is not None:
+                modifies.add(u)
+            for v, poids in self.succ[u].items():
+                distance = dist_actuelle + poids
+                if distance < self.distances[v]:
+                    self.distances[v] = distance
+                    self._rattacher(v, u)
+                    heapq.heappush(file_prioritaire, (distance, v))
+
+    def _ameliorer(self, u, v, modifies):
+        """L'arc (u, v) est apparu ou a diminué : on propage s'il raccourcit v."""
+        distance = self.distances[u] + self.succ[u][v]
+        if distance < self.distances[v]:
+            self.distances[v] = distance
+            self._rattacher(v, u)
+            self._propager([(distance, v)], modifies)
+
+    def _degrader(self, u, v, modifies):
+        """L'arc (u, v) a disparu ou augmenté : on répare le sous-arbre de v."""
+        if self.predecesseurs[v] != u:
+            return  # Arc hors de l'arbre : aucune distance ne change
+
+        # Sommets dont le plus court chemin passait par l'arc (u, v)
+        affectes = set()
+        pile = [v]
+        while pile:
+            x = pile.pop()
+            affectes.add(x)
+            pile.extend(self.enfants[x])
+
+        for x in affectes:
+            self.distances[x] = float('inf')
+            self._rattacher(x, -1)
+
+        # Chaque sommet affecté repart du meilleur voisin non affecté
+        file_prioritaire = []
+        for x in affectes:
+            for p, poids in self.pred[x].items():
+                if p not in affectes and self.distances[p] + poids < self.distances[x]:
+                    self.distances[x] = self.distances[p] + poids
+                    self._rattacher(x, p)
+            if self.distances[x] != float('inf'):
+                file_prioritaire.append((self.distances[x], x))
+
+        modifies.update(affectes)
+        self._propager(file_prioritaire, modifies)
+
+    # ------------------------------------------------------------------
+    # Événements
+    # ------------------------------------------------------------------
+    def modifier_arc(self, u, v, poids):
+        """
+        Insère, supprime (poids nul, infini ou None) ou repondère l'arc (u, v).
+
+        Returns:
+            set[int]: Sommets dont la distance ou le prédécesseur a pu changer
+        """
+        modifies = set()
+        ancien = self.succ[u].get(v)
+        nouveau = float(poids) if est_arete(poids) and poids > 0 else None
+
+        if nouveau is None:
+            if ancien is None:
+                return modifies
+            del self.succ[u][v]
+            del self.pred[v][u]
+            self._degrader(u, v, modifies)
+        else:
+            self.succ[u][v] = nouveau
+            self.pred[v][u] = nouveau
+            if ancien is None or nouveau < ancien:
+                self._ameliorer(u, v, modifies)
+            elif nouveau > ancien:
+                self._degrader(u, v, modifies)
+        return modifies
+
+    def appliquer(self, evenements):
+        """
+        Applique une liste d'événements au format :
+            {'type': 'inserer' | 'supprimer' | 'modifier',
+             'de': str, 'vers': str, 'poids': float}
+
+        Returns:
+            list[str]: Villes dont la distance ou le prédécesseur a changé
+
+        Raises:
+            ValueError: Événement invalide (rien n'est alors modifié)
+        """
+        # Validation complète avant toute modification (pas d'arbre à moitié mis à jour)
+        arcs = lire_evenements(evenements, self.index)
+
+        modifies = set()
+        for u, v, poids in arcs:
+            modifies |= self.modifier_arc(u, v, poids)
+        return [self.labels[i] for i in sorted(modifies)]
+
+    def chemin(self, cible):
+        """Liste des indices du chemin source -> cible (vide si inaccessible)."""
+        if self.distances[cible] == float('inf'):
+            return []
+        chemin = []
+        etape = cible
+        while etape != -1:
+            chemin.append(etape)
+            etape = self.predecesseurs[etape]
+        chemin.reverse()
+        return chemin
+
+
+def arbre_dynamique(ville_depart=None, matrix=None, labels=None, evenements=None, arbre_id=None,
+                    ville_arrivee=None):
+    """
+    Récupère (ou construit) un arbre des plus courts chemins maintenu et lui
+    applique des événements de mise à jour.
+
+    Args:
+        ville_depart (str): Source de l'arbre (ignorée si arbre_id est connu)
+        matrix, labels: Graphe de base si l'arbre doit être construit
+        evenements (list[dict]): Mises à jour à appliquer (voir ArbreCheminsDynamique.appliquer)
+        arbre_id (str, optional): Identifiant renvoyé par un appel précédent
+        ville_arrivee (str, optional): Si fournie, le chemin vers cette ville est renvoyé
+
+    Returns:
+        dict: {
+            'arbre_id': str (à renvoyer pour les mises à jour suivantes),
+            'distances': list[float], 'predecesseurs': list[int],
+            'distances_dict': dict[str, float], 'modifies': list[str],
+            'chemin': list[str] (si ville_arrivee)
+        } ou {'error': str}
+    """
+    arbre = arbres.get(arbre_id) if arbre_id else None
+
+    if arbre is None:
+        if arbre_id and matrix is None:
+            return {"error": f"Arbre inconnu ou expiré : '{arbre_id}'. Renvoyez la matrice."}
+        matrix, labels = resoudre_graphe(matrix, labels)
+        try:
+            src = labels.index(ville_depart)
+        except ValueError:
+            return {"error": f"Ville de départ inconnue : '{ville_depart}'"}
+        arbre = ArbreCheminsDynamique(src, matrix, labels)
+        arbre_id = arbre.identifiant = empreinte_graphe(matrix, labels) + f":{src}"
+
+    evenements = evenements or []
+    with arbre.verrou:
+        # L'arbre est modifié sur place : une seule requête peut le faire avancer depuis arbre_id
+        if arbre.identifiant != arbre_id:
+            return {"error": f"Arbre '{arbre_id}' déjà mis à jour par une autre requête "
+                             f"(version courante : '{arbre.identifiant}')."}
+        try:
+            modifies = arbre.appliquer(evenements)
+        except ValueError as e:
+            return {"error": str(e)}
+
+        ancien_id, arbre_id = arbre_id, identifiant_version(arbre_id, evenements)
+        arbre.identifiant = arbre_id
+
+        distances = list(arbre.distances)
+        predecesseurs = list(arbre.predecesseurs)
+        chemin = None
+        if ville_arrivee in arbre.index:
+            chemin = [arbre.labels[i] for i in arbre.chemin(arbre.index[ville_arrivee])]
+        arbres.put(arbre_id, arbre)
+        if ancien_id != arbre_id:
+            arbres.pop(ancien_id)
+
+    resultat = {
+        "arbre_id": arbre_id,
+        "ville_depart": arbre.labels[arbre.src],
+        "distances": distances,
+        "predecesseurs": predecesseurs,
+        "distances_dict": {
+            ville: (distances[i] if distances[i] != float('inf') else "∞")
+            for i, ville in enumerate(arbre.labels)
+        },
+        "modifies": modifies,
+    }
+    if chemin is not None:
+        resultat["chemin"] = chemin
+    return resultat
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import re
+import threading
+
+# Modes qui modifient un état côté serveur : deux appels identiques ne sont
+# pas équivalents à un seul (les événements seraient appliqués une fois).
+ALGOS_AVEC_ETAT = {'dijkstra_dynamique', 'mst_dynamique', 'version'}
+
+_ESPACES = re.compile(r'\s+')
+
+
+def avec_etat(data):
+    """
+    True si la requête crée ou lit un état propre au processus (arbre
+    dynamique, version de graphe) : elle doit s'exécuter dans le processus
+    qui le détient, dans l'ordre des requêtes.
+    """
+    return data.get('algo') in ALGOS_AVEC_ETAT or bool(data.get('version'))
+
+
+def cle_requete(data):
+    """
+    Empreinte canonique d'une requête : algorithme et entrées, indépendamment
+    de l'ordre des champs et de la mise en forme de la matrice et des labels.
+    """
+    canonique = dict(data)
+    if isinstance(canonique.get('matrix'), str):
+        canonique['matrix'] = _ESPACES.sub('', canonique['matrix'])
+    if isinstance(canonique.get('labels'), str):
+        canonique['labels'] = [l.strip() for l in canonique['labels'].split(',') if l.strip()]
+    for champ in ('depart', 'arrivee'):
+        if isinstance(canonique.get(champ), str):
+            canonique[champ] = canonique[champ].strip()
+    texte = json.dumps(canonique, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(texte.encode('utf-8')).hexdigest()
+
+
+class _Appel:
+    """Calcul en cours, attendu par les requêtes identiques arrivées entre-temps."""
+
+    def __init__(self):
+        self.termine = threading.Event()
+        self.resultat = None
+        self.erreur = None
+        self.attentes = 0
+
+
+class Coalescence:
+    """
+    Regroupement des appels identiques simultanés (« single flight ») : le
+    premier appel calcule, les suivants attendent et reçoivent le même
+    résultat. Rien n'est conservé une fois le calcul terminé (ce n'est pas
+    un cache) : la requête identique suivante recalcule.
+
+    Le regroupement vaut au sein d'un processus (threads du serveur).
+    """
+
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self._en_cours = {}
+        self.partages = 0   # Nombre d'appels servis sans calcul
+
+    def executer(self, cle, fonction):
+        """
+        Returns:
+            tuple: (resultat, partage) — partage vaut True si le résultat
+                provient du calcul d'un autre appel. Le résultat est commun
+                à tous les appels regroupés : ne pas le modifier.
+        """
+        with self._verrou:
+            appel = self._en_cours.get(cle)
+            meneur = appel is None
+            if meneur:
+                appel = self._en_cours[cle] = _Appel()
+            else:
+                appel.attentes += 1
+                self.partages += 1
+
+        if not meneur:
+            appel.termine.wait()
+            if appel.erreur is not None:
+                raise appel.erreur
+            return appel.resultat, True
+
+        try:
+            appel.resultat = fonction()
+        except BaseException as e:
+            appel.erreur = e
+            raise
+        finally:
+            with self._verrou:
+                del self._en_cours[cle]
+            appel.termine.set()
+        return appel.resultat, False
+
+
+requetes_en_cours = Coalescence()
+
+
+def cle_partageable(data):
+    """
+    Clé canonique de la requête si son résultat peut être partagé entre
+    appels identiques, None sinon (modes avec état, corps non dict).
+    """
+    if not isinstance(data, dict) or data.get('algo') in ALGOS_AVEC_ETAT:
+        return None
+    return cle_requete(data)
+
+
+def requete_unique(cle, fonction):
+    """
+    Exécute fonction(), en la regroupant avec les requêtes de même clé en
+    cours (cle vaut None pour une requête non partageable).
+
+    Returns:
+        tuple: (resultat, partage)
+    """
+    if cle is None:
+        return fonction(), False
+    return requetes_en_cours.executer(cle, fonction)
@@ -0,0 +1,144 @@
+from .graphe import resoudre_graphe, liste_successeurs, empreinte_graphe, CacheLRU
+
+# Un index par graphe (clé : empreinte du graphe)
+index_par_graphe = CacheLRU(taille_max=32)
+
+
+def tarjan_iteratif(succ):
+    """
+    Composantes fortement connexes par l'algorithme de Tarjan, sans récursion
+    (pas de limite de profondeur de pile sur les grands graphes).
+
+    Args:
+        succ (list[list[int]]): Liste des successeurs de chaque sommet
+
+    Returns:
+        tuple: (composante, nombre) où composante[u] est le numéro de la CFC de u.
+            Les CFC sont numérotées dans l'ordre topologique inverse : si une
+            CFC A atteint une CFC B différente, alors numéro(B) < numéro(A).
+    """
+    n = len(succ)
+    ordre = [-1] * n        # Numéro de découverte
+    remonte = [0] * n       # Plus petit numéro atteignable (lowlink)
+    sur_pile = [False] * n
+    pile = []
+    composante = [-1] * n
+    compteur = 0
+    nombre = 0
+
+    for s in range(n):
+        if ordre[s] != -1:
+            continue
+        ordre[s] = remonte[s] = compteur
+        compteur += 1
+        pile.append(s)
+        sur_pile[s] = True
+        appels = [(s, iter(succ[s]))]
+
+        while appels:
+            u, voisins = appels[-1]
+            descendu = False
+            for v in voisins:
+                if ordre[v] == -1:
+                    ordre[v] = remonte[v] = compteur
+                    compteur += 1
+                    pile.append(v)
+                    sur_pile[v] = True
+                    appels.append((v, iter(succ[v])))
+                    descendu = True
+                    break
+                elif sur_pile[v]:
+                    remonte[u] = min(remonte[u], ordre[v])
+            if descendu:
+                continue
+
+            # Tous les voisins de u sont traités : on remonte vers l'appelant
+            appels.pop()
+            if appels:
+                parent = appels[-1][0]
+                remonte[parent] = min(remonte[parent], remonte[u])
+
+            if remonte[u] == ordre[u]:
+                while True:
+                    x = pile.pop()
+                    sur_pile[x] = False
+                    composante[x] = nombre
+                    if x == u:
+                        break
+                nombre += 1
+
+    return composante, nombre
+
+
+class IndexComposantes:
+    """
+    Composantes fortement connexes (CFC) et faiblement connexes d'un graphe,
+    calculées une fois pour répondre en O(1) aux paires sans chemin possible.
+    """
+
+    def __init__(self, matrix, labels):
+        self.labels = list(labels)
+        n = len(self.labels)
+        succ = [list(voisins) for voisins in liste_successeurs(matrix, n)]
+
+        # 1. Composantes fortement connexes (Tarjan itératif)
+        self.forte, self.nb_fortes = tarjan_iteratif(succ)
+
+        # 2. Composantes faiblement connexes (union-find sur les arcs non orientés)
+        parent = list(range(n))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for u in range(n):
+            for v in succ[u]:
+                ru, rv = find(u), find(v)
+                if ru != rv:
+                    parent[ru] = rv
+
+        numeros = {}
+        self.faible = [numeros.setdefault(find(u), len(numeros)) for u in range(n)]
+        self.nb_faibles = len(numeros)
+
+        self.tailles_fortes = [0] * self.nb_fortes
+        self.tailles_faibles = [0] * self.nb_faibles
+        for u in range(n):
+            self.tailles_fortes[self.forte[u]] += 1
+            self.tailles_faibles[self.faible[u]] += 1
+
+    def inaccessible(self, i, j):
+        """
+        True si aucun chemin i -> j ne peut exister (réponse en O(1)).
+
+        False signifie seulement qu'un chemin est possible : il est garanti
+        si i et j sont dans la même CFC, à vérifier par un parcours sinon.
+        """
+        if self.faible[i] != self.faible[j]:
+            return True
+        # Ordre topologique inverse de Tarjan : on ne remonte jamais vers une CFC plus récente
+        return self.forte[i] < self.forte[j]
+
+    def resume(self):
+        """Étiquettes et tailles des composantes, par nom de ville."""
+        return {
+            'composante_forte': {ville: self.forte[i] for i, ville in enumerate(self.labels)},
+            'composante_faible': {ville: self.faible[i] for i, ville in enumerate(self.labels)},
+            'tailles_fortes': self.tailles_fortes,
+            'tailles_faibles': self.tailles_faibles,
+            'nb_fortes': self.nb_fortes,
+            'nb_faibles': self.nb_faibles,
+        }
+
+
+def index_composantes(matrix=None, labels=None, cle=None):
+    """
+    Index des composantes du graphe, calculé une seule fois puis mis en cache.
+    cle : empreinte du graphe, si l'appelant l'a déjà calculée.
+    """
+    matrix, labels = resoudre_graphe(matrix, labels)
+    if cle is None:
+        cle = empreinte_graphe(matrix, labels)
+    return index_par_graphe.get_ou_calcule(cle, lambda: IndexComposantes(matrix, labels))
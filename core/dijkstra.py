@@ -1,10 +1,31 @@
 import heapq
+from functools import partial
+
+import numpy as np
+
 from .Matrice import villes as default_villes, M as default_M
+from .accessibilite import sans_chemin
+from .graphe import liste_successeurs
+from .arbre_chemins import ArbreChemins
+from .files_priorite import poids_max_entier, file_entiere
+from . import memoire_partagee, registre_graphes
 
-def dijkstra(ville_depart, ville_arrive, matrix=None, labels=None):
+# En dessous, lancer des processus coûte plus cher que le calcul
+SEUIL_PARALLELE = 512
+
+def arbre_dijkstra(ville_depart, matrix=None, labels=None, ville_arrive=None):
     """
-    Calcule le plus court chemin entre deux villes.
+    Arbre des plus courts chemins depuis une ville (poids strictement positifs).
     Utilise matrix et labels s'ils sont fournis, sinon ceux de Matrice.py.
+
+    Args:
+        ville_depart (str): Ville de départ
+        matrix, labels: Graphe
+        ville_arrive (str, optional): Si fournie, le calcul s'arrête dès qu'elle
+            est atteinte (seul son chemin est alors garanti optimal)
+
+    Returns:
+        ArbreChemins, ou str en cas d'erreur (ville inconnue, arrivée inaccessible)
     """
     # 1. Gestion des valeurs par défaut
     if matrix is None:
@@ -17,14 +38,40 @@ def dijkstra(ville_depart, ville_arrive, matrix=None, labels=None):
     # Recherche des index
     try:
         dep = labels.index(ville_depart)
-        arr = labels.index(ville_arrive)
+        arr = labels.index(ville_arrive) if ville_arrive is not None else -1
     except ValueError:
         return f"Erreur : Une des villes ({ville_depart}, {ville_arrive}) n'existe pas dans la liste des labels."
 
+    # Court-circuit en O(1) : les index des composantes ou d'accessibilité
+    # prouvent qu'aucun chemin ne relie les deux villes
+    if arr != -1 and sans_chemin(matrix, labels, dep, arr):
+        return f"Aucun chemin entre {ville_depart} et {ville_arrive}"
+
     # Initialisation
     distances = [float('inf')] * n
     distances[dep] = 0
     predecesseurs = [-1] * n
+
+    poids_max = poids_max_entier(matrix, positifs=True)
+    if poids_max is not None:
+        # Poids entiers : seaux de Dial ou tas radix, sans tas de tuples
+        succ = [{v: int(w) for v, w in voisins.items()} for voisins in liste_successeurs(matrix, n, positifs=True)]
+        file = file_entiere(poids_max)
+        file.ajouter(0, dep)
+        while file:
+            u = file.extraire()
+            dist_actuelle = file.courant
+            if dist_actuelle > distances[u]:
+                continue
+            if u == arr:
+                break
+            for v, poids in succ[u].items():
+                distance = dist_actuelle + poids
+                if distance < distances[v]:
+                    distances[v] = distance
+                    predecesseurs[v] = u
+                    file.ajouter(distance, v)
+        return _arbre_ou_erreur(dep, arr, distances, predecesseurs, ville_depart, ville_arrive, labels)
     
     # File de priorité : (distance, index_ville)
     file_prioritaire = [(0, dep)]
@@ -53,17 +100,229 @@ def dijkstra(ville_depart, ville_arrive, matrix=None, labels=None):
                     predecesseurs[v] = u
                     heapq.heappush(file_prioritaire, (distance, v))
 
-    # Reconstruction du chemin 
-    if distances[arr] == float('inf'):
+    return _arbre_ou_erreur(dep, arr, distances, predecesseurs, ville_depart, ville_arrive, labels)
+
+
+def _arbre_ou_erreur(dep, arr, distances, predecesseurs, ville_depart, ville_arrive, labels):
+    """ArbreChemins du calcul, ou message d'erreur si l'arrivée n'est pas atteinte."""
+    if arr != -1 and distances[arr] == float('inf'):
         return f"Aucun chemin entre {ville_depart} et {ville_arrive}"
 
-    chemin = []
-    etape = arr
-    while etape != -1:
-        chemin.insert(0, labels[etape])
-        etape = predecesseurs[etape]
+    return ArbreChemins(dep, labels, distances, predecesseurs)
+
+
+def dijkstra(ville_depart, ville_arrive, matrix=None, labels=None):
+    """
+    Calcule le plus court chemin entre deux villes.
+    Utilise matrix et labels s'ils sont fournis, sinon ceux de Matrice.py.
+    """
+    arbre = arbre_dijkstra(ville_depart, matrix=matrix, labels=labels, ville_arrive=ville_arrive)
+    if isinstance(arbre, str):
+        return arbre
 
     return {
-        "chemin": " -> ".join(chemin),
-        "distance_totale": distances[arr]
-    }
\ No newline at end of file
+        "chemin": " -> ".join(arbre.chemin(ville_arrive)),
+        "distance_totale": arbre.distance(ville_arrive)
+    }
+
+
+def dijkstra_multi_sources(villes_sources, matrix=None, labels=None, vers_sources=False):
+    """
+    Dijkstra multi-sources : rattache chaque ville à l'installation la plus proche.
+
+    Toutes les sources sont placées dans la file à distance 0 ; un seul
+    parcours en O(E log V) remplace les F × N appels à dijkstra.
+
+    Args:
+        villes_sources (list[str]): Installations (dépôts, entrepôts...)
+        matrix, labels: Graphe (valeurs de Matrice.py par défaut)
+        vers_sources (bool): Si True, mesure la distance de la ville vers
+            l'installation (arcs inversés) plutôt que l'inverse.
+
+    Returns:
+        dict: {
+            'plus_proche': dict[str, str | None],   # installation la plus proche
+            'distances': dict[str, float],          # distance à cette installation
+            'predecesseurs': dict[str, str | None]  # sommet précédent sur le chemin
+        } ou {'error': str}
+    """
+    if matrix is None:
+        matrix = default_M
+    if labels is None:
+        labels = default_villes
+
+    n = len(labels)
+    inconnues = [v for v in villes_sources if v not in labels]
+    if inconnues or not villes_sources:
+        return {"error": f"Installations inconnues ou absentes : {', '.join(inconnues)}"}
+
+    succ = liste_successeurs(matrix, n, positifs=True)
+    if vers_sources:
+        inverse = [dict() for _ in range(n)]
+        for u in range(n):
+            for v, poids in succ[u].items():
+                inverse[v][u] = poids
+        succ = inverse
+
+    distances = [float('inf')] * n
+    origine = [-1] * n
+    predecesseurs = [-1] * n
+
+    sources = [labels.index(ville) for ville in villes_sources]
+    for s in sources:
+        distances[s] = 0
+        origine[s] = s
+
+    poids_max = poids_max_entier(matrix, positifs=True)
+    if poids_max is not None:
+        # Poids entiers : seaux de Dial ou tas radix (files_priorite.py)
+        succ = [{v: int(w) for v, w in voisins.items()} for voisins in succ]
+        file = file_entiere(poids_max)
+        for s in sources:
+            file.ajouter(0, s)
+        while file:
+            u = file.extraire()
+            dist_actuelle = file.courant
+            if dist_actuelle > distances[u]:
+                continue
+            for v, poids in succ[u].items():
+                distance = dist_actuelle + poids
+                if distance < distances[v]:
+                    distances[v] = distance
+                    origine[v] = origine[u]
+                    predecesseurs[v] = u
+                    file.ajouter(distance, v)
+        distances = [float(d) for d in distances]
+    else:
+        # File de priorité initialisée avec toutes les installations
+        file_prioritaire = [(0, s) for s in sources]
+        heapq.heapify(file_prioritaire)
+
+        while file_prioritaire:
+            dist_actuelle, u = heapq.heappop(file_prioritaire)
+            if dist_actuelle > distances[u]:
+                continue
+            for v, poids in succ[u].items():
+                distance = dist_actuelle + poids
+                if distance < distances[v]:
+                    distances[v] = distance
+                    origine[v] = origine[u]
+                    predecesseurs[v] = u
+                    heapq.heappush(file_prioritaire, (distance, v))
+
+    return {
+        "plus_proche": {ville: (labels[origine[i]] if origine[i] != -1 else None) for i, ville in enumerate(labels)},
+        "distances": {ville: distances[i] for i, ville in enumerate(labels)},
+        "predecesseurs": {ville: (labels[predecesseurs[i]] if predecesseurs[i] != -1 else None)
+                          for i, ville in enumerate(labels)}
+    }
+
+
+def distances_csr(src, indptr, indices, poids, n, poids_max=None):
+    """
+    Dijkstra complet depuis src sur un graphe CSR (tableaux numpy).
+
+    poids_max (résultat de poids_max_entier sur poids) active la file entière.
+    """
+    distances = [float('inf')] * n
+    distances[src] = 0
+    if poids_max is not None:
+        file = file_entiere(poids_max)
+        file.ajouter(0, src)
+        while file:
+            u = file.extraire()
+            dist_actuelle = file.courant
+            if dist_actuelle > distances[u]:
+                continue
+            debut, fin = indptr[u], indptr[u + 1]
+            for v, w in zip(indices[debut:fin].tolist(), poids[debut:fin].astype(np.int64).tolist()):
+                distance = dist_actuelle + w
+                if distance < distances[v]:
+                    distances[v] = distance
+                    file.ajouter(distance, v)
+        return distances
+    file_prioritaire = [(0, src)]
+    while file_prioritaire:
+        dist_actuelle, u = heapq.heappop(file_prioritaire)
+        if dist_actuelle > distances[u]:
+            continue
+        debut, fin = indptr[u], indptr[u + 1]
+        for v, w in zip(indices[debut:fin].tolist(), poids[debut:fin].tolist()):
+            distance = dist_actuelle + w
+            if distance < distances[v]:
+                distances[v] = distance
+                heapq.heappush(file_prioritaire, (distance, v))
+    return distances
+
+
+def _tache_sources(descripteurs, sources):
+    """Calcule les lignes des sources données, directement dans la matrice partagée (worker du pool)."""
+    with memoire_partagee.attaches(descripteurs) as partage:
+        indptr, indices, poids = partage['indptr'], partage['indices'], partage['poids']
+        resultat = partage['resultat']
+        n = resultat.shape[0]
+        poids_max = poids_max_entier(poids)
+        for src in sources:
+            resultat[src] = distances_csr(src, indptr, indices, poids, n, poids_max)
+        del indptr, indices, poids, resultat
+
+
+def dijkstra_tous_couples(matrix=None, labels=None, workers=None):
+    """
+    Distances entre toutes les paires par un Dijkstra depuis chaque source.
+
+    Sur un graphe creux à poids positifs, c'est plus rapide que
+    Floyd-Warshall (O(V · E log V) au lieu de O(V³)). Les sources étant
+    indépendantes, le graphe (CSR) est placé une fois en mémoire partagée
+    et les sources sont réparties sur le pool commun de processus
+    (memoire_partagee.calcul_parallele), chacun écrivant ses lignes
+    directement dans la matrice résultat partagée.
+
+    Args:
+        matrix, labels: Graphe (valeurs de Matrice.py par défaut)
+        workers (int, optional): Parallélisme visé (tous les cœurs par défaut).
+            Les petits graphes (< SEUIL_PARALLELE sommets) restent dans le
+            processus courant.
+
+    Returns:
+        numpy.ndarray: Matrice des distances minimales (n x n), inf si aucun chemin
+    """
+    if matrix is None:
+        matrix = default_M
+    if labels is None:
+        labels = default_villes
+
+    n = len(labels)
+    workers = memoire_partagee.nb_workers(workers)
+    graphe = registre_graphes.graphe_partage(matrix, labels, positifs=True)
+    indptr, indices, poids = graphe.csr
+
+    if n < SEUIL_PARALLELE or workers == 1:
+        poids_max = poids_max_entier(poids)
+        resultat = np.empty((n, n), dtype=np.float64)
+        for src in range(n):
+            resultat[src] = distances_csr(src, indptr, indices, poids, n, poids_max)
+        return resultat
+
+    if graphe.descripteurs is not None:
+        # Graphe déjà en mémoire partagée (registre) : les workers s'y attachent
+        segments, descripteurs, vues = [], dict(graphe.descripteurs), {}
+    else:
+        segments, descripteurs, vues = memoire_partagee.partager({
+            'indptr': indptr, 'indices': indices, 'poids': poids,
+        })
+    try:
+        # La matrice résultat est créée directement en mémoire partagée (pas de copie n x n)
+        shm, vues['resultat'] = memoire_partagee.creer_tableau((n, n), np.float64)
+        segments.append(shm)
+        descripteurs['resultat'] = (shm.name, (n, n), np.dtype(np.float64).str)
+
+        # Petits paquets de sources, entrelacés pour équilibrer la charge
+        paquets = [list(range(debut, n, 4 * workers)) for debut in range(4 * workers)]
+        with memoire_partagee.calcul_parallele() as pool:
+            list(pool.map(partial(_tache_sources, descripteurs), paquets))
+        return vues['resultat'].copy()
+    finally:
+        vues.clear()
+        for shm in segments:
+            memoire_partagee.liberer(shm)
@@ -0,0 +1,128 @@
+import numpy as np
+
+# Au-delà de ce poids maximal, les seaux de Dial deviennent trop nombreux : tas radix
+SEUIL_SEAUX = 4096
+
+
+def poids_max_entier(matrix, positifs=False):
+    """
+    Plus grand poids du graphe s'ils sont tous entiers et positifs ou nuls,
+    sinon None (les files entières ne s'appliquent pas).
+
+    Hors tableau numpy, la matrice est lue ligne par ligne : pas de copie
+    n x n (listes de listes, versions_graphe.MatriceSuperposee).
+
+    Args:
+        positifs (bool): Ne considérer que les poids > 0 (ceux que Dijkstra
+            utilise) ; sinon un poids négatif exclut les files entières.
+    """
+    if isinstance(matrix, np.ndarray):
+        lignes = (matrix,)
+    else:
+        lignes = (matrix[u] for u in range(len(matrix)))
+    poids_max = 0
+    for ligne in lignes:
+        M = np.asarray(ligne, dtype=np.float64)
+        poids = M[(M != 0) & np.isfinite(M)]
+        if positifs:
+            poids = poids[poids > 0]
+        elif np.any(poids < 0):
+            return None
+        if not np.all(poids == np.floor(poids)):
+            return None
+        if len(poids):
+            poids_max = max(poids_max, int(poids.max()))
+    return poids_max
+
+
+class FileSeaux:
+    """
+    File de priorité à seaux pour des clés entières (Dial) : un seau par
+    valeur de clé, sans tas ni tuple ; ajouter et extraire sont en O(1)
+    amorti, plus le parcours des seaux vides.
+
+    - monotone (Dijkstra) : les clés ajoutées restent dans
+      [courant, courant + cle_max] ; cle_max + 1 seaux utilisés en anneau.
+    - non monotone (Prim) : clés dans [0, cle_max], une clé plus petite
+      que la courante fait simplement reculer le curseur.
+
+    Les doublons (clé améliorée) restent dans la file : l'appelant ignore
+    un sommet extrait dont la clé courante n'est plus la sienne.
+    """
+
+    def __init__(self, cle_max, monotone=True):
+        self.taille = cle_max + 1
+        self.seaux = [[] for _ in range(self.taille)]
+        self.monotone = monotone
+        self.courant = 0    # Clé du dernier élément extrait
+        self.nombre = 0
+
+    def __len__(self):
+        return self.nombre
+
+    def ajouter(self, cle, valeur):
+        if not self.monotone and cle < self.courant:
+            self.courant = cle
+        self.seaux[cle % self.taille].append(valeur)
+        self.nombre += 1
+
+    def extraire(self):
+        """Valeur de plus petite clé (la clé est alors dans self.courant)."""
+        seaux, taille = self.seaux, self.taille
+        while not seaux[self.courant % taille]:
+            self.courant += 1
+        self.nombre -= 1
+        return seaux[self.courant % taille].pop()
+
+
+class TasRadix:
+    """
+    Tas radix pour des clés entières monotones (Dijkstra à grands poids) :
+    le seau i contient les clés dont le bit de poids fort différant du
+    dernier minimum extrait est le (i-1)-ème. Chaque clé descend de seau au
+    plus une fois par bit, d'où O(log C) amorti par élément, sans comparaison
+    de tuples.
+    """
+
+    def __init__(self):
+        self.cles = [[]]
+        self.valeurs = [[]]
+        self.courant = 0    # Dernier minimum extrait
+        self.nombre = 0
+
+    def __len__(self):
+        return self.nombre
+
+    def ajouter(self, cle, valeur):
+        i = (cle ^ self.courant).bit_length()
+        while i >= len(self.cles):
+            self.cles.append([])
+            self.valeurs.append([])
+        self.cles[i].append(cle)
+        self.valeurs[i].append(valeur)
+        self.nombre += 1
+
+    def extraire(self):
+        """Valeur de plus petite clé (la clé est alors dans self.courant)."""
+        if not self.cles[0]:
+            i = 1
+            while not self.cles[i]:
+                i += 1
+            cles, valeurs = self.cles[i], self.valeurs[i]
+            self.cles[i], self.valeurs[i] = [], []
+            # Nouveau minimum : tout le seau se répartit dans des seaux inférieurs
+            self.courant = min(cles)
+            for cle, valeur in zip(cles, valeurs):
+                j = (cle ^ self.courant).bit_length()
+                self.cles[j].append(cle)
+                self.valeurs[j].append(valeur)
+        self.nombre -= 1
+        self.cles[0].pop()
+        return self.valeurs[0].pop()
+
+
+def file_entiere(poids_max):
+    """File adaptée aux plus courts chemins à poids entiers bornés par poids_max."""
+    if poids_max <= SEUIL_SEAUX:
+        return FileSeaux(poids_max)
+    return TasRadix()
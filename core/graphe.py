@@ -0,0 +1,220 @@
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .Matrice import villes as default_villes, M as default_M
+
+
+def est_arete(poids):
+    """Une arête existe si son poids n'est ni nul, ni infini, ni absent."""
+    return poids is not None and poids != 0 and poids != float('inf')
+
+
+def resoudre_graphe(matrix=None, labels=None):
+    """
+    Applique les valeurs par défaut de Matrice.py, comme le font les algorithmes.
+
+    Returns:
+        tuple: (matrix, labels)
+    """
+    if matrix is None:
+        matrix = default_M
+    if labels is None:
+        labels = default_villes
+    return matrix, labels
+
+
+def liste_successeurs(matrix, n, positifs=False):
+    """
+    Construit la liste d'adjacence sortante à partir de la matrice.
+
+    Args:
+        matrix: Matrice d'adjacence (liste de listes ou tableau numpy)
+        n (int): Nombre de sommets
+        positifs (bool): Si True, ignore les poids négatifs (comme Dijkstra)
+
+    Returns:
+        list[dict[int, float]]: succ[u] = {v: poids}
+    """
+    succ = [dict() for _ in range(n)]
+    for u in range(n):
+        ligne = matrix[u]
+        for v in range(n):
+            poids = ligne[v]
+            if est_arete(poids) and (not positifs or poids > 0):
+                succ[u][v] = float(poids)
+    return succ
+
+
+def construire_csr(matrix, n, positifs=False):
+    """
+    Représentation CSR (Compressed Sparse Row) du graphe, en tableaux numpy :
+    les successeurs de u sont indices[indptr[u]:indptr[u + 1]], avec les
+    poids correspondants dans poids. Compacte et partageable entre processus.
+
+    Returns:
+        tuple: (indptr int64, indices int32, poids float64)
+    """
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    lignes_indices, lignes_poids = [], []
+    for u in range(n):
+        ligne = np.asarray(matrix[u], dtype=np.float64)
+        present = (ligne != 0) & np.isfinite(ligne)
+        if positifs:
+            present &= ligne > 0
+        voisins = np.flatnonzero(present)
+        lignes_indices.append(voisins.astype(np.int32))
+        lignes_poids.append(ligne[voisins])
+        indptr[u + 1] = indptr[u] + len(voisins)
+    indices = np.concatenate(lignes_indices) if n else np.zeros(0, dtype=np.int32)
+    poids = np.concatenate(lignes_poids) if n else np.zeros(0, dtype=np.float64)
+    return indptr, indices, poids
+
+
+def transposer_csr(indptr, indices, poids, n):
+    """CSR du graphe inversé (prédécesseurs au lieu de successeurs)."""
+    sources = np.repeat(np.arange(n, dtype=np.int32), np.diff(indptr))
+    ordre = np.argsort(indices, kind='stable')
+    indptr_t = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(indices, minlength=n), out=indptr_t[1:])
+    return indptr_t, sources[ordre], poids[ordre]
+
+
+def empreinte_graphe(matrix, labels):
+    """
+    Calcule une empreinte stable (SHA-1) d'un graphe.
+
+    La même matrice donne la même empreinte qu'elle soit fournie sous forme
+    de liste de listes, de tableau numpy ou de matrice superposée
+    (versions_graphe), qui la calcule ligne par ligne et la mémorise.
+    Les lignes sont converties une à une : pas de copie n x n en float64.
+    """
+    if hasattr(matrix, 'empreinte'):
+        return matrix.empreinte(labels)
+    h = hashlib.sha1()
+    h.update("\x1f".join(labels).encode("utf-8"))
+    if isinstance(matrix, np.ndarray) and matrix.dtype == np.float64 and matrix.flags.c_contiguous:
+        h.update(matrix)
+    else:
+        for ligne in matrix:
+            h.update(np.ascontiguousarray(ligne, dtype=np.float64))
+    return h.hexdigest()
+
+
+def identifiant_version(precedent, evenements):
+    """
+    Identifiant de la version obtenue en appliquant des événements à une
+    structure maintenue (chaque lot d'événements produit une nouvelle version).
+    """
+    if not evenements:
+        return precedent
+    suffixe = json.dumps(evenements, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1((precedent + suffixe).encode("utf-8")).hexdigest()
+
+
+TYPES_EVENEMENTS = ('inserer', 'supprimer', 'modifier')
+
+
+def lire_evenements(evenements, index):
+    """
+    Valide une liste d'événements de mise à jour d'arcs, au format :
+        {'type': 'inserer' | 'supprimer' | 'modifier',
+         'de': str, 'vers': str, 'poids': float}
+
+    Tout est vérifié avant qu'un appelant ne modifie sa structure : un lot
+    invalide n'est jamais appliqué à moitié.
+
+    Args:
+        evenements (list[dict]): Événements reçus
+        index (dict[str, int]): Position de chaque ville
+
+    Returns:
+        list[tuple]: (u, v, poids), poids valant None pour une suppression
+
+    Raises:
+        ValueError: Événement invalide (forme, type, ville ou poids)
+    """
+    if not isinstance(evenements, list):
+        raise ValueError("Les événements doivent être une liste.")
+    arcs = []
+    for ev in evenements:
+        if not isinstance(ev, dict):
+            raise ValueError("Chaque événement doit être un objet {type, de, vers, poids}.")
+        if ev.get('type') not in TYPES_EVENEMENTS:
+            raise ValueError(f"Type d'événement inconnu : {ev.get('type')}")
+        try:
+            u, v = index[ev['de']], index[ev['vers']]
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Ville inconnue dans les événements : {e}")
+        poids = None
+        if ev['type'] != 'supprimer':
+            try:
+                poids = float(ev['poids'])
+            except (KeyError, TypeError, ValueError):
+                poids = float('nan')
+            if not math.isfinite(poids):
+                raise ValueError(f"Poids invalide pour l'arc {ev['de']} -> {ev['vers']}")
+        arcs.append((u, v, poids))
+    return arcs
+
+
+class CacheLRU:
+    """
+    Petit cache LRU thread-safe, partagé par les structures pré-calculées
+    (arbres dynamiques, index, repères...).
+
+    Borné en nombre d'entrées, et en octets si octets_max est donné : taille
+    (valeur) mesure chaque valeur, et une valeur plus grande que tout le
+    budget n'est pas conservée.
+    """
+
+    def __init__(self, taille_max=32, octets_max=None, taille=None):
+        self.taille_max = taille_max
+        self.octets_max = octets_max
+        self.taille = taille
+        self.octets = 0
+        self._donnees = OrderedDict()
+        self._tailles = {}
+        self._verrou = threading.Lock()
+
+    def get(self, cle):
+        with self._verrou:
+            if cle not in self._donnees:
+                return None
+            self._donnees.move_to_end(cle)
+            return self._donnees[cle]
+
+    def put(self, cle, valeur):
+        octets = self.taille(valeur) if self.octets_max is not None else 0
+        with self._verrou:
+            self._retirer(cle)
+            if self.octets_max is not None and octets > self.octets_max:
+                return
+            self._donnees[cle] = valeur
+            self._tailles[cle] = octets
+            self.octets += octets
+            while len(self._donnees) > self.taille_max or \
+                    (self.octets_max is not None and self.octets > self.octets_max):
+                self._retirer(next(iter(self._donnees)))
+
+    def pop(self, cle):
+        with self._verrou:
+            return self._retirer(cle)
+
+    def _retirer(self, cle):
+        if cle not in self._donnees:
+            return None
+        self.octets -= self._tailles.pop(cle)
+        return self._donnees.pop(cle)
+
+    def get_ou_calcule(self, cle, fabrique):
+        """Renvoie la valeur en cache ou la calcule avec fabrique() et la stocke."""
+        valeur = self.get(cle)
+        if valeur is None:
+            valeur = fabrique()
+            self.put(cle, valeur)
+        return valeur
@@ -0,0 +1,174 @@
+import heapq
+
+from .accessibilite import sans_chemin
+from .graphe import resoudre_graphe, liste_successeurs
+
+NB_CHEMINS_DEFAUT = 3
+
+# Plafond de k accepté d'un client (réglage GRAPHE_NB_CHEMINS_MAX)
+NB_CHEMINS_MAX = 50
+
+
+def _arbre_vers_cible(pred, cible, n):
+    """
+    Arbre inverse des plus courts chemins vers la cible.
+
+    Returns:
+        tuple: (distances, suivant) où distances[v] = d(v, cible) et suivant[v]
+            est le sommet qui suit v sur son plus court chemin vers la cible.
+    """
+    distances = [float('inf')] * n
+    suivant = [-1] * n
+    distances[cible] = 0
+    file_prioritaire = [(0, cible)]
+    while file_prioritaire:
+        dist_actuelle, v = heapq.heappop(file_prioritaire)
+        if dist_actuelle > distances[v]:
+            continue
+        for u, poids in pred[v].items():
+            distance = dist_actuelle + poids
+            if distance < distances[u]:
+                distances[u] = distance
+                suivant[u] = v
+                heapq.heappush(file_prioritaire, (distance, u))
+    return distances, suivant
+
+
+def k_plus_courts_chemins(ville_depart, ville_arrive, k=NB_CHEMINS_DEFAUT, matrix=None, labels=None):
+    """
+    Les k plus courts chemins élémentaires (sans boucle) par l'algorithme de Yen.
+
+    L'arbre inverse des plus courts chemins vers la cible est calculé une seule
+    fois et réutilisé à chaque déviation :
+      - d(v, cible) dans le graphe complet minore le coût de toute déviation
+        depuis v (retirer des arcs ne raccourcit rien) : il sert d'heuristique
+        A* et permet d'écarter les déviations qui ne peuvent plus entrer dans
+        les k meilleurs ;
+      - si le chemin de l'arbre depuis le sommet de déviation évite les arcs
+        et sommets interdits, il est directement la meilleure déviation.
+
+    Args:
+        ville_depart (str): Ville de départ
+        ville_arrive (str): Ville d'arrivée
+        k (int): Nombre de chemins souhaités
+        matrix, labels: Graphe (valeurs de Matrice.py par défaut)
+
+    Returns:
+        dict: {'chemins': list[{'chemin': list[str], 'distance': float}]}
+            (au plus k, par distance croissante) ou {'error': str}
+    """
+    matrix, labels = resoudre_graphe(matrix, labels)
+    n = len(labels)
+
+    try:
+        dep = labels.index(ville_depart)
+        arr = labels.index(ville_arrive)
+    except ValueError:
+        return {"error": f"Une des villes ({ville_depart}, {ville_arrive}) n'existe pas dans la liste des labels."}
+
+    # Paire sans chemin : réponse en O(1), sans construire le graphe ni l'arbre inverse
+    if sans_chemin(matrix, labels, dep, arr):
+        return {"error": f"Aucun chemin entre {ville_depart} et {ville_arrive}"}
+
+    succ = liste_successeurs(matrix, n, positifs=True)
+    pred = [dict() for _ in range(n)]
+    for u in range(n):
+        for v, poids in succ[u].items():
+            pred[v][u] = poids
+
+    # 1. Arbre inverse vers la cible (calculé une fois pour toutes les déviations)
+    h, suivant = _arbre_vers_cible(pred, arr, n)
+    if h[dep] == float('inf'):
+        return {"error": f"Aucun chemin entre {ville_depart} et {ville_arrive}"}
+
+    def chemin_arbre(v):
+        chemin = [v]
+        while chemin[-1] != arr:
+            chemin.append(suivant[chemin[-1]])
+        return chemin
+
+    def deviation(spur, interdits, arcs_interdits, limite):
+        """Meilleur chemin spur -> cible hors interdits, de coût < limite (ou None)."""
+        # Réutilisation de l'arbre : le chemin optimal global est encore permis
+        chemin = chemin_arbre(spur)
+        if (spur, chemin[1]) not in arcs_interdits and not interdits.intersection(chemin):
+            return (h[spur], chemin) if h[spur] < limite else None
+
+        # Sinon A* dans le graphe restreint, guidé par h
+        distances = {spur: 0}
+        precedent = {spur: -1}
+        file_prioritaire = [(h[spur], spur)]
+        fermes = set()
+        while file_prioritaire:
+            f, u = heapq.heappop(file_prioritaire)
+            if f >= limite:
+                return None  # Élagage : ne peut plus entrer dans les k meilleurs
+            if u in fermes:
+                continue
+            fermes.add(u)
+            if u == arr:
+                chemin = []
+                while u != -1:
+                    chemin.append(u)
+                    u = precedent[u]
+                chemin.reverse()
+                return distances[arr], chemin
+            for v, poids in succ[u].items():
+                if v in interdits or (u, v) in arcs_interdits or h[v] == float('inf'):
+                    continue
+                distance = distances[u] + poids
+                if distance < distances.get(v, float('inf')):
+                    distances[v] = distance
+                    precedent[v] = u
+                    heapq.heappush(file_prioritaire, (distance + h[v], v))
+        return None
+
+    # 2. Algorithme de Yen
+    premier = chemin_arbre(dep)
+    trouves = [(h[dep], premier)]
+    candidats = []          # Tas de (distance, chemin)
+    deja_vus = {tuple(premier)}
+
+    while len(trouves) < k:
+        _, precedent_chemin = trouves[-1]
+        cout_racine = 0
+
+        for i in range(len(precedent_chemin) - 1):
+            spur = precedent_chemin[i]
+            racine = precedent_chemin[:i + 1]
+            if i > 0:
+                cout_racine += succ[precedent_chemin[i - 1]][spur]
+
+            # Seuil : coût du candidat qui serait le dernier retenu
+            manquants = k - len(trouves)
+            limite = float('inf')
+            if len(candidats) >= manquants:
+                limite = heapq.nsmallest(manquants, candidats)[-1][0] - cout_racine
+            if h[spur] >= limite:
+                continue
+
+            arcs_interdits = set()
+            for _, chemin in trouves:
+                if chemin[:i + 1] == racine and len(chemin) > i + 1:
+                    arcs_interdits.add((spur, chemin[i + 1]))
+            interdits = set(racine[:-1])
+
+            res = deviation(spur, interdits, arcs_interdits, limite)
+            if res is None:
+                continue
+            cout_dev, chemin_dev = res
+            chemin_total = racine[:-1] + chemin_dev
+            if tuple(chemin_total) not in deja_vus:
+                deja_vus.add(tuple(chemin_total))
+                heapq.heappush(candidats, (cout_racine + cout_dev, chemin_total))
+
+        if not candidats:
+            break
+        trouves.append(heapq.heappop(candidats))
+
+    return {
+        "chemins": [
+            {"chemin": [labels[i] for i in chemin], "distance": distance}
+            for distance, chemin in trouves
+        ]
+    }
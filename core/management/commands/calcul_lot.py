@@ -0,0 +1,170 @@
+import contextlib
+import hashlib
+import itertools
+import json
+import re
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+
+from django.core.management.base import BaseCommand
+
+from core import views, memoire_partagee
+from core.coalescence import avec_etat, cle_requete
+from core.graphe import CacheLRU
+
+TAILLE_LOT_DEFAUT = 64
+# Graphes dont un lot incomplet attend en mémoire (au-delà, le plus ancien part tel quel)
+GRAPHES_EN_ATTENTE_MAX = 64
+# Lots soumis et non terminés, par processus (le fichier est lu au rythme du calcul)
+LOTS_EN_VOL_PAR_WORKER = 2
+
+_ESPACES = re.compile(r'\s+')
+
+# Graphes déjà lus par ce processus (clé : empreinte du texte de la matrice et des labels)
+_graphes = CacheLRU(taille_max=8)
+
+
+def _cle_graphe(data):
+    matrice = data.get('matrix') or ''
+    labels = data.get('labels') or ''
+    if isinstance(matrice, str):
+        matrice = _ESPACES.sub('', matrice)
+    texte = json.dumps([matrice, labels], sort_keys=True, default=str)
+    return hashlib.sha1(texte.encode('utf-8')).hexdigest()
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def _traiter_lot(args):
+    """
+    Exécute un lot de requêtes portant sur le même graphe, lu une seule fois
+    par processus. Les requêtes identiques du lot ne sont calculées qu'une fois.
+
+    Returns:
+        list[tuple]: (numéro de ligne, réponse)
+    """
+    cle, matrice, labels, requetes = args
+    graphe = _graphes.get_ou_calcule(cle, lambda: views.lire_graphe({'matrix': matrice, 'labels': labels}))
+    deja_calculees = {}
+    resultats = []
+    # Les affichages des algorithmes (PERT) ne doivent pas se mêler au flux JSONL
+    with contextlib.redirect_stdout(sys.stderr):
+        for ligne, data in requetes:
+            cle_req = cle_requete(data)
+            if cle_req not in deja_calculees:
+                deja_calculees[cle_req] = views.executer_requete(data, graphe)
+            resultats.append((ligne, deja_calculees[cle_req]))
+    return resultats
+
+
+class Command(BaseCommand):
+    help = ("Exécute un fichier JSONL de requêtes (même format que le corps de /api/calculer/) "
+            "sur tous les cœurs, sans passer par le serveur web, et écrit les réponses en JSONL.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('entree', nargs='?', default='-',
+                            help="Fichier JSONL de requêtes ('-' pour l'entrée standard)")
+        parser.add_argument('--sortie', default='-',
+                            help="Fichier JSONL des réponses ('-' pour la sortie standard)")
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Nombre de processus (tous les cœurs par défaut)")
+        parser.add_argument('--taille-lot', type=int, default=TAILLE_LOT_DEFAUT,
+                            help="Nombre de requêtes d'un même graphe envoyées ensemble à un processus")
+
+    def handle(self, *args, **options):
+        debut = time.perf_counter()
+        entree = sys.stdin if options['entree'] == '-' else open(options['entree'], encoding='utf-8')
+        sortie = self.stdout if options['sortie'] == '-' else open(options['sortie'], 'w', encoding='utf-8')
+        self.nb_requetes = 0
+        self.graphes = set()
+
+        try:
+            with entree:
+                lots = self._lots(entree, sortie, max(1, options['taille_lot']))
+                # Pas de pool pour un fichier qui tient en moins d'un lot par processus
+                workers = memoire_partagee.nb_workers(options['workers'])
+                premiers = list(itertools.islice(lots, workers))
+                workers = max(1, min(workers, len(premiers)))
+                self._executer(itertools.chain(premiers, lots), workers, sortie)
+        finally:
+            if sortie is not self.stdout:
+                sortie.close()
+
+        duree = time.perf_counter() - debut
+        debit = self.nb_requetes / duree if duree > 0 else 0
+        self.stderr.write(f"{self.nb_requetes} requêtes, {len(self.graphes)} graphes, "
+                          f"{workers if premiers else 0} processus : {duree:.2f} s ({debit:.1f} requêtes/s)")
+
+    def _lots(self, entree, sortie, taille_lot):
+        """
+        Lit le fichier ligne à ligne et produit les lots (clé, matrice, labels,
+        [(ligne, requête sans le graphe)]) au fil de la lecture : un lot part
+        dès qu'il est plein, ou quand trop de graphes ont un lot en attente.
+        Les lignes invalides et les requêtes avec état (arbre_id, versions de
+        graphe : à exécuter dans l'ordre du fichier, dans le processus qui
+        détient l'état) sont traitées sur place, dans ce processus.
+        """
+        en_attente = OrderedDict()     # cle -> (cle, matrice, labels, requêtes)
+        for ligne, texte in enumerate(entree, start=1):
+            if not texte.strip():
+                continue
+            self.nb_requetes += 1
+            try:
+                data = json.loads(texte)
+                if not isinstance(data, dict):
+                    raise ValueError("la requête doit être un objet JSON")
+            except ValueError as e:
+                self._ecrire(sortie, ligne, {'status': 'error', 'error': f"Requête invalide : {e}"})
+                continue
+            if avec_etat(data):
+                with contextlib.redirect_stdout(sys.stderr):
+                    self._ecrire(sortie, ligne, views.executer_requete(data))
+                continue
+
+            cle = _cle_graphe(data)
+            self.graphes.add(cle)
+            if cle not in en_attente:
+                en_attente[cle] = (cle, data.get('matrix'), data.get('labels', ''), [])
+            requetes = en_attente[cle][3]
+            requetes.append((ligne, {k: v for k, v in data.items() if k not in ('matrix', 'labels')}))
+            if len(requetes) >= taille_lot:
+                yield en_attente.pop(cle)
+            elif len(en_attente) > GRAPHES_EN_ATTENTE_MAX:
+                yield en_attente.popitem(last=False)[1]
+        yield from en_attente.values()
+
+    def _executer(self, lots, workers, sortie):
+        """Exécute les lots, avec au plus LOTS_EN_VOL_PAR_WORKER lots en cours par processus."""
+        if workers == 1:
+            for lot in lots:
+                for ligne, reponse in _traiter_lot(lot):
+                    self._ecrire(sortie, ligne, reponse)
+            return
+
+        # pool.map lirait tout le fichier d'avance : les lots sont soumis au fil des résultats
+        limite = workers * LOTS_EN_VOL_PAR_WORKER
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            en_cours = set()
+            for lot in lots:
+                if len(en_cours) >= limite:
+                    termines, en_cours = wait(en_cours, return_when=FIRST_COMPLETED)
+                    self._ecrire_lots(sortie, termines)
+                en_cours.add(pool.submit(_traiter_lot, lot))
+            self._ecrire_lots(sortie, as_completed(en_cours))
+
+    def _ecrire_lots(self, sortie, futurs):
+        for futur in futurs:
+            for ligne, reponse in futur.result():
+                self._ecrire(sortie, ligne, reponse)
+
+    def _ecrire(self, sortie, ligne, reponse):
+        texte = json.dumps({'ligne': ligne, 'reponse': reponse}, ensure_ascii=False)
+        if sortie is self.stdout:
+            sortie.write(texte)
+        else:
+            sortie.write(texte + '\n')
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import precalcul
+
+
+class Command(BaseCommand):
+    help = ("Précalcule (ou relit) les réponses du graphe par défaut et les enregistre sur disque, "
+            "pour que le serveur n'ait pas à les calculer à sa première requête.")
+
+    def handle(self, *args, **options):
+        table = precalcul.initialiser()
+        if table is None:
+            raise CommandError("Précalcul impossible (voir le journal).")
+        self.stdout.write(f"{len(table.reponses)} réponses précalculées pour {table.n} villes "
+                          f"dans {precalcul._dossier()}")
@@ -0,0 +1,128 @@
+import json
+import math
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+
+def percentile(valeurs_triees, p):
+    """Percentile p (0-100) par la méthode du rang le plus proche."""
+    if not valeurs_triees:
+        return float('nan')
+    rang = max(1, math.ceil(p / 100 * len(valeurs_triees)))
+    return valeurs_triees[rang - 1]
+
+
+class _ClientLocal:
+    """Client de test Django (dans le processus), un par thread."""
+
+    def __init__(self):
+        from django.test import Client
+        self.client = Client()
+
+    def envoyer(self, methode, chemin, corps):
+        if methode == 'GET':
+            r = self.client.get(chemin)
+        else:
+            r = self.client.post(chemin, data=corps, content_type='application/json')
+        return r.status_code, r.content
+
+
+class _ClientHttp:
+    """Client HTTP vers un serveur lancé à part (jeton CSRF lu sur la page d'accueil)."""
+
+    def __init__(self, serveur):
+        self.serveur = serveur.rstrip('/')
+        self.cookies = CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+        self.opener.open(self.serveur + '/').read()
+        self.csrf = next((c.value for c in self.cookies if c.name == 'csrftoken'), '')
+
+    def envoyer(self, methode, chemin, corps):
+        requete = urllib.request.Request(
+            self.serveur + chemin, method=methode,
+            data=corps.encode('utf-8') if methode != 'GET' else None,
+            headers={'Content-Type': 'application/json', 'X-CSRFToken': self.csrf, 'Referer': self.serveur + '/'})
+        try:
+            with self.opener.open(requete) as r:
+                return r.status, r.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+
+class Command(BaseCommand):
+    help = ("Rejoue un trafic enregistré par core.middleware.CaptureTrafic, à concurrence et débit "
+            "donnés, et affiche le débit et les latences p50/p95/p99 par algorithme.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('fichier', help="Fichier JSONL produit par CaptureTrafic")
+        parser.add_argument('--concurrence', type=int, default=8, help="Requêtes simultanées")
+        parser.add_argument('--debit', type=float, default=0,
+                            help="Requêtes par seconde visées (0 : aussi vite que possible)")
+        parser.add_argument('--repetitions', type=int, default=1, help="Nombre de passes sur le fichier")
+        parser.add_argument('--serveur', default=None,
+                            help="URL d'un serveur lancé à part (client de test Django par défaut)")
+
+    def handle(self, *args, **options):
+        with open(options['fichier'], encoding='utf-8') as f:
+            trafic = [json.loads(ligne) for ligne in f if ligne.strip()]
+        trafic = trafic * max(1, options['repetitions'])
+        if not trafic:
+            raise CommandError("Aucune requête à rejouer.")
+
+        serveur = options['serveur']
+        clients = threading.local()
+        debit = options['debit']
+        mesures = defaultdict(list)      # algo -> latences (s)
+        erreurs = defaultdict(int)
+        verrou = threading.Lock()
+
+        def rejouer(i, enregistrement):
+            if debit > 0:
+                # Départ planifié : la i-ème requête part à i / debit secondes
+                attente = debut + i / debit - time.perf_counter()
+                if attente > 0:
+                    time.sleep(attente)
+            if not hasattr(clients, 'client'):
+                clients.client = _ClientHttp(serveur) if serveur else _ClientLocal()
+            t = time.perf_counter()
+            statut, contenu = clients.client.envoyer(enregistrement.get('methode', 'POST'),
+                                                     enregistrement.get('chemin', '/api/calculer/'),
+                                                     enregistrement.get('corps', ''))
+            latence = time.perf_counter() - t
+            try:
+                en_erreur = statut != 200 or json.loads(contenu).get('status') == 'error'
+            except (ValueError, AttributeError):
+                en_erreur = statut != 200
+            algo = enregistrement.get('algo') or '?'
+            with verrou:
+                mesures[algo].append(latence)
+                if en_erreur:
+                    erreurs[algo] += 1
+
+        # Le client de test se présente comme 'testserver' (comme sous le lanceur de tests)
+        hotes = settings.ALLOWED_HOSTS if serveur else [*settings.ALLOWED_HOSTS, 'testserver']
+        with override_settings(ALLOWED_HOSTS=hotes):
+            debut = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=max(1, options['concurrence'])) as pool:
+                for futur in [pool.submit(rejouer, i, e) for i, e in enumerate(trafic)]:
+                    futur.result()
+        duree = time.perf_counter() - debut
+
+        self.stdout.write(f"{len(trafic)} requêtes en {duree:.2f} s : {len(trafic) / duree:.1f} requêtes/s "
+                          f"(concurrence {options['concurrence']})")
+        self.stdout.write(f"{'algo':<24}{'nb':>7}{'erreurs':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for algo in sorted(mesures):
+            latences = sorted(mesures[algo])
+            self.stdout.write(f"{algo:<24}{len(latences):>7}{erreurs[algo]:>9}"
+                              f"{percentile(latences, 50) * 1000:>10.2f}"
+                              f"{percentile(latences, 95) * 1000:>10.2f}"
+                              f"{percentile(latences, 99) * 1000:>10.2f}")
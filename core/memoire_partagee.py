@@ -0,0 +1,204 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from multiprocessing import shared_memory, resource_tracker
+
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# Calculs parallèles servis en même temps par le pool commun, par processus
+# serveur (réglage GRAPHE_CALCULS_PARALLELES_MAX) : les suivants attendent
+CALCULS_PARALLELES_MAX = 2
+
+_verrou_pool = threading.Lock()
+_pool = None
+_pool_pid = None
+_calculs = None
+
+
+def reglage(nom, defaut):
+    """Réglage Django, ou valeur par défaut hors de Django (algorithmes utilisés seuls)."""
+    try:
+        return getattr(settings, nom, defaut)
+    except ImproperlyConfigured:
+        return defaut
+
+
+def nb_workers(workers=None):
+    """Nombre de processus à utiliser (tous les cœurs par défaut)."""
+    if workers is None or workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def _contexte():
+    """
+    forkserver, ou spawn à défaut : un fork depuis le serveur, où d'autres
+    threads tournent, peut copier un verrou tenu et bloquer le worker.
+    """
+    methodes = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methodes else 'spawn')
+
+
+def _pool_commun():
+    """Pool de processus du processus courant, créé à la première utilisation."""
+    global _pool, _pool_pid, _calculs
+    with _verrou_pool:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=nb_workers(), mp_context=_contexte())
+            _pool_pid = os.getpid()
+            _calculs = threading.BoundedSemaphore(max(1, int(
+                reglage('GRAPHE_CALCULS_PARALLELES_MAX', CALCULS_PARALLELES_MAX))))
+        return _pool, _calculs
+
+
+@contextmanager
+def calcul_parallele():
+    """
+    Pool de processus commun à tous les calculs parallèles (Floyd-Warshall
+    par blocs, Dijkstra toutes paires, centralités), réservé le temps d'un
+    calcul. Un seul pool, dimensionné aux cœurs, sert toutes les requêtes :
+    des requêtes simultanées ne multiplient pas les processus, et au plus
+    GRAPHE_CALCULS_PARALLELES_MAX calculs s'y exécutent à la fois.
+
+    Les workers n'ont pas d'initialisation propre à un calcul : chaque tâche
+    s'attache aux tableaux partagés qu'elle reçoit (attaches).
+    """
+    pool, calculs = _pool_commun()
+    with calculs:
+        try:
+            yield pool
+        except BrokenProcessPool:
+            # Worker tué (mémoire...) : le pool est inutilisable, on le recrée au prochain calcul
+            global _pool
+            with _verrou_pool:
+                if _pool is pool:
+                    _pool = None
+            raise
+
+
+def creer_tableau(forme, dtype, nom=None):
+    """
+    Crée un segment de mémoire partagée et le tableau numpy qui le recouvre.
+
+    Aucun segment n'est confié au resource_tracker : avant Python 3.13,
+    s'y attacher l'enregistre aussi, et le retirer du suivi dans un worker
+    (qui partage le tracker de son parent après un fork) effacerait
+    l'enregistrement du créateur. Le créateur détruit donc toujours ses
+    segments lui-même, avec liberer() ou detruire().
+
+    Returns:
+        tuple: (shm, tableau)
+    """
+    taille = max(1, int(np.prod(forme)) * np.dtype(dtype).itemsize)
+    try:
+        shm = shared_memory.SharedMemory(name=nom, create=True, size=taille, track=False)
+    except TypeError:
+        # Python < 3.13 : pas de paramètre track, on retire le segment du suivi après création
+        shm = shared_memory.SharedMemory(name=nom, create=True, size=taille)
+        resource_tracker.unregister(shm._name, "shared_memory")
+    tableau = np.ndarray(forme, dtype=dtype, buffer=shm.buf)
+    return shm, tableau
+
+
+def attacher_tableau(nom, forme, dtype):
+    """
+    S'attache à un segment existant, sans le confier au resource_tracker
+    (sinon la fin du processus worker détruirait le segment du créateur).
+
+    Returns:
+        tuple: (shm, tableau)
+    """
+    try:
+        shm = shared_memory.SharedMemory(name=nom, track=False)
+    except TypeError:
+        # Python < 3.13 : l'attachement enregistre aussi le segment, on le retire du suivi
+        shm = shared_memory.SharedMemory(name=nom)
+        resource_tracker.unregister(shm._name, "shared_memory")
+    tableau = np.ndarray(forme, dtype=dtype, buffer=shm.buf)
+    return shm, tableau
+
+
+def liberer(shm):
+    """Ferme et détruit un segment créé par creer_tableau."""
+    shm.close()
+    detruire(shm.name)
+
+
+def detruire(nom):
+    """
+    Détruit un segment par son nom, même si aucun processus ne l'a ouvert
+    (sans passer par le resource_tracker, qui ne le suit pas).
+    """
+    try:
+        from _posixshmem import shm_unlink
+    except ImportError:
+        return  # Windows : le segment disparaît avec son dernier handle
+    try:
+        shm_unlink('/' + nom.lstrip('/'))
+    except FileNotFoundError:
+        pass
+
+
+def partager(tableaux):
+    """
+    Copie un ensemble de tableaux numpy en mémoire partagée.
+
+    Args:
+        tableaux (dict[str, numpy.ndarray]): Tableaux à partager
+
+    Returns:
+        tuple: (segments, descripteurs, vues) — les descripteurs sont
+            picklables et se passent aux workers pour attacher().
+    """
+    segments, descripteurs, vues = [], {}, {}
+    try:
+        for cle, tableau in tableaux.items():
+            shm, vue = creer_tableau(tableau.shape, tableau.dtype)
+            vue[...] = tableau
+            segments.append(shm)
+            descripteurs[cle] = (shm.name, tableau.shape, tableau.dtype.str)
+            vues[cle] = vue
+    except Exception:
+        for shm in segments:
+            liberer(shm)
+        raise
+    return segments, descripteurs, vues
+
+
+def attacher(descripteurs):
+    """
+    S'attache aux tableaux décrits par partager().
+
+    Returns:
+        tuple: (segments, vues) — garder segments en vie tant que les vues servent.
+    """
+    segments, vues = [], {}
+    for cle, (nom, forme, dtype) in descripteurs.items():
+        shm, vue = attacher_tableau(nom, forme, np.dtype(dtype))
+        segments.append(shm)
+        vues[cle] = vue
+    return segments, vues
+
+
+@contextmanager
+def attaches(descripteurs):
+    """
+    Vues sur des tableaux décrits par partager(), pour la durée d'une tâche
+    dans un worker : les segments sont fermés à la sortie (ne garder aucune
+    vue au-delà, sinon ils le sont par le ramasse-miettes).
+    """
+    segments, vues = attacher(descripteurs)
+    try:
+        yield vues
+    finally:
+        vues.clear()
+        for shm in segments:
+            try:
+                shm.close()
+            except BufferError:
+                pass
@@ -0,0 +1,71 @@
+import json
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+
+class CaptureTrafic:
+    """
+    Enregistre un échantillon des requêtes de calcul (corps et durée) dans un
+    fichier JSONL, rejouable avec « manage.py rejouer_trafic ».
+
+    Activation : ajouter 'core.middleware.CaptureTrafic' à MIDDLEWARE et
+    définir GRAPHE_CAPTURE_FICHIER. Réglages facultatifs :
+      - GRAPHE_CAPTURE_TAUX : proportion de requêtes enregistrées (1.0 par défaut)
+      - GRAPHE_CAPTURE_CHEMINS : préfixes d'URL concernés (['/api/'] par défaut)
+
+    Pour une réponse diffusée (parcours NDJSON), la durée court jusqu'à la
+    fin du corps : la ligne est écrite quand le flux est épuisé ou interrompu.
+    """
+
+    def __init__(self, get_response):
+        self.fichier = getattr(settings, 'GRAPHE_CAPTURE_FICHIER', None)
+        if not self.fichier:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.taux = float(getattr(settings, 'GRAPHE_CAPTURE_TAUX', 1.0))
+        self.chemins = tuple(getattr(settings, 'GRAPHE_CAPTURE_CHEMINS', ['/api/']))
+        self.verrou = threading.Lock()
+
+    def __call__(self, request):
+        if not request.path.startswith(self.chemins) or random.random() >= self.taux:
+            return self.get_response(request)
+
+        corps = request.body.decode('utf-8', errors='replace')  # Lu avant la vue (mis en cache par Django)
+        debut = time.perf_counter()
+        response = self.get_response(request)
+        if response.streaming and not getattr(response, 'is_async', False):
+            response.streaming_content = self._diffuser(response.streaming_content, request, corps,
+                                                        response.status_code, debut)
+        else:
+            self._enregistrer(request, corps, response.status_code, debut)
+        return response
+
+    def _diffuser(self, contenu, request, corps, statut, debut):
+        """Transmet le corps diffusé, puis l'enregistre avec sa durée complète."""
+        try:
+            yield from contenu
+        finally:
+            self._enregistrer(request, corps, statut, debut)
+
+    def _enregistrer(self, request, corps, statut, debut):
+        duree = time.perf_counter() - debut
+        try:
+            algo = json.loads(corps).get('algo')
+        except (ValueError, AttributeError):
+            algo = None
+        ligne = json.dumps({
+            'horodatage': time.time(),
+            'methode': request.method,
+            'chemin': request.path,
+            'algo': algo,
+            'corps': corps,
+            'statut': statut,
+            'duree_ms': round(duree * 1000, 3),
+        }, ensure_ascii=False)
+        with self.verrou:
+            with open(self.fichier, 'a', encoding='utf-8') as f:
+                f.write(ligne + '\n')
@@ -0,0 +1,110 @@
+import base64
+import binascii
+import json
+from itertools import islice
+
+from . import bfs_dfs
+from .graphe import resoudre_graphe, empreinte_graphe, CacheLRU
+
+PARCOURS = {'bfs': bfs_dfs.iter_bfs, 'dfs': bfs_dfs.iter_dfs}
+
+# Parcours arrêtés en fin de page, repris tels quels par leur curseur. Propre
+# au processus : la reprise sans recalcul suppose un routage collant des pages
+parcours_suspendus = CacheLRU(taille_max=64)
+
+
+def encoder_curseur(algo, depart, empreinte, rang):
+    """Curseur opaque : parcours (algorithme, départ, graphe) et rang du prochain sommet visité."""
+    texte = json.dumps([algo, depart, empreinte, rang], ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(texte.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decoder_curseur(curseur):
+    """(algo, depart, empreinte, rang), ou None si le curseur est illisible."""
+    try:
+        texte = base64.urlsafe_b64decode(curseur + '=' * (-len(curseur) % 4)).decode('utf-8')
+        algo, depart, empreinte, rang = json.loads(texte)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        return None
+    if not isinstance(rang, int) or rang < 0:
+        return None
+    return algo, depart, empreinte, rang
+
+
+class ParcoursFlux:
+    """
+    Parcours en cours de diffusion : les visites sont produites une à une par
+    le générateur du parcours (bfs_dfs.iter_bfs / iter_dfs), rien n'est
+    accumulé. rang est le nombre de sommets déjà visités ; rejoue, le nombre
+    de visites recalculées pour reprendre à un curseur inconnu du processus.
+    """
+
+    def __init__(self, algo, depart, labels, empreinte, iterateur, rang=0, rejoue=0):
+        self.algo = algo
+        self.depart = depart
+        self.labels = labels
+        self.empreinte = empreinte
+        self.iterateur = iterateur
+        self.rang = rang
+        self.rejoue = rejoue
+
+    def evenements(self, limite=None):
+        """
+        Événements du parcours, à partir du rang courant :
+          - {'type': 'visite', 'rang', 'sommet', 'parent', 'profondeur'} par sommet
+          - puis {'type': 'fin', 'visites'}, ou {'type': 'suite', 'curseur', 'rang'}
+            si limite visites ont été produites (page suivante : renvoyer le curseur)
+        """
+        labels = self.labels
+        fin = None if limite is None else self.rang + limite
+        if fin is not None and self.rang >= fin:
+            fin = self.rang + 1     # Au moins une visite par page
+        for u, parent, profondeur in self.iterateur:
+            yield {'type': 'visite', 'rang': self.rang, 'sommet': labels[u],
+                   'parent': labels[parent] if parent != -1 else None, 'profondeur': profondeur}
+            self.rang += 1
+            if fin is not None and self.rang >= fin:
+                curseur = encoder_curseur(self.algo, self.depart, self.empreinte, self.rang)
+                parcours_suspendus.put(curseur, self)
+                yield {'type': 'suite', 'curseur': curseur, 'rang': self.rang}
+                return
+        yield {'type': 'fin', 'visites': self.rang}
+
+
+def ouvrir_parcours(algo, depart, matrix=None, labels=None, curseur=None):
+    """
+    Parcours à diffuser, depuis le début ou repris à un curseur.
+
+    Un curseur émis par ce processus reprend le parcours suspendu sans rien
+    recalculer ; sinon (autre worker, curseur expiré) le parcours est rejoué
+    sans rien émettre jusqu'au rang du curseur, en O(rang) (flux.rejoue).
+
+    Returns:
+        ParcoursFlux, ou {'error': ...}
+    """
+    if algo not in PARCOURS:
+        return {"error": f"Parcours inconnu : {algo} (bfs ou dfs)"}
+    matrix, labels = resoudre_graphe(matrix, labels)
+    empreinte = empreinte_graphe(matrix, labels)
+
+    rang = 0
+    if curseur:
+        decode = decoder_curseur(curseur)
+        if decode is None:
+            return {"error": "Curseur illisible."}
+        if decode[:3] != (algo, depart, empreinte):
+            return {"error": "Curseur d'un autre parcours (algorithme, départ ou graphe différent)."}
+        rang = decode[3]
+        suspendu = parcours_suspendus.pop(curseur)
+        if suspendu is not None:
+            suspendu.rejoue = 0
+            return suspendu
+
+    try:
+        start_idx = labels.index(depart)
+    except ValueError:
+        return {"error": f"Ville de départ inconnue : {depart}"}
+
+    iterateur = PARCOURS[algo](start_idx, matrix, len(labels))
+    rang = sum(1 for _ in islice(iterateur, rang))
+    return ParcoursFlux(algo, depart, labels, empreinte, iterateur, rang, rejoue=rang)
@@ -0,0 +1,223 @@
+import math
+
+import numpy as np
+from django.conf import settings
+
+from . import dijkstra, Floyd_Warshall, memoire_partagee, precalcul, registre_graphes, reperes
+from .accessibilite import sans_chemin_en_cache
+from .files_priorite import poids_max_entier, SEUIL_SEAUX
+from .graphe import resoudre_graphe, empreinte_graphe
+
+# Durée moyenne d'une opération élémentaire (ns), en ordre de grandeur :
+# boucle Python (Dijkstra, Bellman-Ford) contre noyau numpy (Floyd-Warshall par blocs)
+NS_OPERATION_PYTHON = 120
+NS_OPERATION_NUMPY = 3
+
+# Surcoût par sommet extrait d'un Dijkstra sur CSR (tranches numpy converties en listes)
+OPERATIONS_SOMMET_CSR = 20
+
+# Part des sommets qu'A* guidé par les repères (ALT) explore, par rapport à Dijkstra
+FRACTION_ALT = 0.25
+
+# Coût estimé maximal par défaut d'une requête auto, au-delà duquel elle est
+# refusée (réglage GRAPHE_PLAN_BUDGET_MS, lu à chaque requête)
+BUDGET_MS = 10000
+
+# Moteurs exacts qui répondent à chaque forme de requête
+# (dijkstra_alt seulement si les repères du graphe sont déjà en cache)
+MOTEURS = {
+    'paire': ('dijkstra', 'bellman', 'dijkstra_alt'),
+    'source': ('dijkstra', 'bellman'),
+    'toutes_paires': ('dijkstra_tous_couples', 'floyd'),
+}
+
+# Moteurs qui ignorent les poids négatifs (résultat faux s'il y en a)
+POIDS_POSITIFS = {'dijkstra', 'dijkstra_tous_couples', 'dijkstra_alt'}
+
+# Champs propres au mode auto, retirés de la requête transmise au moteur
+CHAMPS_PLAN = {'budget_ms'}
+
+
+def forme_requete(data):
+    """'paire' (départ et arrivée), 'source' (départ seul) ou 'toutes_paires'."""
+    depart = (data.get('depart') or '').strip()
+    arrivee = (data.get('arrivee') or '').strip()
+    if depart and arrivee:
+        return 'paire'
+    return 'source' if depart else 'toutes_paires'
+
+
+def caracteristiques(matrix, labels):
+    """Taille, densité et nature des poids du graphe (lu ligne par ligne)."""
+    n = len(labels)
+    m, negatifs = 0, False
+    for u in range(n):
+        ligne = np.asarray(matrix[u], dtype=np.float64)
+        poids = ligne[(ligne != 0) & np.isfinite(ligne)]
+        m += len(poids)
+        negatifs = negatifs or bool(np.any(poids < 0))
+    return {
+        'n': n,
+        'aretes': m,
+        'densite': m / (n * n) if n else 0.0,
+        'poids_negatifs': negatifs,
+        'poids_max_entier': poids_max_entier(matrix, positifs=True) if m else None,
+    }
+
+
+def _operations_file(g):
+    """Opérations d'un Dijkstra, selon la file de priorité utilisée (files_priorite)."""
+    n, m, c = g['n'], g['aretes'], g['poids_max_entier']
+    if c is None:
+        return m + 2 * n * math.log2(max(n, 2))   # Tas binaire
+    if c <= SEUIL_SEAUX:
+        return n + m + c                           # Seaux de Dial
+    return m + n * math.log2(c + 1)                # Tas radix
+
+
+def pretraitements_en_cache(data, matrix, labels):
+    """
+    Pré-traitements du graphe déjà en cache dans ce processus, qui rendent
+    un moteur moins coûteux. Rien n'est calculé ici (seule l'empreinte).
+
+    Returns:
+        dict: {'sans_chemin': bool (index d'accessibilité ou des composantes
+               prouvant qu'aucun chemin ne relie départ et arrivée),
+               'reperes': int ou None (nombre de repères ALT en cache),
+               'csr': bool (CSR positif attaché au registre partagé)}
+    """
+    cle = empreinte_graphe(matrix, labels)
+    n = len(labels)
+    caches = {'sans_chemin': False, 'reperes': None,
+              'csr': registre_graphes.est_attache(cle, positifs=True)}
+
+    index = {ville: i for i, ville in enumerate(labels)}
+    depart = index.get((data.get('depart') or '').strip())
+    arrivee = index.get((data.get('arrivee') or '').strip())
+    if depart is None or arrivee is None:
+        return caches
+    caches['sans_chemin'] = sans_chemin_en_cache(cle, depart, arrivee)
+
+    # Même nombre de repères que la vue (nb_reperes ramené dans [1, min(n, plafond)])
+    try:
+        k = int(data.get('nb_reperes') or reperes.NB_REPERES_DEFAUT)
+    except (TypeError, ValueError):
+        return caches
+    k = max(1, min(k, n, getattr(settings, 'GRAPHE_NB_REPERES_MAX', reperes.NB_REPERES_MAX)))
+    if reperes.reperes_par_graphe.get(f"{cle}:{k}") is not None:
+        caches['reperes'] = k
+    return caches
+
+
+def estimer(moteur, g, workers=1, caches=None):
+    """
+    Coût estimé (ms) de moteur sur un graphe de caractéristiques g : nombre
+    d'opérations multiplié par leur durée moyenne. La lecture de la matrice
+    dense (n²) est comptée pour chaque moteur ; Bellman-Ford est compté au
+    pire, son arrêt anticipé dépendant des données.
+
+    Avec un pré-traitement en cache (pretraitements_en_cache), la lecture de
+    la matrice se réduit au calcul de son empreinte (noyau numpy).
+    """
+    caches = caches or {}
+    n, m = g['n'], g['aretes']
+    empreinte = n * n * NS_OPERATION_NUMPY
+    if moteur == 'dijkstra':
+        if caches.get('sans_chemin'):
+            return empreinte / 1e6   # Réponse « aucun chemin » en O(1)
+        operations, ns = n * n + _operations_file(g), NS_OPERATION_PYTHON
+    elif moteur == 'dijkstra_alt':
+        if caches.get('reperes') is None:
+            raise ValueError("dijkstra_alt n'est estimé qu'avec ses repères en cache")
+        # A* n'explore qu'une partie du graphe, mais évalue k bornes par arc relâché
+        recherche = FRACTION_ALT * (caches['reperes'] * m + 2 * n * math.log2(max(n, 2)))
+        return (empreinte + recherche * NS_OPERATION_PYTHON) / 1e6
+    elif moteur == 'bellman':
+        operations, ns = n * n + max(n - 1, 1) * m, NS_OPERATION_PYTHON
+    elif moteur == 'dijkstra_tous_couples':
+        par_source = _operations_file(g) + OPERATIONS_SOMMET_CSR * n
+        operations, ns = n * par_source, NS_OPERATION_PYTHON
+        if n >= dijkstra.SEUIL_PARALLELE:
+            operations /= workers
+        lecture = empreinte if caches.get('csr') else n * n * NS_OPERATION_PYTHON
+        return (lecture + operations * ns) / 1e6
+    elif moteur == 'floyd':
+        operations, ns = n ** 3, NS_OPERATION_NUMPY
+        if n >= Floyd_Warshall.SEUIL_PARALLELE:
+            operations /= workers
+    else:
+        raise ValueError(f"Moteur inconnu : {moteur}")
+    return operations * ns / 1e6
+
+
+def requete_moteur(data, moteur):
+    """La requête telle que le moteur choisi la reçoit."""
+    requete = {k: v for k, v in data.items() if k not in CHAMPS_PLAN}
+    requete['algo'] = moteur
+    return requete
+
+
+def planifier(data, matrix, labels):
+    """
+    Choisit le moteur exact le moins coûteux pour une requête de plus courts
+    chemins : une paire, une source ou toutes les paires.
+
+    Dijkstra est écarté s'il y a des poids négatifs ; une réponse déjà
+    précalculée (precalcul.py) a un coût nul, et les pré-traitements déjà en
+    cache (index d'accessibilité ou des composantes, repères ALT, CSR du
+    registre partagé) allègent l'estimation du moteur qui s'en sert. La
+    requête est refusée si le coût estimé dépasse le budget
+    (GRAPHE_PLAN_BUDGET_MS, ou budget_ms s'il est plus petit).
+
+    Args:
+        data (dict): Corps de la requête (algo 'auto')
+        matrix, labels: Graphe tel que lu par views.lire_graphe
+
+    Returns:
+        dict: {'moteur', 'forme', 'cout_estime_ms', 'budget_ms', 'dans_budget',
+               'raison', 'candidats', 'caches', 'graphe'}
+    """
+    forme = forme_requete(data)
+    graphe = resoudre_graphe(matrix, labels or None)
+    g = caracteristiques(*graphe)
+    caches = pretraitements_en_cache(data, *graphe)
+    workers = memoire_partagee.nb_workers()
+
+    candidats = []
+    for moteur in MOTEURS[forme]:
+        if g['poids_negatifs'] and moteur in POIDS_POSITIFS:
+            continue
+        if moteur == 'dijkstra_alt' and caches['reperes'] is None:
+            continue
+        precalcule = precalcul.reponse_precalculee(requete_moteur(data, moteur), matrix, labels) is not None
+        cout = 0.0 if precalcule else estimer(moteur, g, workers, caches)
+        candidats.append({'moteur': moteur, 'cout_estime_ms': round(cout, 3), 'precalcule': precalcule})
+    # À coût égal, l'ordre de MOTEURS départage
+    choix = min(candidats, key=lambda c: c['cout_estime_ms'])
+
+    if choix['precalcule']:
+        raison = "Réponse précalculée"
+    elif choix['moteur'] == 'dijkstra' and caches['sans_chemin']:
+        raison = "Aucun chemin possible (index d'accessibilité en cache)"
+    elif choix['moteur'] == 'dijkstra_alt':
+        raison = "Repères ALT en cache"
+    elif g['poids_negatifs']:
+        raison = "Poids négatifs : Dijkstra écarté (résultat faux)"
+    else:
+        raison = "Coût estimé le plus faible"
+
+    budget = getattr(settings, 'GRAPHE_PLAN_BUDGET_MS', BUDGET_MS)
+    if data.get('budget_ms') is not None:
+        budget = min(budget, float(data['budget_ms']))
+
+    return {
+        'moteur': choix['moteur'],
+        'forme': forme,
+        'cout_estime_ms': choix['cout_estime_ms'],
+        'budget_ms': budget,
+        'dans_budget': choix['cout_estime_ms'] <= budget,
+        'raison': raison,
+        'candidats': candidats,
+        'caches': caches,
+        'graphe': g,
+    }
@@ -0,0 +1,205 @@
+import contextlib
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+
+from . import Matrice
+from .graphe import empreinte_graphe
+
+logger = logging.getLogger(__name__)
+
+
+# Forme de la clé de chaque algorithme précalculé : (utilise depart, utilise arrivee, dépend du graphe)
+FORMES = {
+    'dijkstra': (True, True, True),
+    'bellman': (True, True, True),
+    'bfs': (True, False, True),
+    'dfs': (True, False, True),
+    'prim': (True, False, True),
+    'kruskal': (False, False, True),
+    'floyd': (False, False, True),
+    'dijkstra_tous_couples': (False, False, True),
+    'composantes': (False, False, True),
+    'centralite': (False, False, True),
+    'intermediarite': (False, False, True),
+    'pert': (False, False, False),
+}
+
+# Une requête portant d'autres champs (options) est calculée normalement
+CHAMPS_SIMPLES = {'algo', 'matrix', 'labels', 'depart', 'arrivee', 'pert_data'}
+
+_table = None
+_initialise = False
+_verrou = threading.Lock()
+
+
+def _dossier():
+    """Dossier des réponses précalculées stockées sur disque (rechargées au redémarrage)."""
+    return getattr(settings, 'GRAPHE_PRECALCUL_DIR', os.path.join(tempfile.gettempdir(), 'graphe_precalcul'))
+
+
+def _version_code():
+    """Empreinte des sources de l'application : une modification invalide le fichier."""
+    h = hashlib.sha1()
+    dossier = os.path.dirname(os.path.abspath(__file__))
+    for nom in sorted(os.listdir(dossier)):
+        if nom.endswith('.py'):
+            with open(os.path.join(dossier, nom), 'rb') as f:
+                h.update(nom.encode('utf-8'))
+                h.update(f.read())
+    return h.hexdigest()
+
+
+def _cle(algo, depart, arrivee):
+    return f"{algo}|{depart}|{arrivee}"
+
+
+class TablePrecalculee:
+    """
+    Réponses de calculer pour le graphe par défaut (Matrice.py) : plus courts
+    chemins de toutes les paires (Dijkstra, Bellman-Ford), Floyd-Warshall,
+    arbres couvrants et parcours depuis chaque ville, etc.
+
+    Les réponses sont produites par views.executer_requete lui-même : elles
+    sont identiques à celles d'un calcul à la demande.
+    """
+
+    def __init__(self, empreinte, labels, contexte_index, reponses):
+        self.empreinte = empreinte
+        self.labels = list(labels)
+        self.villes = set(self.labels)
+        self.n = len(self.labels)
+        self.contexte_index = contexte_index
+        self.reponses = reponses
+
+    @classmethod
+    def calculer(cls, matrix, labels):
+        from .views import clean_data, executer_requete
+
+        matrice_json = json.dumps(clean_data(matrix.tolist()))
+        contexte_index = {'default_matrix': matrice_json, 'default_villes': json.dumps(labels)}
+        base = {'matrix': matrice_json, 'labels': ', '.join(labels)}
+
+        reponses = {}
+        with contextlib.redirect_stdout(io.StringIO()):  # MethodePert affiche son tableau
+            for algo, (avec_depart, avec_arrivee, _) in FORMES.items():
+                departs = labels if avec_depart else ['']
+                arrivees = labels if avec_arrivee else ['']
+                if algo == 'bellman':
+                    arrivees = [''] + labels
+                for depart in departs:
+                    for arrivee in arrivees:
+                        reponse = executer_requete(dict(base, algo=algo, depart=depart, arrivee=arrivee))
+                        if 'trace' not in reponse:
+                            reponses[_cle(algo, depart, arrivee)] = reponse
+
+        return cls(empreinte_graphe(matrix, labels), labels, contexte_index, reponses)
+
+    def sauvegarder(self, fichier):
+        """Écriture atomique (fichier temporaire unique puis renommage)."""
+        os.makedirs(os.path.dirname(fichier), exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(fichier), suffix='.partiel',
+                                         delete=False, encoding='utf-8') as f:
+            temporaire = f.name
+        try:
+            with open(temporaire, 'w', encoding='utf-8') as f:
+                json.dump({'empreinte': self.empreinte, 'labels': self.labels,
+                           'contexte_index': self.contexte_index, 'reponses': self.reponses},
+                          f, ensure_ascii=False)
+            os.replace(temporaire, fichier)
+        except BaseException:
+            os.remove(temporaire)
+            raise
+
+    @classmethod
+    def charger(cls, fichier):
+        with open(fichier, encoding='utf-8') as f:
+            d = json.load(f)
+        return cls(d['empreinte'], d['labels'], d['contexte_index'], d['reponses'])
+
+    def reponse(self, data, matrix, labels):
+        """Réponse précalculée à la requête, ou None s'il faut la calculer."""
+        algo = data.get('algo')
+        forme = FORMES.get(algo)
+        if forme is None or not CHAMPS_SIMPLES.issuperset(data):
+            return None
+        avec_depart, avec_arrivee, depend_graphe = forme
+
+        if algo == 'pert' and data.get('pert_data'):
+            return None
+        if depend_graphe:
+            if matrix is None:
+                if labels:
+                    return None
+            elif len(matrix) != self.n or len(labels) != self.n \
+                    or empreinte_graphe(matrix, labels) != self.empreinte:
+                return None
+
+        depart = (data.get('depart') or '').strip() if avec_depart else ''
+        arrivee = (data.get('arrivee') or '').strip() if avec_arrivee else ''
+        if algo == 'bellman' and arrivee not in self.villes:
+            arrivee = ''  # Arrivée ignorée par la vue si elle n'est pas une ville
+        return self.reponses.get(_cle(algo, depart, arrivee))
+
+
+def initialiser():
+    """
+    Charge la table du graphe par défaut depuis le disque, ou la calcule et
+    l'enregistre. Appelé à la première utilisation (table()) ou à l'avance
+    par « manage.py precalculer ».
+    """
+    global _table, _initialise
+    matrix, labels = Matrice.M, list(Matrice.villes)
+    version = hashlib.sha1((empreinte_graphe(matrix, labels) + _version_code()).encode('utf-8')).hexdigest()
+    fichier = os.path.join(_dossier(), f"defaut_{version}.json")
+    try:
+        if os.path.exists(fichier):
+            _table = TablePrecalculee.charger(fichier)
+        else:
+            table = TablePrecalculee.calculer(matrix, labels)
+            table.sauvegarder(fichier)
+            _table = table
+    except Exception:
+        logger.exception("Précalcul du graphe par défaut impossible, calcul à la demande.")
+    _initialise = True
+    return _table
+
+
+def table():
+    """
+    Table précalculée du graphe par défaut, chargée ou construite à la
+    première utilisation ; None si GRAPHE_PRECALCUL est désactivé, si le
+    précalcul a échoué ou pendant sa construction (les requêtes arrivées
+    entre-temps, y compris celles du précalcul lui-même, sont calculées).
+    """
+    if _initialise or not getattr(settings, 'GRAPHE_PRECALCUL', True):
+        return _table
+    if not _verrou.acquire(blocking=False):
+        return None
+    try:
+        if not _initialise:
+            initialiser()
+    finally:
+        _verrou.release()
+    return _table
+
+
+def reponse_precalculee(data, matrix, labels):
+    """
+    Réponse de calculer tirée de la table pour une requête sur le graphe
+    par défaut (matrice omise ou identique à Matrice.py), sinon None.
+    La réponse est partagée : ne pas la modifier.
+    """
+    # Requête hors table : inutile de la construire
+    if data.get('algo') not in FORMES or (matrix is not None and len(matrix) != len(Matrice.villes)):
+        return None
+    t = table()
+    if t is None:
+        return None
+    return t.reponse(data, matrix, labels)
@@ -1,4 +1,5 @@
 from .Matrice import villes as default_villes, M as default_M
+from .files_priorite import poids_max_entier, FileSeaux, SEUIL_SEAUX
 import heapq
 
 def prim(ville_depart, matrix=None, labels=None):
@@ -12,6 +13,13 @@ def prim(ville_depart, matrix=None, labels=None):
         return {"error": f"Ville inconnue: {ville_depart}"}
 
     n = len(labels)
+
+    # Seaux seulement pour de petits poids entiers (un seau par valeur) ; les
+    # clés de Prim ne sont pas monotones, donc pas de tas radix au-delà
+    poids_max = poids_max_entier(matrix)
+    if poids_max is not None and poids_max <= SEUIL_SEAUX:
+        return _prim_seaux(start_node, matrix, labels, poids_max)
+
     visited = [False] * n
     min_heap = [(0, start_node, -1)]  # (poids, noeud_actuel, parent)
     mst_edges = []
@@ -35,6 +43,41 @@ def prim(ville_depart, matrix=None, labels=None):
 
     return {"edges": mst_edges, "weight": total_weight}
 
+def _prim_seaux(start_node, matrix, labels, poids_max):
+    """
+    Prim pour des poids entiers positifs : file à seaux indexée par le poids
+    (un seau par valeur, de 0 à poids_max) au lieu d'un tas de tuples.
+    """
+    n = len(labels)
+    visited = [False] * n
+    cle = [float('inf')] * n    # Poids de la meilleure arête vers l'arbre
+    parent = [-1] * n
+    file = FileSeaux(poids_max, monotone=False)
+    cle[start_node] = 0
+    file.ajouter(0, start_node)
+    mst_edges = []
+    total_weight = 0
+
+    while file:
+        u = file.extraire()
+        # Sommet déjà dans l'arbre, ou entrée périmée (clé améliorée depuis)
+        if visited[u] or file.courant != cle[u]:
+            continue
+
+        visited[u] = True
+        if parent[u] != -1:
+            mst_edges.append((labels[parent[u]], labels[u]))
+            total_weight += matrix[parent[u]][u]
+
+        for v in range(n):
+            w = matrix[u][v]
+            if w != 0 and w != float('inf') and not visited[v] and w < cle[v]:
+                cle[v] = int(w)
+                parent[v] = u
+                file.ajouter(cle[v], v)
+
+    return {"edges": mst_edges, "weight": total_weight}
+
 def kruskal(matrix=None, labels=None):
     """Algorithme de Kruskal pour l'Arbre Couvrant Minimum."""
     if matrix is None: matrix = default_M
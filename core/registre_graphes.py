@@ -0,0 +1,277 @@
+import atexit
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+from . import memoire_partagee
+from .graphe import construire_csr, empreinte_graphe
+
+try:
+    import fcntl
+except ImportError:  # Windows : verrou limité au processus
+    fcntl = None
+
+# Graphes gardés attachés par processus
+ATTACHES_MAX = 16
+
+SEPARATEUR = '\x1f'
+
+# Suffixe du segment de chaque tableau (noms POSIX courts)
+SUFFIXES = {'indptr': 'p', 'indices': 'i', 'poids': 'w', 'labels': 'l'}
+
+_verrou = threading.Lock()
+_attaches = OrderedDict()   # cle -> GraphePartage attaché dans ce processus
+
+
+_reglage = memoire_partagee.reglage
+
+
+def _dossier():
+    """Dossier du manifeste commun à tous les processus (serveur multi-workers)."""
+    return _reglage('GRAPHE_REGISTRE_DIR', os.path.join(tempfile.gettempdir(), 'graphe_registre'))
+
+
+def _octets_max():
+    """Budget mémoire du registre, au-delà duquel les graphes inutilisés sont évincés."""
+    return _reglage('GRAPHE_REGISTRE_OCTETS_MAX', 256 * 1024 * 1024)
+
+
+def _octets_min():
+    """
+    Taille de matrice (n² × 8 octets) en dessous de laquelle le graphe reste
+    local au processus : segments et manifeste coûteraient plus que le CSR.
+    """
+    return _reglage('GRAPHE_REGISTRE_OCTETS_MIN', 1024 * 1024)
+
+
+class GraphePartage:
+    """
+    Graphe CSR en lecture seule (indptr, indices, poids) et ses labels, placés
+    dans des segments de mémoire partagée nommés : tous les processus qui
+    l'utilisent s'attachent aux mêmes pages au lieu d'en garder une copie.
+
+    descripteurs se passe tel quel à memoire_partagee.attacher() dans un
+    worker de pool (aucune copie supplémentaire).
+    """
+
+    def __init__(self, cle, segments, vues, descripteurs):
+        self.cle = cle
+        self._segments = segments
+        self.descripteurs = descripteurs
+        for vue in vues.values():
+            vue.flags.writeable = False
+        self.indptr = vues['indptr']
+        self.indices = vues['indices']
+        self.poids = vues['poids']
+        texte = bytes(vues['labels']).decode('utf-8')
+        self.labels = texte.split(SEPARATEUR) if texte else []
+
+    @property
+    def csr(self):
+        return self.indptr, self.indices, self.poids
+
+    def fermer(self):
+        self.indptr = self.indices = self.poids = None
+        for shm in self._segments:
+            try:
+                shm.close()
+            except BufferError:
+                pass  # Vues encore utilisées ailleurs : fermé par le ramasse-miettes
+        self._segments = []
+
+
+@contextmanager
+def _manifeste():
+    """Manifeste {cle: entrée} lu et réécrit sous verrou de fichier exclusif."""
+    dossier = _dossier()
+    os.makedirs(dossier, exist_ok=True)
+    chemin = os.path.join(dossier, 'manifeste.json')
+    with open(os.path.join(dossier, 'manifeste.lock'), 'w') as verrou:
+        if fcntl:
+            fcntl.flock(verrou, fcntl.LOCK_EX)
+        try:
+            try:
+                with open(chemin, encoding='utf-8') as f:
+                    manifeste = json.load(f)
+            except (FileNotFoundError, ValueError):
+                manifeste = {}
+            yield manifeste
+            temporaire = chemin + '.partiel'
+            with open(temporaire, 'w', encoding='utf-8') as f:
+                json.dump(manifeste, f)
+            os.replace(temporaire, chemin)
+        finally:
+            if fcntl:
+                fcntl.flock(verrou, fcntl.LOCK_UN)
+
+
+def _vivant(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _detruire_entree(entree):
+    for nom, _, _ in entree['segments'].values():
+        memoire_partagee.detruire(nom)
+
+
+def _evincer(manifeste):
+    """
+    Retire les processus morts des compteurs de références, puis détruit les
+    graphes inutilisés les plus anciens tant que le budget est dépassé.
+    """
+    for entree in manifeste.values():
+        entree['processus'] = [pid for pid in entree['processus'] if _vivant(pid)]
+    total = sum(entree['octets'] for entree in manifeste.values())
+    octets_max = _octets_max()
+    libres = sorted((entree['acces'], cle) for cle, entree in manifeste.items() if not entree['processus'])
+    for _, cle in libres:
+        if total <= octets_max:
+            break
+        entree = manifeste.pop(cle)
+        _detruire_entree(entree)
+        total -= entree['octets']
+
+
+def _tableaux(matrix, labels, positifs):
+    indptr, indices, poids = construire_csr(matrix, len(labels), positifs=positifs)
+    return {
+        'indptr': indptr, 'indices': indices, 'poids': poids,
+        'labels': np.frombuffer(SEPARATEUR.join(labels).encode('utf-8'), dtype=np.uint8),
+    }
+
+
+def _creer(cle, matrix, labels, positifs):
+    """Construit le CSR et le copie dans des segments nommés d'après la clé."""
+    tableaux = _tableaux(matrix, labels, positifs)
+    prefixe = 'grp_' + hashlib.sha1(cle.encode('utf-8')).hexdigest()[:24]
+    segments, vues, descripteurs = [], {}, {}
+    for nom_tableau, tableau in tableaux.items():
+        nom = f"{prefixe}_{SUFFIXES[nom_tableau]}"
+        memoire_partagee.detruire(nom)  # Reste éventuel d'un processus interrompu
+        shm, vue = memoire_partagee.creer_tableau(tableau.shape, tableau.dtype, nom=nom)
+        vue[...] = tableau
+        segments.append(shm)
+        vues[nom_tableau] = vue
+        descripteurs[nom_tableau] = (nom, tableau.shape, tableau.dtype.str)
+    octets = sum(int(t.nbytes) for t in tableaux.values())
+    return GraphePartage(cle, segments, vues, descripteurs), octets
+
+
+def _relacher(cle, graphe):
+    """Détache ce processus d'un graphe (décrémente sa référence)."""
+    graphe.fermer()
+    with _manifeste() as manifeste:
+        entree = manifeste.get(cle)
+        if entree is not None and os.getpid() in entree['processus']:
+            entree['processus'].remove(os.getpid())
+            _evincer(manifeste)
+
+
+def est_attache(empreinte, positifs=False):
+    """True si ce processus est déjà attaché au CSR du graphe (rien à construire)."""
+    with _verrou:
+        return f"{empreinte}:{'positifs' if positifs else 'tous'}" in _attaches
+
+
+def graphe_partage(matrix, labels, positifs=False):
+    """
+    Graphe CSR partagé entre processus : attaché s'il est déjà dans le
+    registre, sinon construit une fois et publié pour les autres processus.
+
+    Args:
+        matrix, labels: Graphe
+        positifs (bool): Ne garder que les poids > 0 (comme construire_csr)
+
+    Returns:
+        GraphePartage (descripteurs vaut None pour un petit graphe, sous
+            GRAPHE_REGISTRE_OCTETS_MIN, ou si la mémoire partagée est
+            indisponible : les tableaux sont alors locaux au processus)
+    """
+    cle = f"{empreinte_graphe(matrix, labels)}:{'positifs' if positifs else 'tous'}"
+    if len(labels) ** 2 * 8 < _octets_min():
+        return GraphePartage(cle, [], _tableaux(matrix, labels, positifs), None)
+    try:
+        return _graphe_partage(cle, matrix, labels, positifs)
+    except OSError:
+        # Mémoire partagée indisponible : copie propre au processus (descripteurs None)
+        return GraphePartage(cle, [], _tableaux(matrix, labels, positifs), None)
+
+
+def _graphe_partage(cle, matrix, labels, positifs):
+    with _verrou:
+        graphe = _attaches.get(cle)
+        if graphe is not None:
+            _attaches.move_to_end(cle)
+            return graphe
+
+        with _manifeste() as manifeste:
+            entree = manifeste.get(cle)
+            graphe = None
+            if entree is not None:
+                try:
+                    segments, vues = memoire_partagee.attacher(entree['segments'])
+                    graphe = GraphePartage(cle, segments, vues, entree['segments'])
+                except FileNotFoundError:
+                    _detruire_entree(manifeste.pop(cle))
+                    entree = None
+            if graphe is None:
+                graphe, octets = _creer(cle, matrix, labels, positifs)
+                entree = manifeste[cle] = {'segments': graphe.descripteurs, 'octets': octets, 'processus': []}
+            entree['processus'].append(os.getpid())
+            entree['acces'] = time.time()
+            _evincer(manifeste)
+
+        _attaches[cle] = graphe
+        if len(_attaches) > ATTACHES_MAX:
+            ancienne, ancien = _attaches.popitem(last=False)
+            _relacher(ancienne, ancien)
+        return graphe
+
+
+@atexit.register
+def _tout_relacher():
+    """
+    À la sortie du processus : le détache de ses graphes, puis détruit ceux
+    qu'aucun processus vivant n'utilise plus (rien ne reste dans /dev/shm
+    après l'arrêt du dernier worker du serveur).
+    """
+    with _verrou:
+        graphes = list(_attaches.values())
+        _attaches.clear()
+    for graphe in graphes:
+        graphe.fermer()
+    try:
+        with _manifeste() as manifeste:
+            for entree in manifeste.values():
+                if os.getpid() in entree['processus']:
+                    entree['processus'].remove(os.getpid())
+            _detruire_inutilises(manifeste)
+    except OSError:
+        pass
+
+
+def _detruire_inutilises(manifeste):
+    for cle in list(manifeste):
+        entree = manifeste[cle]
+        entree['processus'] = [pid for pid in entree['processus'] if _vivant(pid)]
+        if not entree['processus']:
+            _detruire_entree(manifeste.pop(cle))
+
+
+def vider():
+    """Détruit tous les graphes du registre non utilisés par un processus vivant."""
+    with _manifeste() as manifeste:
+        _detruire_inutilises(manifeste)
@@ -0,0 +1,208 @@
+import heapq
+
+from .accessibilite import sans_chemin
+from .graphe import resoudre_graphe, liste_successeurs, empreinte_graphe, CacheLRU
+
+# Pré-traitements par graphe (clé : empreinte du graphe et nombre de repères)
+reperes_par_graphe = CacheLRU(taille_max=16)
+
+NB_REPERES_DEFAUT = 4
+
+# Plafond de k accepté d'un client (réglage GRAPHE_NB_REPERES_MAX) : chaque
+# repère coûte deux Dijkstra complets et 2n distances gardées en cache
+NB_REPERES_MAX = 16
+
+
+def _dijkstra_complet(adjacence, src, n):
+    """Distances depuis src vers tous les sommets (liste d'adjacence {v: poids})."""
+    distances = [float('inf')] * n
+    distances[src] = 0
+    file_prioritaire = [(0, src)]
+    while file_prioritaire:
+        dist_actuelle, u = heapq.heappop(file_prioritaire)
+        if dist_actuelle > distances[u]:
+            continue
+        for v, poids in adjacence[u].items():
+            distance = dist_actuelle + poids
+            if distance < distances[v]:
+                distances[v] = distance
+                heapq.heappush(file_prioritaire, (distance, v))
+    return distances
+
+
+class PretraitementReperes:
+    """
+    Pré-traitement ALT (A*, Landmarks, Triangle inequality).
+
+    On choisit k repères L et on stocke, pour chacun, les distances d(L, v)
+    et d(v, L) vers tous les sommets. L'inégalité triangulaire donne alors
+    des bornes sur d(u, t) sans aucune recherche :
+        d(u, t) >= d(L, t) - d(L, u)    et    d(u, t) >= d(u, L) - d(t, L)
+        d(u, t) <= d(u, L) + d(L, t)
+
+    Poids strictement positifs uniquement, comme pour dijkstra.dijkstra.
+    """
+
+    def __init__(self, matrix, labels, k=NB_REPERES_DEFAUT):
+        self.labels = list(labels)
+        self.index = {ville: i for i, ville in enumerate(self.labels)}
+        n = self.n = len(self.labels)
+
+        self.succ = liste_successeurs(matrix, n, positifs=True)
+        self.pred = [dict() for _ in range(n)]
+        for u in range(n):
+            for v, poids in self.succ[u].items():
+                self.pred[v][u] = poids
+
+        self.reperes = []
+        choisis = set()
+        self.depuis = []   # depuis[i][v] = d(repère i, v)
+        self.vers = []     # vers[i][v]   = d(v, repère i)
+        if n == 0:
+            return
+
+        # Sélection « du plus éloigné » : premier repère = sommet de plus fort degré,
+        # puis à chaque fois le sommet le plus loin des repères déjà choisis.
+        eloignement = [float('inf')] * n
+        candidat = max(range(n), key=lambda u: len(self.succ[u]) + len(self.pred[u]))
+        for _ in range(min(k, n)):
+            self.reperes.append(candidat)
+            choisis.add(candidat)
+            depuis = _dijkstra_complet(self.succ, candidat, n)
+            vers = _dijkstra_complet(self.pred, candidat, n)
+            self.depuis.append(depuis)
+            self.vers.append(vers)
+
+            for v in range(n):
+                proche = min(depuis[v], vers[v])
+                if proche < eloignement[v]:
+                    eloignement[v] = proche
+            # Un sommet hors de portée de tous les repères est prioritaire
+            candidat = max((v for v in range(n) if v not in choisis), key=lambda v: eloignement[v], default=None)
+            if candidat is None:
+                break
+
+    def borne_inf(self, u, t):
+        """Minorant de d(u, t) ; inf si l'absence de chemin est prouvée."""
+        borne = 0
+        for depuis, vers in zip(self.depuis, self.vers):
+            # d(L, t) <= d(L, u) + d(u, t)
+            if depuis[u] != float('inf'):
+                if depuis[t] == float('inf'):
+                    return float('inf')
+                borne = max(borne, depuis[t] - depuis[u])
+            # d(u, L) <= d(u, t) + d(t, L)
+            if vers[t] != float('inf'):
+                if vers[u] == float('inf'):
+                    return float('inf')
+                borne = max(borne, vers[u] - vers[t])
+        return borne
+
+    def borne_sup(self, u, t):
+        """Majorant de d(u, t) en passant par le meilleur repère (inf si inconnu)."""
+        return min((vers[u] + depuis[t] for depuis, vers in zip(self.depuis, self.vers)),
+                   default=float('inf'))
+
+
+def pretraitement(matrix=None, labels=None, k=NB_REPERES_DEFAUT, empreinte=None):
+    """
+    Pré-traitement ALT du graphe, calculé une seule fois puis mis en cache.
+    k est ramené dans [1, n] (au-delà, les mêmes repères seraient recalculés).
+    empreinte : celle du graphe, si l'appelant l'a déjà calculée.
+    """
+    matrix, labels = resoudre_graphe(matrix, labels)
+    k = max(1, min(int(k), len(labels)))
+    if empreinte is None:
+        empreinte = empreinte_graphe(matrix, labels)
+    cle = f"{empreinte}:{k}"
+    return reperes_par_graphe.get_ou_calcule(cle, lambda: PretraitementReperes(matrix, labels, k))
+
+
+def dijkstra_alt(ville_depart, ville_arrive, matrix=None, labels=None, k=NB_REPERES_DEFAUT):
+    """
+    Plus court chemin par A* guidé par les repères (ALT).
+
+    Même résultat que dijkstra.dijkstra, mais l'heuristique borne_inf oriente
+    la recherche vers la cible : beaucoup moins de sommets sont explorés.
+
+    Returns:
+        dict: {'chemin': str, 'distance_totale': float, 'noeuds_explores': int}
+            ou str en cas d'erreur (comme dijkstra.dijkstra)
+    """
+    matrix, labels = resoudre_graphe(matrix, labels)
+    try:
+        dep = labels.index(ville_depart)
+        arr = labels.index(ville_arrive)
+    except ValueError:
+        return f"Erreur : Une des villes ({ville_depart}, {ville_arrive}) n'existe pas dans la liste des labels."
+
+    # Paire sans chemin : réponse en O(1), sans calculer les repères
+    empreinte = empreinte_graphe(matrix, labels)
+    if sans_chemin(matrix, labels, dep, arr, empreinte):
+        return f"Aucun chemin entre {ville_depart} et {ville_arrive}"
+
+    pre = pretraitement(matrix, labels, k, empreinte)
+    if pre.borne_inf(dep, arr) == float('inf'):
+        return f"Aucun chemin entre {ville_depart} et {ville_arrive}"
+
+    distances = {dep: 0}
+    predecesseurs = {dep: -1}
+    fermes = set()
+    # File de priorité : (distance + minorant restant, index_ville)
+    file_prioritaire = [(pre.borne_inf(dep, arr), dep)]
+
+    while file_prioritaire:
+        _, u = heapq.heappop(file_prioritaire)
+        if u in fermes:
+            continue
+        fermes.add(u)
+        if u == arr:
+            break
+        for v, poids in pre.succ[u].items():
+            distance = distances[u] + poids
+            if distance < distances.get(v, float('inf')):
+                reste = pre.borne_inf(v, arr)
+                if reste == float('inf'):
+                    continue  # v ne mène pas à la cible
+                distances[v] = distance
+                predecesseurs[v] = u
+                heapq.heappush(file_prioritaire, (distance + reste, v))
+
+    if arr not in fermes:
+        return f"Aucun chemin entre {ville_depart} et {ville_arrive}"
+
+    chemin = []
+    etape = arr
+    while etape != -1:
+        chemin.append(pre.labels[etape])
+        etape = predecesseurs[etape]
+    chemin.reverse()
+
+    return {
+        "chemin": " -> ".join(chemin),
+        "distance_totale": distances[arr],
+        "noeuds_explores": len(fermes)
+    }
+
+
+def distance_approchee(ville_depart, ville_arrive, matrix=None, labels=None, k=NB_REPERES_DEFAUT):
+    """
+    Encadrement de la distance à partir des seuls repères, sans recherche.
+
+    Returns:
+        dict: {'borne_inf': float, 'borne_sup': float, 'exacte': bool} ou {'error': str}
+    """
+    pre = pretraitement(matrix, labels, k)
+    try:
+        dep = pre.index[ville_depart]
+        arr = pre.index[ville_arrive]
+    except KeyError:
+        return {"error": f"Une des villes ({ville_depart}, {ville_arrive}) n'existe pas dans la liste des labels."}
+
+    inf = 0 if dep == arr else pre.borne_inf(dep, arr)
+    sup = 0 if dep == arr else pre.borne_sup(dep, arr)
+    return {
+        "borne_inf": inf,
+        "borne_sup": sup,
+        "exacte": inf == sup
+    }
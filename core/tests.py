@@ -1,3 +1,1314 @@
-from django.test import TestCase
+import contextlib
+import heapq
+import io
+import itertools
+import json
+import math
+import os
+import tempfile
+import random
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.core.management import call_command
+from django.test import SimpleTestCase, modify_settings, override_settings
+
+from . import dijkstra, chemins_dynamiques, arbre_couvrant_dynamique, prim_kruskal, composantes, reperes
+from . import k_chemins, Floyd_Warshall, centralite, coalescence, precalcul, Matrice, bfs_dfs
+from . import files_priorite, MethodePert, memoire_partagee, registre_graphes, accessibilite, planificateur
+from . import parcours_flux, versions_graphe
+from .graphe import construire_csr, empreinte_graphe, CacheLRU
+from . import views
+from .management.commands import calcul_lot, rejouer_trafic
+from .views import executer_requete
+
+
+def graphe_aleatoire(n, densite=0.3, graine=0, poids_max=20, symetrique=False):
+    """Matrice d'adjacence aléatoire (poids entiers > 0, 0 : pas d'arc) et ses labels."""
+    rng = random.Random(graine)
+    matrix = [[0.0] * n for _ in range(n)]
+    for u in range(n):
+        for v in range(u + 1 if symetrique else 0, n):
+            if u != v and rng.random() < densite:
+                matrix[u][v] = float(rng.randint(1, poids_max))
+                if symetrique:
+                    matrix[v][u] = matrix[u][v]
+    return matrix, [f"V{i}" for i in range(n)]
+
+
+def evenements_aleatoires(matrix, labels, nb, graine=0, poids_max=20):
+    """Insertions, suppressions et changements de poids tirés au hasard."""
+    rng = random.Random(graine)
+    n = len(labels)
+    evenements = []
+    for _ in range(nb):
+        u, v = rng.sample(range(n), 2)
+        type_ev = rng.choice(('inserer', 'supprimer', 'modifier'))
+        ev = {'type': type_ev, 'de': labels[u], 'vers': labels[v]}
+        if type_ev != 'supprimer':
+            ev['poids'] = float(rng.randint(1, poids_max))
+        evenements.append(ev)
+    return evenements
+
+
+def appliquer_evenements(matrix, labels, evenements, symetrique=False):
+    """Copie de la matrice après les événements (référence pour un recalcul complet)."""
+    index = {ville: i for i, ville in enumerate(labels)}
+    copie = [list(ligne) for ligne in matrix]
+    for ev in evenements:
+        u, v = index[ev['de']], index[ev['vers']]
+        copie[u][v] = 0.0 if ev['type'] == 'supprimer' else ev['poids']
+        if symetrique:
+            copie[v][u] = copie[u][v]
+    return copie
+
+
+def requete(algo, matrix, labels, **options):
+    """Corps d'une requête /api/calculer/ sur un graphe fourni."""
+    return dict(options, algo=algo, matrix=json.dumps(matrix), labels=', '.join(labels))
+
+
+def graphe_avec_negatifs(n, graine):
+    """
+    Poids repondérés par un potentiel p : w(u, v) + p(u) - p(v). Certains
+    deviennent négatifs, mais tout cycle garde son poids positif d'origine.
+    """
+    matrix, labels = graphe_aleatoire(n, densite=0.2, graine=graine)
+    p = [random.Random(graine + u).randint(0, 15) for u in range(n)]
+    for u in range(n):
+        for v in range(n):
+            if matrix[u][v]:
+                matrix[u][v] += p[u] - p[v] or 0.5
+    return matrix, labels
+
+
+def atteignables(matrix):
+    """Pour chaque sommet, l'ensemble des sommets qu'il atteint (BFS de référence)."""
+    n = len(matrix)
+    resultat = []
+    for src in range(n):
+        vus = {src}
+        file = deque([src])
+        while file:
+            u = file.popleft()
+            for v in range(n):
+                if matrix[u][v] and v not in vus:
+                    vus.add(v)
+                    file.append(v)
+        resultat.append(vus)
+    return resultat
+
+
+class CheminsDynamiquesTests(SimpleTestCase):
+
+    def setUp(self):
+        chemins_dynamiques.arbres = chemins_dynamiques.CacheLRU(taille_max=64)
+
+    def test_mises_a_jour_identiques_a_un_recalcul_complet(self):
+        matrix, labels = graphe_aleatoire(25, graine=1)
+        res = chemins_dynamiques.arbre_dynamique('V0', matrix=matrix, labels=labels)
+        for lot in range(10):
+            evenements = evenements_aleatoires(matrix, labels, 5, graine=lot)
+            res = chemins_dynamiques.arbre_dynamique(arbre_id=res['arbre_id'], evenements=evenements)
+            self.assertNotIn('error', res)
+            matrix = appliquer_evenements(matrix, labels, evenements)
+            reference = dijkstra.arbre_dijkstra('V0', matrix=matrix, labels=labels)
+            self.assertEqual(res['distances'], list(reference.distances))
+
+    def test_evenement_invalide_ne_perd_pas_l_arbre(self):
+        matrix, labels = graphe_aleatoire(8, graine=2)
+        res = chemins_dynamiques.arbre_dynamique('V0', matrix=matrix, labels=labels)
+        for evenements in ('abc', [1], [{'type': 'modifier', 'de': 'V0', 'vers': 'V1', 'poids': 'x'}],
+                           [{'type': 'inserer', 'de': 'V0', 'vers': 'V1', 'poids': float('nan')}],
+                           [{'type': 'supprimer', 'de': 'V0', 'vers': 'Inconnue'}]):
+            erreur = chemins_dynamiques.arbre_dynamique(arbre_id=res['arbre_id'], evenements=evenements)
+            self.assertIn('error', erreur)
+        suite = chemins_dynamiques.arbre_dynamique(arbre_id=res['arbre_id'], evenements=[])
+        self.assertEqual(suite['distances'], res['distances'])
+
+    def test_ancienne_version_refusee_apres_mise_a_jour(self):
+        matrix, labels = graphe_aleatoire(8, graine=3)
+        res = chemins_dynamiques.arbre_dynamique('V0', matrix=matrix, labels=labels)
+        evenements = [{'type': 'inserer', 'de': 'V0', 'vers': 'V5', 'poids': 1.0}]
+        suivant = chemins_dynamiques.arbre_dynamique(arbre_id=res['arbre_id'], evenements=evenements)
+        self.assertNotIn('error', suivant)
+        self.assertIn('error', chemins_dynamiques.arbre_dynamique(arbre_id=res['arbre_id'], evenements=evenements))
+        self.assertNotIn('error', chemins_dynamiques.arbre_dynamique(arbre_id=suivant['arbre_id']))
+
+
+class ArbreCouvrantDynamiqueTests(SimpleTestCase):
+
+    def setUp(self):
+        arbre_couvrant_dynamique.arbres = arbre_couvrant_dynamique.CacheLRU(taille_max=64)
+
+    def test_poids_identique_a_kruskal_apres_mises_a_jour(self):
+        matrix, labels = graphe_aleatoire(20, densite=0.4, graine=4, symetrique=True)
+        res = arbre_couvrant_dynamique.arbre_couvrant_dynamique(matrix=matrix, labels=labels)
+        for lot in range(10):
+            evenements = evenements_aleatoires(matrix, labels, 4, graine=100 + lot)
+            res = arbre_couvrant_dynamique.arbre_couvrant_dynamique(arbre_id=res['arbre_id'], evenements=evenements)
+            self.assertNotIn('error', res)
+            matrix = appliquer_evenements(matrix, labels, evenements, symetrique=True)
+            self.assertEqual(res['weight'], prim_kruskal.kruskal(matrix=matrix, labels=labels)['weight'])
+
+    def test_matrice_asymetrique_refusee(self):
+        matrix, labels = graphe_aleatoire(6, graine=5)
+        res = arbre_couvrant_dynamique.arbre_couvrant_dynamique(matrix=matrix, labels=labels)
+        self.assertIn('symétrique', res['error'])
+
+    def test_poids_invalide_ne_perd_pas_l_arbre(self):
+        matrix, labels = graphe_aleatoire(6, densite=0.6, graine=6, symetrique=True)
+        res = arbre_couvrant_dynamique.arbre_couvrant_dynamique(matrix=matrix, labels=labels)
+        erreur = arbre_couvrant_dynamique.arbre_couvrant_dynamique(
+            arbre_id=res['arbre_id'], evenements=[{'type': 'modifier', 'de': 'V0', 'vers': 'V1', 'poids': [2]}])
+        self.assertIn('error', erreur)
+        suite = arbre_couvrant_dynamique.arbre_couvrant_dynamique(arbre_id=res['arbre_id'])
+        self.assertEqual(suite['weight'], res['weight'])
+
+
+class ComposantesTests(SimpleTestCase):
+
+    def test_composantes_fortes_et_paires_inaccessibles(self):
+        for graine in range(5):
+            matrix, labels = graphe_aleatoire(30, densite=0.06, graine=graine)
+            idx = composantes.IndexComposantes(matrix, labels)
+            acces = atteignables(matrix)
+            for i in range(30):
+                for j in range(30):
+                    mutuels = j in acces[i] and i in acces[j]
+                    self.assertEqual(idx.forte[i] == idx.forte[j], mutuels)
+                    if idx.inaccessible(i, j):
+                        self.assertNotIn(j, acces[i])
+                    faible = j in acces[i] or i in acces[j]
+                    if faible:
+                        self.assertEqual(idx.faible[i], idx.faible[j])
+
+    def test_dijkstra_repond_sans_parcours_pour_une_paire_inaccessible(self):
+        matrix = [[0, 1, 0], [0, 0, 0], [0, 0, 0]]
+        labels = ['A', 'B', 'C']
+        self.assertTrue(composantes.index_composantes(matrix, labels).inaccessible(0, 2))
+        with mock.patch.object(dijkstra, 'poids_max_entier', wraps=dijkstra.poids_max_entier) as recherche:
+            self.assertIsInstance(dijkstra.dijkstra('A', 'C', matrix=matrix, labels=labels), str)
+            recherche.assert_not_called()
+            self.assertEqual(dijkstra.dijkstra('A', 'B', matrix=matrix, labels=labels)['chemin'], 'A -> B')
+            recherche.assert_called()
+
+    def test_alt_et_k_chemins_repondent_sans_recherche(self):
+        matrix = [[0, 1, 0], [0, 0, 0], [0, 0, 0]]
+        labels = ['A', 'B', 'C']
+        with mock.patch.object(reperes, 'PretraitementReperes') as pretraitement:
+            self.assertEqual(reperes.dijkstra_alt('A', 'C', matrix, labels), "Aucun chemin entre A et C")
+            pretraitement.assert_not_called()
+        with mock.patch.object(k_chemins, 'liste_successeurs') as successeurs:
+            self.assertEqual(k_chemins.k_plus_courts_chemins('A', 'C', matrix=matrix, labels=labels),
+                             {'error': "Aucun chemin entre A et C"})
+            successeurs.assert_not_called()
+
+
+class ReperesTests(SimpleTestCase):
+
+    def test_alt_donne_les_distances_de_dijkstra(self):
+        matrix, labels = graphe_aleatoire(40, densite=0.1, graine=7)
+        rng = random.Random(7)
+        for _ in range(40):
+            a, b = rng.sample(labels, 2)
+            attendu = dijkstra.dijkstra(a, b, matrix=matrix, labels=labels)
+            obtenu = reperes.dijkstra_alt(a, b, matrix=matrix, labels=labels, k=3)
+            if isinstance(attendu, str):
+                self.assertIsInstance(obtenu, str)
+                continue
+            self.assertEqual(obtenu['distance_totale'], attendu['distance_totale'])
+            bornes = reperes.distance_approchee(a, b, matrix=matrix, labels=labels, k=3)
+            self.assertLessEqual(bornes['borne_inf'], attendu['distance_totale'])
+            self.assertGreaterEqual(bornes['borne_sup'], attendu['distance_totale'])
+
+    def test_nb_reperes_borne_ou_refuse(self):
+        matrix, labels = graphe_aleatoire(6, densite=0.5, graine=8)
+        for valeur, attendus in ((-3, 1), (0, 1), (10 ** 9, 6), ('2', 2)):
+            res = executer_requete(requete('reperes', matrix, labels, nb_reperes=valeur))
+            self.assertEqual(res['status'], 'success')
+            self.assertEqual(len(res['result']['reperes']), attendus)
+        with override_settings(GRAPHE_NB_REPERES_MAX=3):
+            res = executer_requete(requete('reperes', matrix, labels, nb_reperes=10 ** 9))
+        self.assertEqual(len(res['result']['reperes']), 3)
+        for valeur in ('abc', 2.5, [3]):
+            res = executer_requete(requete('reperes', matrix, labels, nb_reperes=valeur))
+            self.assertEqual(res['status'], 'error')
+            self.assertNotIn('trace', res)
+
+
+class KCheminsTests(SimpleTestCase):
+
+    @staticmethod
+    def chemins_elementaires(matrix, dep, arr):
+        """Distances de tous les chemins sans boucle dep -> arr (énumération de référence)."""
+        n = len(matrix)
+        distances = []
+        pile = [(dep, [dep], 0.0)]
+        while pile:
+            u, chemin, d = pile.pop()
+            if u == arr:
+                distances.append(d)
+                continue
+            for v in range(n):
+                if matrix[u][v] and v not in chemin:
+                    pile.append((v, chemin + [v], d + matrix[u][v]))
+        return sorted(distances)
+
+    def test_yen_donne_les_k_plus_courtes_distances(self):
+        for graine in range(4):
+            matrix, labels = graphe_aleatoire(8, densite=0.4, graine=graine)
+            for dep, arr in itertools.islice(itertools.permutations(range(8), 2), 0, 56, 7):
+                attendu = self.chemins_elementaires(matrix, dep, arr)[:5]
+                res = k_chemins.k_plus_courts_chemins(labels[dep], labels[arr], 5, matrix=matrix, labels=labels)
+                if not attendu:
+                    self.assertIn('error', res)
+                    continue
+                self.assertEqual([c['distance'] for c in res['chemins']], attendu)
+                for c in res['chemins']:
+                    self.assertEqual(len(set(c['chemin'])), len(c['chemin']))
+
+    @override_settings(GRAPHE_NB_CHEMINS_MAX=4)
+    def test_nb_chemins_borne_ou_refuse(self):
+        matrix = [[0 if u == v else 1 for v in range(6)] for u in range(6)]
+        labels = [f"V{i}" for i in range(6)]
+        for valeur, attendus in ((-2, 1), (0, 1), (10 ** 9, 4)):
+            res = executer_requete(requete('k_chemins', matrix, labels, depart='V0', arrivee='V1', nb_chemins=valeur))
+            self.assertEqual(len(res['result']['chemins']), attendus)
+        res = executer_requete(requete('k_chemins', matrix, labels, depart='V0', arrivee='V1', nb_chemins='x'))
+        self.assertEqual(res['status'], 'error')
+        self.assertNotIn('trace', res)
+
+
+class PlusProcheTests(SimpleTestCase):
+
+    def verifier(self, matrix, labels, sources, vers_sources):
+        res = dijkstra.dijkstra_multi_sources(sources, matrix=matrix, labels=labels, vers_sources=vers_sources)
+        if vers_sources:
+            arbres = {v: dijkstra.arbre_dijkstra(v, matrix=matrix, labels=labels) for v in labels}
+            distance = lambda s, v: arbres[v].distance(s)
+        else:
+            arbres = {s: dijkstra.arbre_dijkstra(s, matrix=matrix, labels=labels) for s in sources}
+            distance = lambda s, v: arbres[s].distance(v)
+        for v in labels:
+            attendu = min(distance(s, v) for s in sources)
+            self.assertAlmostEqual(res['distances'][v], attendu)
+            if attendu != float('inf'):
+                self.assertAlmostEqual(distance(res['plus_proche'][v], v), attendu)
+
+    def test_installation_la_plus_proche(self):
+        matrix, labels = graphe_aleatoire(30, densite=0.1, graine=9)
+        fractions = [[w / 7 for w in ligne] for ligne in matrix]   # File de priorité à tas
+        for m in (matrix, fractions):
+            for vers_sources in (False, True):
+                self.verifier(m, labels, ['V0', 'V7', 'V19'], vers_sources)
+
+
+class FloydBlocsTests(SimpleTestCase):
+
+    def test_blocs_identiques_a_floyd_simple(self):
+        matrix, labels = graphe_avec_negatifs(37, graine=10)
+        attendu = np.array(Floyd_Warshall.floyd_warshall(matrix=matrix, labels=labels))
+        for taille_bloc in (5, 16, 64):
+            D = Floyd_Warshall.floyd_warshall_blocs(matrix=matrix, labels=labels, taille_bloc=taille_bloc)
+            np.testing.assert_array_equal(D, attendu)
+
+    def test_blocs_en_parallele(self):
+        matrix, labels = graphe_avec_negatifs(40, graine=11)
+        attendu = np.array(Floyd_Warshall.floyd_warshall(matrix=matrix, labels=labels))
+        with mock.patch.object(Floyd_Warshall, 'SEUIL_PARALLELE', 0):
+            D = Floyd_Warshall.floyd_warshall_blocs(matrix=matrix, labels=labels, taille_bloc=8, workers=2)
+        np.testing.assert_array_equal(D, attendu)
+
+    def test_pool_commun_sans_fork(self):
+        with memoire_partagee.calcul_parallele() as pool:
+            self.assertNotEqual(pool._mp_context.get_start_method(), 'fork')
+        with memoire_partagee.calcul_parallele() as autre:
+            self.assertIs(autre, pool)
+
+    @override_settings(GRAPHE_CALCULS_PARALLELES_MAX=1)
+    def test_calculs_paralleles_limites(self):
+        with mock.patch.object(memoire_partagee, '_pool', None), \
+                mock.patch.object(memoire_partagee, '_calculs', None):
+            with memoire_partagee.calcul_parallele() as pool:
+                self.addCleanup(pool.shutdown)
+                self.assertFalse(memoire_partagee._calculs.acquire(blocking=False))
+            self.assertTrue(memoire_partagee._calculs.acquire(blocking=False))
+            memoire_partagee._calculs.release()
+
+
+class FloydDisqueTests(SimpleTestCase):
+
+    def setUp(self):
+        dossier = tempfile.TemporaryDirectory()
+        self.addCleanup(dossier.cleanup)
+        self.dossier = dossier.name
+        patch = mock.patch.object(views, 'MATRICES_DIR', self.dossier)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_precisions_reduites_identiques(self):
+        matrix, labels = graphe_aleatoire(30, densite=0.15, graine=12)
+        attendu = Floyd_Warshall.floyd_warshall_blocs(matrix=matrix, labels=labels)
+        for precision in ('float32', 'int32', 'int64'):
+            D = Floyd_Warshall.floyd_warshall_blocs(matrix=matrix, labels=labels,
+                                                    dtype=Floyd_Warshall.PRECISIONS[precision])
+            np.testing.assert_array_equal(Floyd_Warshall.masque_infini(D), np.isinf(attendu))
+            np.testing.assert_array_equal(D[np.isfinite(attendu)], attendu[np.isfinite(attendu)])
+
+    def test_pages_identiques_au_calcul_en_memoire(self):
+        matrix, labels = graphe_aleatoire(30, densite=0.15, graine=13)
+        memoire = executer_requete(requete('floyd', matrix, labels))['result']['matrice_distances']
+        res = executer_requete(requete('floyd', matrix, labels, stockage='disque', taille_page=7))
+        self.assertEqual(res['result']['matrice_distances'], memoire[:7])
+        matrice_id = res['result']['matrice_id']
+        page = executer_requete({'algo': 'floyd_page', 'matrice_id': matrice_id, 'debut': 10, 'fin': 20,
+                                 'col_debut': 5, 'col_fin': 9})
+        self.assertEqual(page['result']['matrice_distances'], [ligne[5:9] for ligne in memoire[10:20]])
+        self.assertEqual(sorted(os.listdir(self.dossier)),
+                         [matrice_id + '.npy', matrice_id + '.npy.labels.json'])
+
+    def test_bornes_de_page_ramenees_dans_la_matrice(self):
+        matrix, labels = graphe_aleatoire(12, densite=0.3, graine=14)
+        matrice_id = executer_requete(requete('floyd', matrix, labels, stockage='disque'))['result']['matrice_id']
+        page = executer_requete({'algo': 'floyd_page', 'matrice_id': matrice_id, 'debut': -5, 'fin': 10 ** 9,
+                                 'col_fin': -1})
+        self.assertEqual(page['result']['lignes'], labels)
+        self.assertEqual(page['result']['colonnes'], [])
+        for bornes in ({'debut': 'a'}, {'fin': [1]}, {'matrice_id': 3}):
+            res = executer_requete(dict({'algo': 'floyd_page', 'matrice_id': matrice_id}, **bornes))
+            self.assertEqual(res['status'], 'error')
+            self.assertNotIn('trace', res)
+
+    def test_calcul_en_echec_ne_laisse_aucun_fichier(self):
+        matrix = [[0, 1.5], [2.5, 0]]   # Poids non entiers : précision int32 impossible
+        for stockage in ('disque', None):
+            res = executer_requete(requete('floyd', matrix, ['A', 'B'], stockage=stockage, precision='int32'))
+            self.assertEqual(res['status'], 'error')
+            self.assertNotIn('trace', res)
+        self.assertEqual(os.listdir(self.dossier), [])
+
+    def test_pages_bornees_en_cases(self):
+        matrix, labels = graphe_aleatoire(12, densite=0.3, graine=15)
+        memoire = executer_requete(requete('floyd', matrix, labels))['result']['matrice_distances']
+        with mock.patch.object(views, 'CELLULES_PAGE_MATRICE_MAX', 20):
+            res = executer_requete(requete('floyd', matrix, labels, stockage='disque', taille_page=7))
+            self.assertEqual(res['result']['matrice_distances'], [ligne[:2] for ligne in memoire[:7]])
+            self.assertEqual(res['result']['colonnes'], labels[:2])
+            page = executer_requete({'algo': 'floyd_page', 'matrice_id': res['result']['matrice_id'],
+                                     'debut': 2, 'fin': 7, 'col_debut': 3})
+        self.assertEqual(page['result']['matrice_distances'], [ligne[3:7] for ligne in memoire[2:7]])
+
+    def test_dossier_borne_en_octets_et_en_age(self):
+        graphes = [graphe_aleatoire(12, densite=0.3, graine=graine) for graine in (16, 17, 18)]
+        stocker = lambda g: executer_requete(requete('floyd', *g, stockage='disque'))['result']['matrice_id']
+        with override_settings(GRAPHE_MATRICES_OCTETS_MAX=2000):
+            premiere = stocker(graphes[0])
+            seconde = stocker(graphes[1])    # Un seul fichier de 12 × 12 × 8 octets tient
+            self.assertEqual(sorted(os.listdir(self.dossier)), [seconde + '.npy', seconde + '.npy.labels.json'])
+            res = executer_requete({'algo': 'floyd_page', 'matrice_id': premiere})
+            self.assertEqual(res['error'], f"Matrice inconnue : {premiere}")
+        ancien = time.time() - 7200
+        os.utime(os.path.join(self.dossier, seconde + '.npy'), (ancien, ancien))
+        with override_settings(GRAPHE_MATRICES_DUREE_MAX=3600):
+            troisieme = stocker(graphes[2])
+        self.assertEqual(sorted(os.listdir(self.dossier)), [troisieme + '.npy', troisieme + '.npy.labels.json'])
+        with override_settings(GRAPHE_MATRICES_OCTETS_MAX=100):
+            res = executer_requete(requete('floyd', *graphes[0], stockage='disque'))
+        self.assertEqual(res['status'], 'error')
+        self.assertNotIn('trace', res)
+
+
+class DijkstraTousCouplesTests(SimpleTestCase):
+
+    def test_identique_a_floyd(self):
+        matrix, labels = graphe_aleatoire(35, densite=0.12, graine=15)
+        fractions = [[w / 3 for w in ligne] for ligne in matrix]
+        for m in (matrix, fractions):
+            attendu = Floyd_Warshall.floyd_warshall_blocs(matrix=m, labels=labels)
+            np.testing.assert_allclose(dijkstra.dijkstra_tous_couples(matrix=m, labels=labels), attendu)
+
+    def test_en_parallele(self):
+        matrix, labels = graphe_aleatoire(40, densite=0.1, graine=16)
+        attendu = Floyd_Warshall.floyd_warshall_blocs(matrix=matrix, labels=labels)
+        with mock.patch.object(dijkstra, 'SEUIL_PARALLELE', 0):
+            D = dijkstra.dijkstra_tous_couples(matrix=matrix, labels=labels, workers=2)
+        np.testing.assert_array_equal(D, attendu)
+
+
+class CentraliteProximiteTests(SimpleTestCase):
+
+    def reference(self, matrix, labels):
+        D = Floyd_Warshall.floyd_warshall_blocs(matrix=matrix, labels=labels)
+        return {ville: float(D[i][np.isfinite(D[i])].sum()) for i, ville in enumerate(labels)}
+
+    def test_eloignement_identique_a_floyd(self):
+        for poids_max in (1, 20):     # Parcours en largeur, puis Dijkstra
+            matrix, labels = graphe_aleatoire(30, densite=0.12, graine=17, poids_max=poids_max)
+            res = centralite.centralite_proximite(matrix=matrix, labels=labels, workers=1)
+            self.assertEqual(res['eloignement'], self.reference(matrix, labels))
+
+    def test_echantillon_complet_exact_et_graine_reproductible(self):
+        matrix, labels = graphe_aleatoire(25, densite=0.2, graine=18)
+        transposee = [list(ligne) for ligne in zip(*matrix)]
+        complet = centralite.centralite_proximite_approchee(matrix=transposee, labels=labels,
+                                                            echantillon=25, workers=1)
+        self.assertEqual(complet['epsilon'], 0.0)
+        for ville, attendu in self.reference(transposee, labels).items():
+            self.assertAlmostEqual(complet['eloignement'][ville], attendu)
+        a, b = (centralite.centralite_proximite_approchee(matrix=matrix, labels=labels, echantillon=5,
+                                                          workers=1, graine=3) for _ in range(2))
+        self.assertEqual(a, b)
+
+    def test_calculs_simultanes_dans_plusieurs_threads(self):
+        graphes = [graphe_aleatoire(60, densite=0.08, graine=g) for g in range(6)]
+        attendus = [self.reference(m, l) for m, l in graphes]
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            resultats = list(pool.map(
+                lambda g: centralite.centralite_proximite(matrix=g[0], labels=g[1], workers=1)['eloignement'],
+                graphes * 3))
+        self.assertEqual(resultats, attendus * 3)
+
+    def test_echantillon_borne_ou_refuse(self):
+        matrix, labels = graphe_aleatoire(10, densite=0.3, graine=19)
+        for valeur, attendu in ((-3, 1), ('4', 4), (10 ** 9, 10)):
+            res = executer_requete(requete('centralite', matrix, labels, approx=True, echantillon=valeur))
+            self.assertEqual(res['result']['echantillon'], attendu)
+        for valeur in ('abc', 2.5, [3]):
+            res = executer_requete(requete('centralite', matrix, labels, approx=True, echantillon=valeur))
+            self.assertEqual(res['status'], 'error')
+            self.assertNotIn('trace', res)
+
+
+def intermediarite_brute(matrix):
+    """Intermédiarité des nœuds et des arcs par dénombrement direct des plus courts chemins."""
+    n = len(matrix)
+    D = Floyd_Warshall.floyd_warshall_blocs(matrix=matrix, labels=[str(i) for i in range(n)])
+    arcs = [(u, v) for u in range(n) for v in range(n) if u != v and matrix[u][v] > 0]
+    sigma = np.zeros((n, n))
+    for s in range(n):
+        sigma[s][s] = 1
+        for v in sorted(range(n), key=lambda x: D[s][x]):
+            if v != s and np.isfinite(D[s][v]):
+                sigma[s][v] = sum(sigma[s][u] for u, w in arcs if w == v and D[s][u] + matrix[u][v] == D[s][v])
+    noeuds, aretes = [0.0] * n, {arc: 0.0 for arc in arcs}
+    for s, t in itertools.permutations(range(n), 2):
+        if not np.isfinite(D[s][t]):
+            continue
+        for v in range(n):
+            if v not in (s, t) and D[s][v] + D[v][t] == D[s][t]:
+                noeuds[v] += sigma[s][v] * sigma[v][t] / sigma[s][t]
+        for u, v in arcs:
+            if D[s][u] + matrix[u][v] + D[v][t] == D[s][t]:
+                aretes[(u, v)] += sigma[s][u] * sigma[v][t] / sigma[s][t]
+    return noeuds, aretes
+
+
+class IntermediariteTests(SimpleTestCase):
+
+    def test_identique_au_denombrement_direct(self):
+        for poids_max in (1, 3):     # Parcours en largeur, puis Dijkstra (nombreuses égalités)
+            matrix, labels = graphe_aleatoire(12, densite=0.3, graine=19, poids_max=poids_max)
+            res = centralite.centralite_intermediarite(matrix=matrix, labels=labels, workers=1)
+            noeuds, aretes = intermediarite_brute(matrix)
+            for i, ville in enumerate(labels):
+                self.assertAlmostEqual(res['noeuds'][ville], noeuds[i])
+            scores = {(labels.index(a['de']), labels.index(a['vers'])): a['score'] for a in res['aretes']}
+            self.assertEqual(scores.keys(), aretes.keys())
+            for arc, score in aretes.items():
+                self.assertAlmostEqual(scores[arc], score)
+
+    def test_graphe_non_oriente(self):
+        matrix, labels = graphe_aleatoire(12, densite=0.3, graine=20, poids_max=2, symetrique=True)
+        res = centralite.centralite_intermediarite(matrix=matrix, labels=labels, workers=1)
+        noeuds, aretes = intermediarite_brute(matrix)
+        for i, ville in enumerate(labels):
+            self.assertAlmostEqual(res['noeuds'][ville], noeuds[i] / 2)
+        scores = {(labels.index(a['de']), labels.index(a['vers'])): a['score'] for a in res['aretes']}
+        self.assertEqual(len(scores), len(aretes) // 2)
+        for (u, v), score in scores.items():
+            self.assertAlmostEqual(score, aretes[(u, v)])
+
+    def test_calculs_simultanes_dans_plusieurs_threads(self):
+        graphes = [graphe_aleatoire(40, densite=0.1, graine=g) for g in range(4)]
+        attendus = [centralite.centralite_intermediarite(matrix=m, labels=l, workers=1) for m, l in graphes]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            resultats = list(pool.map(
+                lambda g: centralite.centralite_intermediarite(matrix=g[0], labels=g[1], workers=1),
+                graphes * 3))
+        self.assertEqual(resultats, attendus * 3)
+
+    def test_echantillon_borne_ou_refuse(self):
+        matrix, labels = graphe_aleatoire(10, densite=0.3, graine=22)
+        for valeur, attendu in ((-3, 1), ('4', 4), (10 ** 9, 10)):
+            res = executer_requete(requete('intermediarite', matrix, labels, echantillon=valeur, graine=1))
+            self.assertEqual(res['result']['echantillon'], attendu)
+        for valeur in ('abc', 2.5, [3]):
+            res = executer_requete(requete('intermediarite', matrix, labels, echantillon=valeur))
+            self.assertEqual(res['status'], 'error')
+            self.assertNotIn('trace', res)
+
+
+class CoalescenceTests(SimpleTestCase):
+
+    def test_cle_independante_de_la_mise_en_forme(self):
+        a = {'algo': 'floyd', 'matrix': '[[0, 1], [1, 0]]', 'labels': 'A, B', 'depart': ' A'}
+        b = {'depart': 'A', 'labels': 'A,B', 'matrix': '[[0,1],\n [1,0]]', 'algo': 'floyd'}
+        self.assertEqual(coalescence.cle_requete(a), coalescence.cle_requete(b))
+        self.assertNotEqual(coalescence.cle_requete(a), coalescence.cle_requete(dict(a, algo='bfs')))
+        self.assertIsNone(coalescence.cle_partageable(dict(a, algo='dijkstra_dynamique')))
+        self.assertIsNone(coalescence.cle_partageable([a]))
+
+    def test_appels_simultanes_partagent_un_calcul(self):
+        regroupement = coalescence.Coalescence()
+        lancement = threading.Event()
+        appels = []
+
+        def calcul():
+            appels.append(1)
+            lancement.wait(5)
+            return {'valeur': 42}
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            futurs = [pool.submit(regroupement.executer, 'cle', calcul) for _ in range(5)]
+            while regroupement.partages < 4:
+                time.sleep(0.001)
+            lancement.set()
+            resultats = [f.result() for f in futurs]
+        self.assertEqual(len(appels), 1)
+        self.assertEqual(sorted(partage for _, partage in resultats), [False] + [True] * 4)
+        self.assertTrue(all(r is resultats[0][0] for r, _ in resultats))
+
+        # Rien n'est conservé : l'appel suivant recalcule
+        lancement.set()
+        self.assertEqual(regroupement.executer('cle', calcul), ({'valeur': 42}, False))
+        self.assertEqual(len(appels), 2)
+
+    def test_erreur_transmise_aux_appels_en_attente(self):
+        regroupement = coalescence.Coalescence()
+        lancement = threading.Event()
+
+        def calcul():
+            lancement.wait(5)
+            raise RuntimeError('échec')
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futurs = [pool.submit(regroupement.executer, 'cle', calcul) for _ in range(3)]
+            while regroupement.partages < 2:
+                time.sleep(0.001)
+            lancement.set()
+            for futur in futurs:
+                with self.assertRaises(RuntimeError):
+                    futur.result()
+
+    def test_requetes_http_identiques_simultanees(self):
+        matrix, labels = graphe_aleatoire(8, graine=21)
+        corps = json.dumps(requete('floyd', matrix, labels))
+        lancement = threading.Event()
+        executer = views.executer_requete
+
+        def lent(data):
+            lancement.wait(5)
+            return executer(data)
+
+        partages = coalescence.requetes_en_cours.partages
+        with mock.patch.object(views, 'executer_requete', side_effect=lent) as simule:
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                futurs = [pool.submit(self.client.post, '/api/calculer/', corps, content_type='application/json')
+                          for _ in range(3)]
+                while coalescence.requetes_en_cours.partages < partages + 2:
+                    time.sleep(0.001)
+                lancement.set()
+                reponses = [f.result() for f in futurs]
+        self.assertEqual(simule.call_count, 1)
+        self.assertEqual(sorted(r.get('X-Requete-Partagee') or '' for r in reponses), ['', '1', '1'])
+        self.assertEqual(len({r.content for r in reponses}), 1)
+
+
+@override_settings(GRAPHE_PRECALCUL=True)
+class PrecalculTests(SimpleTestCase):
+
+    def setUp(self):
+        dossier = tempfile.TemporaryDirectory()
+        self.addCleanup(dossier.cleanup)
+        self.dossier = dossier.name
+        reglage = override_settings(GRAPHE_PRECALCUL_DIR=self.dossier)
+        reglage.enable()
+        self.addCleanup(reglage.disable)
+        for nom, valeur in (('_table', None), ('_initialise', False)):
+            patch = mock.patch.object(precalcul, nom, valeur)
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_table_construite_a_la_premiere_utilisation_puis_relue(self):
+        table = precalcul.table()
+        self.assertIsNotNone(table)
+        self.assertIs(precalcul.table(), table)
+        self.assertEqual(len(os.listdir(self.dossier)), 1)
+
+        precalcul._table, precalcul._initialise = None, False
+        with mock.patch.object(precalcul.TablePrecalculee, 'calculer') as calculer:
+            relue = precalcul.table()
+        calculer.assert_not_called()
+        self.assertEqual(json.dumps(relue.reponses), json.dumps(table.reponses))
+
+    def test_reponse_identique_au_calcul(self):
+        data = {'algo': 'dijkstra', 'depart': Matrice.villes[0], 'arrivee': Matrice.villes[-1]}
+        self.assertEqual(precalcul.reponse_precalculee(data, None, None), executer_requete(dict(data, graine=1)))
+
+    def test_requete_hors_table_ne_construit_rien(self):
+        matrix, labels = graphe_aleatoire(5, graine=22)
+        executer_requete(requete('dijkstra', matrix, labels, depart='V0', arrivee='V4'))
+        self.assertFalse(precalcul._initialise)
+        self.assertEqual(os.listdir(self.dossier), [])
+
+    @override_settings(GRAPHE_PRECALCUL=False)
+    def test_desactive(self):
+        self.assertIsNone(precalcul.table())
+        self.assertEqual(os.listdir(self.dossier), [])
+
+    def test_commande_precalculer(self):
+        sortie = io.StringIO()
+        call_command('precalculer', stdout=sortie)
+        self.assertIn(f"pour {len(Matrice.villes)} villes", sortie.getvalue())
+        self.assertIsNotNone(precalcul.table())
+
+
+class CalculLotTests(SimpleTestCase):
+
+    def setUp(self):
+        dossier = tempfile.TemporaryDirectory()
+        self.addCleanup(dossier.cleanup)
+        self.entree = os.path.join(dossier.name, 'requetes.jsonl')
+        self.sortie = os.path.join(dossier.name, 'reponses.jsonl')
+        self.requetes = []
+        for g in range(3):
+            matrix, labels = graphe_aleatoire(6, densite=0.4, graine=23 + g)
+            for algo, depart in (('dijkstra', 'V0'), ('bfs', 'V1'), ('floyd', ''), ('dijkstra', 'V0')):
+                self.requetes.append(requete(algo, matrix, labels, depart=depart, arrivee='V5'))
+        self.requetes.append(requete('dijkstra_dynamique', matrix, labels, depart='V0'))
+
+    def executer(self, lignes, **options):
+        with open(self.entree, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lignes) + '\n')
+        call_command('calcul_lot', self.entree, sortie=self.sortie, stderr=io.StringIO(), **options)
+        with open(self.sortie, encoding='utf-8') as f:
+            return {r['ligne']: r['reponse'] for r in map(json.loads, f)}
+
+    def test_reponses_identiques_aux_requetes_isolees(self):
+        lignes = [json.dumps(r) for r in self.requetes] + ['', '[1, 2]', '{pas du json']
+        for options in ({'workers': 1, 'taille_lot': 2}, {'workers': 2, 'taille_lot': 3}):
+            reponses = self.executer(lignes, **options)
+            self.assertEqual(sorted(reponses), list(range(1, len(self.requetes) + 1)) + [15, 16])
+            for i, data in enumerate(self.requetes[:-1], start=1):
+                self.assertEqual(reponses[i], json.loads(json.dumps(executer_requete(data))))
+            self.assertIn('arbre_id', reponses[len(self.requetes)]['result'])
+            self.assertEqual(reponses[15]['status'], 'error')
+            self.assertEqual(reponses[16]['status'], 'error')
+
+    def test_fichier_lu_au_fil_des_lots(self):
+        lues = []
+
+        def lignes():
+            for data in self.requetes[:-1]:
+                lues.append(data)
+                yield json.dumps(data) + '\n'
+
+        commande = calcul_lot.Command(stdout=io.StringIO())
+        commande.nb_requetes, commande.graphes = 0, set()
+        lots = commande._lots(lignes(), commande.stdout, taille_lot=2)
+        self.assertEqual([ligne for ligne, _ in next(lots)[3]], [1, 2])
+        self.assertEqual(len(lues), 2)
+        with mock.patch.object(calcul_lot, 'GRAPHES_EN_ATTENTE_MAX', 1):
+            restants = list(commande._lots(lignes(), commande.stdout, taille_lot=10))
+        self.assertEqual([len(lot[3]) for lot in restants], [4, 4, 4])
+
+    def test_versions_executees_dans_ce_processus(self):
+        matrix, labels = graphe_aleatoire(6, densite=0.4, graine=26)
+        evenements = [{'type': 'modifier', 'de': 'V0', 'vers': 'V5', 'poids': 1}]
+        with mock.patch.object(versions_graphe, 'versions', CacheLRU(taille_max=8)):
+            version = executer_requete(requete('version', matrix, labels, evenements=evenements))['result']['version']
+        lignes = [json.dumps(requete('version', matrix, labels, evenements=evenements)),
+                  json.dumps({'algo': 'dijkstra', 'version': version, 'depart': 'V0', 'arrivee': 'V5'}),
+                  json.dumps(self.requetes[0])]
+        commande = calcul_lot.Command(stdout=io.StringIO())
+        commande.nb_requetes, commande.graphes = 0, set()
+        with mock.patch.object(versions_graphe, 'versions', CacheLRU(taille_max=8)), \
+                mock.patch.object(commande, '_ecrire') as ecrire:
+            lots = list(commande._lots((l + '\n' for l in lignes), commande.stdout, taille_lot=10))
+        self.assertEqual([ligne for lot in lots for ligne, _ in lot[3]], [3])
+        self.assertEqual([appel.args[1] for appel in ecrire.call_args_list], [1, 2])
+        self.assertEqual(ecrire.call_args_list[1].args[2]['result']['distance_totale'], 1.0)
+
+
+class BellmanFordTests(SimpleTestCase):
+
+    def test_chemins_de_l_arbre_identiques_a_floyd(self):
+        matrix, labels = graphe_avec_negatifs(20, graine=26)
+        D = Floyd_Warshall.floyd_warshall(matrix=matrix, labels=labels)
+        for arrivee in labels:
+            res = executer_requete(requete('bellman', matrix, labels, depart='V0', arrivee=arrivee))
+            self.assertEqual(res['status'], 'success')
+            json.dumps(res)     # Aucun objet ArbreChemins dans la réponse
+            attendu = D[0][labels.index(arrivee)]
+            if attendu == float('inf'):
+                self.assertNotIn('chemin_texte', res['result'])
+                self.assertEqual(res['path'], [])
+                continue
+            self.assertAlmostEqual(res['result']['dist_arrivee'], attendu)
+            chemin = [labels.index(v) for v in res['result']['chemin_texte'].split(' → ')]
+            self.assertEqual((chemin[0], chemin[-1]), (0, labels.index(arrivee)))
+            self.assertAlmostEqual(sum(matrix[u][v] for u, v in zip(chemin, chemin[1:])), attendu)
+
+    def test_cycle_negatif(self):
+        matrix = [[0, 1, 0], [0, 0, -3], [1, 0, 0]]
+        res = executer_requete(requete('bellman', matrix, ['A', 'B', 'C'], depart='A', arrivee='C'))
+        self.assertEqual(sorted(res['result']['cycle']), ['A', 'B', 'C'])
+
+
+def distances_bfs(matrix, src):
+    """Distances en nombre d'arcs depuis src (-1 si inaccessible), BFS de référence."""
+    n = len(matrix)
+    distances = [-1] * n
+    distances[src] = 0
+    file = deque([src])
+    while file:
+        u = file.popleft()
+        for v in range(n):
+            if matrix[u][v] and distances[v] == -1:
+                distances[v] = distances[u] + 1
+                file.append(v)
+    return distances
+
+
+class BfsMultiTests(SimpleTestCase):
+
+    def test_identique_a_un_bfs_par_source(self):
+        for n, densite, nb in ((30, 0.08, 5), (150, 0.015, 130)):     # Un, puis trois mots de bits
+            matrix, labels = graphe_aleatoire(n, densite=densite, graine=27)
+            sources = random.Random(n).choices(labels, k=nb)             # Avec doublons
+            res = bfs_dfs.bfs_multi(sources, matrix=matrix, labels=labels)
+            self.assertEqual(res['distances'].tolist(),
+                             [distances_bfs(matrix, labels.index(s)) for s in sources])
+
+    def test_chemin_long(self):
+        n = 200
+        matrix = [[1.0 if v == u + 1 else 0.0 for v in range(n)] for u in range(n)]
+        labels = [f"V{i}" for i in range(n)]
+        res = bfs_dfs.bfs_multi(['V0', 'V150'], matrix=matrix, labels=labels)
+        self.assertEqual(res['distances'][0].tolist(), list(range(n)))
+        self.assertEqual(res['distances'][1].tolist(), [-1] * 150 + list(range(50)))
+
+
+class FilesPrioriteTests(SimpleTestCase):
+
+    def extractions(self, file, graine, cle_max, monotone=True):
+        """Ordre des clés extraites de file et d'un tas heapq soumis aux mêmes ajouts."""
+        rng = random.Random(graine)
+        tas, obtenu, attendu = [], [], []
+        courant = 0
+        for _ in range(2000):
+            if tas and rng.random() < 0.45:
+                file.extraire()
+                obtenu.append(file.courant)
+                courant = heapq.heappop(tas)
+                attendu.append(courant)
+            else:
+                cle = (courant if monotone else 0) + rng.randint(0, cle_max)
+                file.ajouter(cle, None)
+                heapq.heappush(tas, cle)
+        while tas:
+            file.extraire()
+            obtenu.append(file.courant)
+            attendu.append(heapq.heappop(tas))
+        self.assertEqual(len(file), 0)
+        return obtenu, attendu
+
+    def test_seaux_et_tas_radix_dans_l_ordre_de_heapq(self):
+        for file, cle_max, monotone in ((files_priorite.FileSeaux(50), 50, True),
+                                        (files_priorite.FileSeaux(50, monotone=False), 50, False),
+                                        (files_priorite.TasRadix(), 10 ** 6, True)):
+            obtenu, attendu = self.extractions(file, 28, cle_max, monotone)
+            self.assertEqual(obtenu, attendu)
+
+    def test_poids_max_entier(self):
+        self.assertEqual(files_priorite.poids_max_entier([[0, 3], [7, 0]]), 7)
+        self.assertIsNone(files_priorite.poids_max_entier([[0, 2.5], [1, 0]]))
+        self.assertIsNone(files_priorite.poids_max_entier([[0, -2], [1, 0]]))
+        self.assertEqual(files_priorite.poids_max_entier([[0, -2], [1, 0]], positifs=True), 1)
+
+    def test_distances_csr_identiques_au_tas(self):
+        for poids_max in (20, 10 ** 5):     # Seaux de Dial, puis tas radix
+            matrix, labels = graphe_aleatoire(60, densite=0.08, graine=29, poids_max=poids_max)
+            indptr, indices, poids = construire_csr(matrix, 60, positifs=True)
+            pmax = files_priorite.poids_max_entier(poids)
+            for src in range(0, 60, 7):
+                self.assertEqual(dijkstra.distances_csr(src, indptr, indices, poids, 60, pmax),
+                                 dijkstra.distances_csr(src, indptr, indices, poids, 60))
+
+    def test_plus_proche_et_prim_identiques_avec_poids_fractionnaires(self):
+        matrix, labels = graphe_aleatoire(40, densite=0.15, graine=30, symetrique=True)
+        # Poids × 1.5 : non entiers, donc file à tas, et mêmes plus courts chemins
+        entiers = dijkstra.dijkstra_multi_sources(['V0', 'V9'], matrix=matrix, labels=labels)
+        tas = dijkstra.dijkstra_multi_sources(['V0', 'V9'], matrix=[[w * 1.5 for w in l] for l in matrix],
+                                              labels=labels)
+        self.assertEqual(entiers['plus_proche'], tas['plus_proche'])
+        for ville, d in entiers['distances'].items():
+            self.assertEqual(d * 1.5, tas['distances'][ville])
+
+        prim = prim_kruskal.prim('V0', matrix=matrix, labels=labels)
+        self.assertEqual(prim['weight'], prim_kruskal.kruskal(matrix=matrix, labels=labels)['weight'])
+        # Poids - 0.5 : même arbre couvrant, construit avec le tas
+        decales = [[w - 0.5 if w else 0.0 for w in ligne] for ligne in matrix]
+        prim_tas = prim_kruskal.prim('V0', matrix=decales, labels=labels)
+        self.assertEqual(prim['weight'] - 0.5 * len(prim['edges']), prim_tas['weight'])
+
+    def test_prim_grand_poids_entier_sans_seaux(self):
+        matrix = [[0, 5_000_000, 2], [5_000_000, 0, 3], [2, 3, 0]]
+        with mock.patch.object(prim_kruskal, 'FileSeaux', side_effect=AssertionError('seaux')):
+            prim = prim_kruskal.prim('A', matrix=matrix, labels=['A', 'B', 'C'])
+        self.assertEqual(prim, {'edges': [('A', 'C'), ('C', 'B')], 'weight': 5})
+
+
+@modify_settings(MIDDLEWARE={'append': 'core.middleware.CaptureTrafic'})
+class CaptureTraficTests(SimpleTestCase):
+
+    def setUp(self):
+        dossier = tempfile.TemporaryDirectory()
+        self.addCleanup(dossier.cleanup)
+        self.fichier = os.path.join(dossier.name, 'trafic.jsonl')
+        reglage = override_settings(GRAPHE_CAPTURE_FICHIER=self.fichier)
+        reglage.enable()
+        self.addCleanup(reglage.disable)
+
+    def capture(self):
+        with open(self.fichier, encoding='utf-8') as f:
+            return [json.loads(ligne) for ligne in f]
+
+    def test_requetes_api_enregistrees(self):
+        matrix, labels = graphe_aleatoire(6, graine=31)
+        corps = [json.dumps(requete(algo, matrix, labels, depart='V0')) for algo in ('bfs', 'dijkstra', 'floyd')]
+        for c in corps:
+            self.client.post('/api/calculer/', c, content_type='application/json')
+        self.client.get('/')
+        capture = self.capture()
+        self.assertEqual([e['corps'] for e in capture], corps)
+        self.assertEqual([e['algo'] for e in capture], ['bfs', 'dijkstra', 'floyd'])
+        self.assertTrue(all(e['statut'] == 200 and e['duree_ms'] >= 0 for e in capture))
+
+    @override_settings(GRAPHE_CAPTURE_TAUX=0.0)
+    def test_taux_nul(self):
+        self.client.post('/api/calculer/', '{}', content_type='application/json')
+        self.assertFalse(os.path.exists(self.fichier))
+
+    def test_rejeu(self):
+        matrix, labels = graphe_aleatoire(6, graine=32)
+        self.client.post('/api/calculer/', json.dumps(requete('bfs', matrix, labels, depart='V0')),
+                         content_type='application/json')
+        self.client.post('/api/calculer/', json.dumps({'algo': 'dijkstra', 'depart': 'Inconnue'}),
+                         content_type='application/json')
+        sortie = io.StringIO()
+        with override_settings(GRAPHE_CAPTURE_FICHIER=None):
+            call_command('rejouer_trafic', self.fichier, concurrence=2, repetitions=3, stdout=sortie)
+        lignes = sortie.getvalue().splitlines()
+        self.assertTrue(lignes[0].startswith('6 requêtes'))
+        bfs, = [l.split() for l in lignes if l.startswith('bfs')]
+        dijkstra_, = [l.split() for l in lignes if l.startswith('dijkstra')]
+        self.assertEqual((bfs[1], bfs[2]), ('3', '0'))
+        self.assertEqual((dijkstra_[1], dijkstra_[2]), ('3', '3'))
+
+    def test_duree_reponse_diffusee(self):
+        def lent(start_idx, matrix, n):
+            for u in range(3):
+                time.sleep(0.02)
+                yield u, u - 1, u
+
+        with mock.patch.dict(parcours_flux.PARCOURS, {'bfs': lent}):
+            response = self.client.post('/api/parcours/', json.dumps({'algo': 'bfs', 'depart': Matrice.villes[0]}),
+                                        content_type='application/json')
+            self.assertFalse(os.path.exists(self.fichier))
+            b''.join(response.streaming_content)
+        capture, = self.capture()
+        self.assertEqual(capture['chemin'], '/api/parcours/')
+        self.assertGreaterEqual(capture['duree_ms'], 60)
+
+    def test_percentile(self):
+        valeurs = list(range(1, 101))
+        self.assertEqual([rejouer_trafic.percentile(valeurs, p) for p in (50, 95, 99, 100)], [50, 95, 99, 100])
+        self.assertTrue(math.isnan(rejouer_trafic.percentile([], 50)))
+
+
+class GrapheRenvoyeTests(SimpleTestCase):
+
+    def test_seulement_les_aretes_a_surligner(self):
+        matrix, labels = graphe_aleatoire(15, densite=0.3, graine=33, symetrique=True)
+        index = {ville: i for i, ville in enumerate(labels)}
+        for algo in ('bfs', 'dfs', 'prim', 'kruskal', 'intermediarite'):
+            res = executer_requete(requete(algo, matrix, labels, depart='V0'))
+            self.assertEqual(res['status'], 'success')
+            self.assertEqual(list(res['new_graph']), ['highlight_edges'])
+            aretes = res['new_graph']['highlight_edges']
+            self.assertTrue(aretes)
+            for u, v in aretes:
+                self.assertTrue(matrix[index[u]][index[v]], (algo, u, v))
+        poids = sum(matrix[index[u]][index[v]]
+                    for u, v in executer_requete(requete('prim', matrix, labels, depart='V0'))['new_graph']['highlight_edges'])
+        self.assertEqual(poids, prim_kruskal.kruskal(matrix=matrix, labels=labels)['weight'])
+
+    def test_graphe_pert_en_liste_d_arcs(self):
+        taches = {'T1': {'duree': 2, 'predecesseurs': []}, 'T2': {'duree': 3, 'predecesseurs': ['T1']},
+                  'T3': {'duree': 1, 'predecesseurs': ['T1']}, 'T4': {'duree': 4, 'predecesseurs': ['T2', 'T3']}}
+        with contextlib.redirect_stdout(io.StringIO()):
+            res = executer_requete({'algo': 'pert', 'pert_data': json.dumps(taches)})
+            defaut = executer_requete({'algo': 'pert'})
+        self.assertEqual(res['new_graph'], {'labels': ['T1', 'T2', 'T3', 'T4'],
+                                            'edges': [['T1', 'T2', 2], ['T1', 'T3', 2],
+                                                      ['T2', 'T4', 3], ['T3', 'T4', 1]]})
+        self.assertEqual(defaut['new_graph']['labels'], list(MethodePert.default_taches))
+        self.assertEqual(len(defaut['new_graph']['edges']),
+                         sum(len(t['predecesseurs']) for t in MethodePert.default_taches.values()))
+
+
+class CacheHttpTests(SimpleTestCase):
+
+    def setUp(self):
+        patch = mock.patch.object(views, 'resultats', CacheLRU(taille_max=8, octets_max=10 ** 6,
+                                                               taille=lambda entree: len(entree[0])))
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.matrix, self.labels = graphe_aleatoire(10, densite=0.3, graine=34)
+
+    def poster(self, algo, **options):
+        return self.client.post('/api/calculer/', json.dumps(requete(algo, self.matrix, self.labels, **options)),
+                                content_type='application/json')
+
+    def test_resultat_relu_en_get_avec_etag(self):
+        reponse = self.poster('floyd')
+        url, etag = reponse['Content-Location'], reponse['ETag']
+        relu = self.client.get(url)
+        self.assertEqual((relu.status_code, relu.content, relu['ETag']), (200, reponse.content, etag))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='"autre"').status_code, 200)
+        self.assertEqual(self.client.get('/api/resultat/inconnue/').status_code, 404)
+
+    def test_tirages_aleatoires_non_conserves(self):
+        for algo, options in (('centralite', {'approx': True, 'echantillon': 3}),
+                              ('centralite', {'approx': True, 'echantillon': 3, 'graine': 1}),
+                              ('intermediarite', {'echantillon': 3})):
+            reponse = self.poster(algo, **options)
+            self.assertEqual(reponse.json()['status'], 'success')
+            self.assertNotIn('Content-Location', reponse)
+        self.assertIn('Content-Location', self.poster('intermediarite', echantillon=3, graine=1))
+        self.assertIn('Content-Location', self.poster('centralite'))
+
+    def test_taille_bornee(self):
+        with override_settings(GRAPHE_RESULTAT_OCTETS_MAX=100):
+            self.assertNotIn('Content-Location', self.poster('floyd'))
+        cache = CacheLRU(taille_max=10, octets_max=10, taille=len)
+        for cle, valeur in (('a', 'xxxx'), ('b', 'xxxx'), ('c', 'xxxx')):
+            cache.put(cle, valeur)
+        self.assertEqual([cache.get(c) for c in 'abc'], [None, 'xxxx', 'xxxx'])
+        cache.put('d', 'x' * 11)                 # Plus grand que tout le budget : ignoré
+        cache.put('b', 'xx')
+        self.assertEqual((cache.get('d'), cache.octets), (None, 6))
+        cache.pop('c')
+        self.assertEqual(cache.octets, 2)
+
+    def test_page_d_accueil_conditionnelle(self):
+        reponse = self.client.get('/')
+        self.assertEqual(reponse.status_code, 200)
+        nouvelle = self.client.get('/', HTTP_IF_NONE_MATCH=reponse['ETag'])
+        self.assertEqual(nouvelle.status_code, 304)
+        self.assertIn('csrftoken', nouvelle.cookies)
+
+
+class RegistreGraphesTests(SimpleTestCase):
+
+    def setUp(self):
+        dossier = tempfile.TemporaryDirectory()
+        self.addCleanup(dossier.cleanup)
+        reglage = override_settings(GRAPHE_REGISTRE_DIR=dossier.name, GRAPHE_REGISTRE_OCTETS_MIN=0)
+        reglage.enable()
+        self.addCleanup(reglage.disable)
+        self.addCleanup(registre_graphes._tout_relacher)
+        self.matrix, self.labels = graphe_aleatoire(20, densite=0.2, graine=35)
+
+    def manifeste(self):
+        with registre_graphes._manifeste() as manifeste:
+            return dict(manifeste)
+
+    def test_est_attache(self):
+        cle = empreinte_graphe(self.matrix, self.labels)
+        self.assertFalse(registre_graphes.est_attache(cle, positifs=True))
+        registre_graphes.graphe_partage(self.matrix, self.labels, positifs=True)
+        self.assertTrue(registre_graphes.est_attache(cle, positifs=True))
+        self.assertFalse(registre_graphes.est_attache(cle))
+
+    def test_petit_graphe_reste_local(self):
+        with override_settings(GRAPHE_REGISTRE_OCTETS_MIN=20 * 20 * 8 + 1):
+            graphe = registre_graphes.graphe_partage(self.matrix, self.labels)
+        self.assertIsNone(graphe.descripteurs)
+        self.assertEqual(self.manifeste(), {})
+        attendu = construire_csr(self.matrix, 20)
+        for tableau, reference in zip(graphe.csr, attendu):
+            np.testing.assert_array_equal(tableau, reference)
+
+    def test_segments_detruits_a_l_arret(self):
+        graphe = registre_graphes.graphe_partage(self.matrix, self.labels, positifs=True)
+        self.assertIs(registre_graphes.graphe_partage(self.matrix, self.labels, positifs=True), graphe)
+        self.assertEqual(graphe.labels, self.labels)
+        entree, = self.manifeste().values()
+        self.assertEqual(entree['processus'], [os.getpid()])
+        noms = [nom for nom, _, _ in graphe.descripteurs.values()]
+
+        registre_graphes._tout_relacher()
+        self.assertEqual(self.manifeste(), {})
+        for nom in noms:
+            with self.assertRaises(FileNotFoundError):
+                shared_memory.SharedMemory(name=nom)
+
+    def test_attachement_sans_suivi_global(self):
+        shm, tableau = memoire_partagee.creer_tableau((4,), np.float64)
+        self.addCleanup(memoire_partagee.detruire, shm.name)
+        tableau[:] = [1, 2, 3, 4]
+        enregistrer = resource_tracker.register
+        with mock.patch.object(resource_tracker, 'unregister', wraps=resource_tracker.unregister) as retirer:
+            autre, vue = memoire_partagee.attacher_tableau(shm.name, (4,), np.float64)
+        self.assertIs(resource_tracker.register, enregistrer)
+        if sys.version_info < (3, 13):
+            retirer.assert_called_once_with(autre._name, 'shared_memory')
+        self.assertEqual(vue.tolist(), [1, 2, 3, 4])
+        del vue
+        autre.close()
+        shm.close()
+
+
+class AccessibiliteTests(SimpleTestCase):
+
+    def test_identique_aux_parcours(self):
+        for n, densite in ((25, 0.06), (150, 0.008)):      # Plusieurs CFC, plus de 64 CFC
+            matrix, labels = graphe_aleatoire(n, densite=densite, graine=36)
+            idx = accessibilite.IndexAccessibilite(matrix, labels)
+            reference = atteignables(matrix)
+            for i in range(n):
+                self.assertEqual(idx.accessibles_depuis(labels[i])['villes'],
+                                 [labels[j] for j in sorted(reference[i])])
+            paires = list(itertools.product(range(n), repeat=2))
+            obtenu = idx.accessibles_indices([i for i, _ in paires], [j for _, j in paires]).tolist()
+            self.assertEqual(obtenu, [j in reference[i] for i, j in paires])
+            self.assertEqual([idx.accessible_indices(i, j) for i, j in paires[::7]],
+                             [j in reference[i] for i, j in paires[::7]])
+
+    def test_requetes(self):
+        matrix = [[0, 1, 0], [0, 0, 0], [0, 1, 0]]
+        labels = ['A', 'B', 'C']
+        res = executer_requete(requete('accessibilite', matrix, labels, paires=[['A', 'B'], ['B', 'A']]))
+        self.assertEqual([p['accessible'] for p in res['result']['paires']], [True, False])
+        self.assertEqual(executer_requete(requete('accessibilite', matrix, labels, paires=[['A', 'Z']]))['status'],
+                         'error')
+        self.assertEqual(executer_requete(requete('accessibilite', matrix, labels, paires='AB'))['status'], 'error')
+        res = executer_requete(requete('accessibilite', matrix, labels, depart='C', arrivee='A'))
+        self.assertFalse(res['result']['accessible'])
+
+
+@override_settings(GRAPHE_PRECALCUL=False)
+class PlanificateurTests(SimpleTestCase):
+
+    def setUp(self):
+        for module, nom, valeur in ((precalcul, '_table', None), (precalcul, '_initialise', False),
+                                    (composantes, 'index_par_graphe', CacheLRU()),
+                                    (accessibilite, 'index_par_graphe', CacheLRU()),
+                                    (reperes, 'reperes_par_graphe', CacheLRU())):
+            patch = mock.patch.object(module, nom, valeur)
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_budget_lu_a_chaque_requete(self):
+        with override_settings(GRAPHE_PLAN_BUDGET_MS=0):
+            res = executer_requete({'algo': 'auto'})
+        self.assertEqual(res['status'], 'error')
+        self.assertEqual(res['plan']['budget_ms'], 0)
+        with override_settings(GRAPHE_PLAN_BUDGET_MS=10 ** 6):
+            res = executer_requete({'algo': 'auto', 'budget_ms': 5})
+        self.assertEqual(res['plan']['budget_ms'], 5)
+
+    def test_toutes_paires_sur_le_graphe_par_defaut(self):
+        res = executer_requete({'algo': 'auto'})
+        self.assertEqual(res['status'], 'success')
+        attendu = Floyd_Warshall.lignes_lisibles(Floyd_Warshall.floyd_warshall_blocs(Matrice.M, Matrice.villes))
+        self.assertEqual(res['result']['matrice_distances'], attendu)
+        self.assertEqual(len(attendu), len(Matrice.villes))
+
+    def test_poids_negatifs_ecartent_dijkstra(self):
+        matrix, labels = graphe_avec_negatifs(20, graine=48)
+        res = executer_requete(requete('auto', matrix, labels, depart=labels[0]))
+        self.assertEqual(res['plan']['moteur'], 'bellman')
+        self.assertNotIn('dijkstra', [c['moteur'] for c in res['plan']['candidats']])
+        self.assertEqual(res['result']['distances'],
+                         executer_requete(requete('bellman', matrix, labels, depart=labels[0]))['result']['distances'])
+
+    def test_index_accessibilite_en_cache(self):
+        # A -> C <- B : les composantes n'excluent pas B -> A, l'index exact si
+        matrix = [[0, 0, 1], [0, 0, 1], [0, 0, 0]]
+        labels = ['A', 'B', 'C']
+        corps = requete('auto', matrix, labels, depart='B', arrivee='A')
+        self.assertFalse(executer_requete(corps)['plan']['caches']['sans_chemin'])
+        self.assertFalse(composantes.index_composantes(matrix, labels).inaccessible(1, 0))
+        accessibilite.index_accessibilite(matrix, labels)
+        res = executer_requete(corps)
+        self.assertTrue(res['plan']['caches']['sans_chemin'])
+        self.assertEqual(res['plan']['moteur'], 'dijkstra')
+        self.assertEqual(res['error'], "Aucun chemin entre B et A")
+
+    def test_reperes_en_cache(self):
+        matrix, labels = graphe_aleatoire(40, densite=0.15, graine=48, symetrique=True)
+        corps = requete('auto', matrix, labels, depart=labels[0], arrivee=labels[-1])
+        self.assertNotIn('dijkstra_alt', [c['moteur'] for c in executer_requete(corps)['plan']['candidats']])
+        reperes.pretraitement(matrix, labels)
+        res = executer_requete(corps)
+        self.assertEqual(res['plan']['moteur'], 'dijkstra_alt')
+        self.assertEqual(res['result']['distance_totale'],
+                         executer_requete(requete('dijkstra', matrix, labels, depart=labels[0],
+                                                  arrivee=labels[-1]))['result']['distance_totale'])
+
+    def test_csr_du_registre_allege_toutes_paires(self):
+        matrix, labels = graphe_aleatoire(200, densite=0.05, graine=48)
+        g = planificateur.caracteristiques(matrix, labels)
+        self.assertLess(planificateur.estimer('dijkstra_tous_couples', g, caches={'csr': True}),
+                        planificateur.estimer('dijkstra_tous_couples', g))
+
+
+class ParcoursFluxTests(SimpleTestCase):
+
+    def setUp(self):
+        self.matrix, self.labels = graphe_aleatoire(60, densite=0.08, graine=49, symetrique=True)
+        patch = mock.patch.object(parcours_flux, 'parcours_suspendus', CacheLRU(taille_max=64))
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def lire(self, **options):
+        corps = requete('bfs', self.matrix, self.labels, depart=self.labels[0], **options)
+        response = self.client.post('/api/parcours/', json.dumps(corps), content_type='application/json')
+        lignes = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        return response, [json.loads(ligne) for ligne in lignes]
+
+    def test_pages_identiques_au_parcours_complet(self):
+        _, complet = self.lire()
+        self.assertEqual(complet[-1], {'type': 'fin', 'visites': len(complet) - 1})
+        attendu = [(e['sommet'], e['parent'], e['profondeur']) for e in complet[:-1]]
+        distances = distances_bfs(self.matrix, 0)
+        self.assertEqual({e['sommet']: e['profondeur'] for e in complet[:-1]},
+                         {self.labels[v]: d for v, d in enumerate(distances) if d != -1})
+
+        obtenu, curseur = [], None
+        while True:
+            response, page = self.lire(limite=7, curseur=curseur)
+            self.assertFalse(response.has_header('X-Parcours-Rejoue'))   # Reprise dans le même processus
+            obtenu += [(e['sommet'], e['parent'], e['profondeur']) for e in page if e['type'] == 'visite']
+            if page[-1]['type'] == 'fin':
+                break
+            curseur = page[-1]['curseur']
+        self.assertEqual(obtenu, attendu)
+
+    def test_reprise_sur_un_autre_processus(self):
+        _, complet = self.lire()
+        self.assertGreater(len(complet), 14)
+        _, page = self.lire(limite=7)
+        # Autre worker : le parcours suspendu n'y est pas, il est rejoué jusqu'au curseur
+        with mock.patch.object(parcours_flux, 'parcours_suspendus', CacheLRU(taille_max=64)):
+            response, suite = self.lire(limite=7, curseur=page[-1]['curseur'])
+        self.assertEqual(response['X-Parcours-Rejoue'], '7')
+        self.assertEqual([e['sommet'] for e in suite if e['type'] == 'visite'],
+                         [e['sommet'] for e in complet[7:14]])
+
+    def test_erreur_en_cours_de_diffusion(self):
+        def casse(start_idx, matrix, n):
+            yield start_idx, -1, 0
+            raise RuntimeError("mémoire épuisée")
+
+        with mock.patch.dict(parcours_flux.PARCOURS, {'bfs': casse}):
+            response, lignes = self.lire()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([e['type'] for e in lignes], ['visite', 'erreur'])
+        self.assertIn("mémoire épuisée", lignes[-1]['erreur'])
+
+
+class VersionsGrapheTests(SimpleTestCase):
+
+    def setUp(self):
+        for nom in ('versions', 'arbres_par_version'):
+            patch = mock.patch.object(versions_graphe, nom, CacheLRU(taille_max=256))
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.matrix, self.labels = graphe_aleatoire(40, densite=0.15, graine=50)
+
+    def version(self, evenements=None, **options):
+        res = executer_requete(requete('version', self.matrix, self.labels, evenements=evenements, **options))
+        return res['result']['version']
+
+    def distances(self, version=None, matrix=None):
+        corps = requete('dijkstra', matrix or self.matrix, self.labels, depart=self.labels[0])
+        if version:
+            corps['version'] = version
+        return executer_requete(corps)['result']
+
+    def test_evenements_invalides(self):
+        mauvais = [{'type': 'modifier', 'de': self.labels[0], 'vers': self.labels[1], 'poids': p}
+                   for p in ('nan', 'inf', 'abc')]
+        for evenements in ['abc', [1], {'type': 'inserer'}] + [[ev] for ev in mauvais]:
+            res = executer_requete(requete('version', self.matrix, self.labels, evenements=evenements))
+            self.assertEqual(res['status'], 'error', evenements)
+            self.assertNotIn('trace', res)
+
+    def test_arbre_repris_identique_a_dijkstra(self):
+        racine = self.version()
+        self.distances(racine)
+        arbre = dijkstra.arbre_dijkstra(self.labels[0], self.matrix, self.labels)
+        d = arbre.distances
+        # Arc hors de l'arbre dont le raccourci à 0.01 change les distances
+        u, v = next((u, v) for u in range(40) for v in range(40)
+                    if self.matrix[u][v] and arbre.predecesseurs[v] != u and d[u] + 0.01 < d[v])
+        for poids, repris in ((self.matrix[u][v] + 100, racine), (0.01, None)):
+            evenements = [{'type': 'modifier', 'de': self.labels[u], 'vers': self.labels[v], 'poids': poids}]
+            obtenu = self.distances(self.version(evenements, version=racine))
+            attendu = self.distances(matrix=appliquer_evenements(self.matrix, self.labels, evenements))
+            self.assertEqual(obtenu['distances'], attendu['distances'])
+            self.assertEqual(obtenu.get('arbre_repris_de'), repris)
+
+    def test_versions_bornees_en_octets(self):
+        octets_racine = 40 * 40 * versions_graphe.OCTETS_CASE_LISTE
+        cache = CacheLRU(taille_max=256, octets_max=octets_racine * 3 // 2, taille=lambda v: v.taille_octets())
+        with mock.patch.object(versions_graphe, 'versions', cache):
+            premiere = self.version()
+            self.assertEqual(cache.octets, octets_racine)
+            self.matrix, self.labels = graphe_aleatoire(40, densite=0.15, graine=51)
+            seconde = self.version()
+            self.assertIsNone(cache.get(premiere))
+            self.assertIsNotNone(cache.get(seconde))
+            self.assertLessEqual(cache.octets, cache.octets_max)
+
+    def test_version_sans_copie_dense(self):
+        matrix, labels = graphe_aleatoire(30, densite=0.2, graine=52, symetrique=True)
+        u, v = next((u, v) for u in range(30) for v in range(30) if matrix[u][v])
+        evenements = [{'type': 'modifier', 'de': labels[u], 'vers': labels[v], 'poids': matrix[u][v] + 1},
+                      {'type': 'modifier', 'de': labels[v], 'vers': labels[u], 'poids': matrix[u][v] + 1}]
+        version = versions_graphe.creer_version(evenements, matrix=matrix, labels=labels)['version']
+        attendu = appliquer_evenements(matrix, labels, evenements)
+        with mock.patch.object(versions_graphe.MatriceSuperposee, '__array__',
+                               side_effect=AssertionError('copie dense')):
+            arbre, _ = versions_graphe.arbre_version(version, labels[0])
+            self.assertEqual(arbre.distances, dijkstra.arbre_dijkstra(labels[0], attendu, labels).distances)
+            self.assertEqual(prim_kruskal.prim(labels[0], version.matrice, labels)['weight'],
+                             prim_kruskal.prim(labels[0], attendu, labels)['weight'])
+            self.assertEqual(planificateur.caracteristiques(version.matrice, labels),
+                             planificateur.caracteristiques(attendu, labels))
+            self.assertEqual(centralite.centralite_intermediarite(version.matrice, labels, workers=1)['noeuds'],
+                             centralite.centralite_intermediarite(attendu, labels, workers=1)['noeuds'])
+            self.assertEqual(arbre_couvrant_dynamique.ArbreCouvrantDynamique(version.matrice, labels).poids_total,
+                             arbre_couvrant_dynamique.ArbreCouvrantDynamique(attendu, labels).poids_total)
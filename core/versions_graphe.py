@@ -0,0 +1,238 @@
+"""
+Versions de graphes en calques de modifications d'arcs.
+
+Les versions et leurs arbres sont gardés dans le processus qui les a créés
+(caches bornés en nombre et en octets) : derrière plusieurs workers, un
+identifiant de version n'est utilisable qu'avec un routage collant (même
+worker pour toutes les requêtes d'un client). Ailleurs ou après éviction,
+la version est « inconnue ou expirée » et doit être recréée.
+"""
+import hashlib
+
+import numpy as np
+from django.conf import settings
+
+from . import dijkstra
+from .graphe import resoudre_graphe, empreinte_graphe, identifiant_version, est_arete, lire_evenements, CacheLRU
+
+# Octets estimés par case d'une matrice en liste de listes (pointeur et float Python)
+OCTETS_CASE_LISTE = 32
+# Octets estimés par arc du calque (entrée de dictionnaire, clé et poids)
+OCTETS_ARC_CALQUE = 200
+
+# Versions connues, indexées par identifiant (la base est partagée, pas copiée)
+versions = CacheLRU(taille_max=getattr(settings, 'GRAPHE_VERSIONS_MAX', 256),
+                    octets_max=getattr(settings, 'GRAPHE_VERSIONS_OCTETS_MAX', 256 * 1024 * 1024),
+                    taille=lambda version: version.taille_octets())
+
+# Arbres complets des plus courts chemins, par (identifiant de version, ville de départ)
+arbres_par_version = CacheLRU(taille_max=getattr(settings, 'GRAPHE_ARBRES_VERSION_MAX', 256),
+                              octets_max=getattr(settings, 'GRAPHE_ARBRES_VERSION_OCTETS_MAX', 64 * 1024 * 1024),
+                              taille=lambda arbre: arbre.taille_octets())
+
+
+class MatriceSuperposee:
+    """
+    Matrice d'adjacence lue à travers un calque de modifications d'arcs.
+
+    Les lignes sans modification sont celles de la base, renvoyées telles
+    quelles ; une ligne modifiée est recopiée une seule fois, à sa première
+    lecture. Se lit comme une liste de listes (len, matrix[u][v], itération)
+    et se convertit en tableau numpy à la demande (np.asarray).
+    """
+
+    def __init__(self, base, delta):
+        """
+        Args:
+            base: Matrice de base (liste de listes ou tableau numpy), non modifiée
+            delta (dict): {(u, v): poids} remplaçant les poids de la base (0 : pas d'arc)
+        """
+        self.base = base
+        self.delta = delta
+        self._modifs = {}
+        for (u, v), poids in delta.items():
+            self._modifs.setdefault(u, []).append((v, poids))
+        self._lignes = {}
+        self._empreintes = {}
+
+    def __len__(self):
+        return len(self.base)
+
+    def __getitem__(self, u):
+        modifs = self._modifs.get(u)
+        if modifs is None:
+            return self.base[u]
+        ligne = self._lignes.get(u)
+        if ligne is None:
+            ligne = np.asarray(self.base[u], dtype=np.float64).tolist()
+            for v, poids in modifs:
+                ligne[v] = poids
+            self._lignes[u] = ligne
+        return ligne
+
+    def __iter__(self):
+        for u in range(len(self)):
+            yield self[u]
+
+    def __array__(self, dtype=None, copy=None):
+        M = np.array(self.base, dtype=np.float64)
+        for (u, v), poids in self.delta.items():
+            M[u, v] = poids
+        return M if dtype is None else M.astype(dtype, copy=False)
+
+    def tolist(self):
+        return [np.asarray(self[u], dtype=np.float64).tolist() for u in range(len(self))]
+
+    def empreinte(self, labels):
+        """
+        Même empreinte que graphe.empreinte_graphe sur la matrice complète,
+        calculée ligne par ligne (sans la matérialiser) et mémorisée.
+        """
+        cle = "\x1f".join(labels)
+        if cle not in self._empreintes:
+            h = hashlib.sha1()
+            h.update(cle.encode("utf-8"))
+            for u in range(len(self)):
+                h.update(np.asarray(self[u], dtype=np.float64).tobytes())
+            self._empreintes[cle] = h.hexdigest()
+        return self._empreintes[cle]
+
+
+class VersionGraphe:
+    """
+    Version d'un graphe : une base partagée par toutes les versions qui en
+    dérivent, et le calque cumulé des arcs modifiés depuis cette base.
+    Dériver une version ne copie que le calque.
+    """
+
+    def __init__(self, identifiant, labels, base, delta=None, parent=None):
+        self.identifiant = identifiant
+        self.labels = list(labels)
+        self.index = {ville: i for i, ville in enumerate(self.labels)}
+        self.base = base
+        self.delta = delta or {}
+        self.parent = parent
+        self.matrice = MatriceSuperposee(base, self.delta) if self.delta else base
+
+    def poids(self, u, v):
+        return self.delta.get((u, v), self.base[u][v])
+
+    def taille_octets(self):
+        """
+        Mémoire retenue par la version : son calque et les lignes qu'il fait
+        recopier, plus la base pour une version racine. Les versions dérivées
+        partagent la base de leur racine, elle n'est comptée qu'une fois.
+        """
+        n = len(self.labels)
+        octets = len(self.delta) * OCTETS_ARC_CALQUE + len({u for u, _ in self.delta}) * n * 8
+        if self.parent is None:
+            base = self.base
+            octets += base.nbytes if isinstance(base, np.ndarray) else n * n * OCTETS_CASE_LISTE
+        return octets
+
+    def deriver(self, evenements):
+        """
+        Nouvelle version obtenue en appliquant des événements au format :
+            {'type': 'inserer' | 'supprimer' | 'modifier',
+             'de': str, 'vers': str, 'poids': float}
+
+        Raises:
+            ValueError: Événement invalide (forme, type, ville ou poids non fini)
+        """
+        delta = dict(self.delta)
+        for u, v, poids in lire_evenements(evenements, self.index):
+            if poids is None:
+                poids = 0.0     # Suppression
+            initial = self.base[u][v]
+            if poids == initial or not (est_arete(poids) or est_arete(initial)):
+                delta.pop((u, v), None)     # Retour au poids de la base
+            else:
+                delta[(u, v)] = poids
+        return VersionGraphe(identifiant_version(self.identifiant, evenements), self.labels,
+                             self.base, delta, parent=self.identifiant)
+
+
+def version_racine(matrix=None, labels=None):
+    """Version sans modification d'un graphe (identifiant : son empreinte)."""
+    matrix, labels = resoudre_graphe(matrix, labels)
+    identifiant = empreinte_graphe(matrix, labels)
+    return versions.get_ou_calcule(identifiant, lambda: VersionGraphe(identifiant, labels, matrix))
+
+
+def creer_version(evenements=None, version_id=None, matrix=None, labels=None):
+    """
+    Dérive une version d'une version existante (version_id) ou du graphe
+    fourni, et l'enregistre.
+
+    Returns:
+        dict: {'version': VersionGraphe} ou {'error': str}
+    """
+    if version_id:
+        parent = versions.get(version_id)
+        if parent is None:
+            return {"error": f"Version inconnue ou expirée : '{version_id}'. Renvoyez la matrice."}
+    else:
+        parent = version_racine(matrix, labels)
+    if not evenements:
+        return {"version": parent}
+    try:
+        version = parent.deriver(evenements)
+    except ValueError as e:
+        return {"error": str(e)}
+    versions.put(version.identifiant, version)
+    return {"version": version}
+
+
+def _effectif(poids):
+    """Poids de l'arc tel que Dijkstra le voit (None : arc ignoré)."""
+    return float(poids) if est_arete(poids) and poids > 0 else None
+
+
+def _arbre_reutilisable(arbre, ancienne, nouvelle):
+    """
+    True si l'arbre des plus courts chemins de la version ancienne reste
+    exact pour la version nouvelle : aucun arc de l'arbre n'est allongé ou
+    supprimé, et aucun arc ajouté ou raccourci ne crée de raccourci.
+    """
+    distances, predecesseurs = arbre.distances, arbre.predecesseurs
+    for u, v in ancienne.delta.keys() | nouvelle.delta.keys():
+        avant = _effectif(ancienne.poids(u, v))
+        apres = _effectif(nouvelle.poids(u, v))
+        if avant == apres or distances[u] == float('inf'):
+            continue
+        if apres is not None and (avant is None or apres < avant):
+            if distances[u] + apres < distances[v]:
+                return False
+        elif predecesseurs[v] == u:
+            return False
+    return True
+
+
+def arbre_version(version, ville_depart):
+    """
+    Arbre complet des plus courts chemins (Dijkstra) d'une version.
+
+    Repris d'une version ancêtre déjà calculée si les arcs modifiés depuis ne
+    changent aucune distance (les chemins à égalité peuvent alors différer
+    d'un calcul complet), sinon calculé à travers le calque.
+
+    Returns:
+        tuple: (ArbreChemins ou str en cas d'erreur, identifiant de la
+            version dont l'arbre est repris, ou None s'il a été calculé)
+    """
+    arbre = arbres_par_version.get((version.identifiant, ville_depart))
+    if arbre is not None:
+        return arbre, None
+
+    ancetre = versions.get(version.parent) if version.parent else None
+    while ancetre is not None:
+        arbre = arbres_par_version.get((ancetre.identifiant, ville_depart))
+        if arbre is not None and _arbre_reutilisable(arbre, ancetre, version):
+            arbres_par_version.put((version.identifiant, ville_depart), arbre)
+            return arbre, ancetre.identifiant
+        ancetre = versions.get(ancetre.parent) if ancetre.parent else None
+
+    arbre = dijkstra.arbre_dijkstra(ville_depart, matrix=version.matrice, labels=version.labels)
+    if not isinstance(arbre, str):
+        arbres_par_version.put((version.identifiant, ville_depart), arbre)
+    return arbre, None
@@ -1,11 +1,126 @@
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.template.loader import get_template
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+import hashlib
 import json
 import ast
 import traceback
 import math
+import os
+import re
+import tempfile
+import time
+
+import numpy as np
+
+from django.conf import settings
 
 from . import dijkstra, bellmanford, Floyd_Warshall, Matrice, MethodePert, bfs_dfs, prim_kruskal
+from . import chemins_dynamiques, arbre_couvrant_dynamique, composantes, reperes, k_chemins, centralite
+from . import accessibilite
+from . import coalescence, precalcul, planificateur, parcours_flux, versions_graphe
+from .graphe import resoudre_graphe, empreinte_graphe, CacheLRU
+
+# Matrices Floyd-Warshall stockées sur disque (mode stockage='disque')
+MATRICES_DIR = getattr(settings, 'GRAPHE_MATRICES_DIR', os.path.join(tempfile.gettempdir(), 'graphe_matrices'))
+MATRICE_ID_VALIDE = re.compile(r'^[0-9a-f]{40}_(' + '|'.join(Floyd_Warshall.PRECISIONS) + r')$')
+TAILLE_PAGE_MATRICE = 100
+TAILLE_PAGE_MATRICE_MAX = 1000
+# Cases d'une page de matrice (lignes × colonnes) : les colonnes sont bornées aussi
+CELLULES_PAGE_MATRICE_MAX = 100000
+# Budget du dossier des matrices sur disque (réglages GRAPHE_MATRICES_OCTETS_MAX
+# et GRAPHE_MATRICES_DUREE_MAX, en secondes depuis la dernière lecture)
+MATRICES_OCTETS_MAX = 4 * 1024 ** 3
+MATRICES_DUREE_MAX = 24 * 3600
+
+# Résultats récents relisibles en GET sur /api/resultat/<clé>/ : (contenu JSON, ETag),
+# bornés en nombre et en octets ; les plus gros résultats ne sont pas conservés
+resultats = CacheLRU(taille_max=getattr(settings, 'GRAPHE_RESULTATS_MAX', 256),
+                     octets_max=getattr(settings, 'GRAPHE_RESULTATS_OCTETS_MAX', 64 * 1024 * 1024),
+                     taille=lambda entree: len(entree[0]))
+RESULTAT_OCTETS_MAX = 1024 * 1024
+DUREE_CACHE_RESULTAT = 3600
+# Lignes NDJSON regroupées par écriture (la première part seule, sans attendre)
+TAILLE_PAQUET_NDJSON = 256
+_etag_page = None
+
+def _fichier_matrice(matrice_id):
+    return os.path.join(MATRICES_DIR, matrice_id + '.npy')
+
+def _evincer_matrices(garder=None):
+    """
+    Supprime les matrices sur disque non lues depuis GRAPHE_MATRICES_DUREE_MAX,
+    puis les moins récemment lues tant que le dossier dépasse
+    GRAPHE_MATRICES_OCTETS_MAX (jamais garder, la matrice qu'on vient d'écrire).
+    Un lecteur qui a déjà ouvert un fichier supprimé le lit jusqu'au bout.
+    """
+    octets_max = getattr(settings, 'GRAPHE_MATRICES_OCTETS_MAX', MATRICES_OCTETS_MAX)
+    limite = time.time() - getattr(settings, 'GRAPHE_MATRICES_DUREE_MAX', MATRICES_DUREE_MAX)
+    matrices = []
+    try:
+        noms = os.listdir(MATRICES_DIR)
+    except FileNotFoundError:
+        return
+    for nom in noms:
+        if not (nom.endswith('.npy') and MATRICE_ID_VALIDE.match(nom[:-len('.npy')])):
+            continue   # Fichiers temporaires d'un calcul en cours
+        fichier = os.path.join(MATRICES_DIR, nom)
+        try:
+            infos = os.stat(fichier)
+        except FileNotFoundError:
+            continue
+        matrices.append((infos.st_mtime, infos.st_size, fichier))
+    total = sum(taille for _, taille, _ in matrices)
+    for lecture, taille, fichier in sorted(matrices):
+        if fichier == garder or (lecture >= limite and total <= octets_max):
+            continue
+        for chemin in (fichier, fichier + '.labels.json'):
+            try:
+                os.remove(chemin)
+            except FileNotFoundError:
+                pass
+        total -= taille
+
+def _ouvrir_matrice_stockee(fichier):
+    """Matrice sur disque projetée en mémoire ; sa date marque la dernière lecture (éviction)."""
+    dist_matrix = Floyd_Warshall.ouvrir_matrice(fichier)
+    try:
+        os.utime(fichier)
+    except OSError:
+        pass
+    return dist_matrix
+
+def _stocker_matrice(fichier, matrix, labels, dtype):
+    """
+    Calcule la matrice Floyd-Warshall dans des fichiers temporaires uniques,
+    renommés une fois complets : deux requêtes sur le même graphe ne
+    s'écrasent pas, et un calcul en échec ne laisse aucun fichier partiel.
+    """
+    dossier = os.path.dirname(fichier)
+    os.makedirs(dossier, exist_ok=True)
+    temporaires = []
+    try:
+        with tempfile.NamedTemporaryFile('w', dir=dossier, suffix='.labels.json', delete=False,
+                                         encoding='utf-8') as f:
+            temporaires.append(f.name)
+            json.dump(labels, f, ensure_ascii=False)
+        with tempfile.NamedTemporaryFile(dir=dossier, suffix='.npy', delete=False) as f:
+            temporaires.append(f.name)
+        Floyd_Warshall.floyd_warshall_blocs(matrix=matrix, labels=labels, dtype=dtype, fichier=temporaires[1])
+        # Labels d'abord : floyd_page ne les lit qu'une fois la matrice présente
+        os.replace(temporaires[0], fichier + '.labels.json')
+        os.replace(temporaires[1], fichier)
+    except BaseException:
+        for temporaire in temporaires:
+            try:
+                os.remove(temporaire)
+            except FileNotFoundError:
+                pass
+        raise
 
 def clean_data(data):
     """Nettoie les données pour le JSON (Infinity -> None)."""
@@ -28,13 +143,35 @@ def parse_matrix(raw_string):
     except:
         return None
 
-def index(request):
+def _contexte_index():
+    table = precalcul.table()
+    if table is not None:
+        return table.contexte_index
     matrix_list = Matrice.M.tolist()
-    context = {
+    return {
         'default_matrix': json.dumps(clean_data(matrix_list)),
         'default_villes': json.dumps(Matrice.villes)
     }
-    return render(request, 'index.html', context)
+
+def _etag_index(context):
+    """ETag de la page d'accueil : graphe par défaut et source du gabarit."""
+    global _etag_page
+    if _etag_page is None:
+        source = get_template('index.html').template.source
+        contenu = json.dumps(context, sort_keys=True) + source
+        _etag_page = quote_etag(hashlib.sha1(contenu.encode('utf-8')).hexdigest())
+    return _etag_page
+
+def index(request):
+    context = _contexte_index()
+    etag = _etag_index(context)
+    get_token(request)  # Cookie CSRF posé même quand la page n'est pas renvoyée (304)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = render(request, 'index.html', context)
+    response['ETag'] = etag
+    patch_cache_control(response, no_cache=True)
+    return response
 
 def calculer(request):
     if request.method != 'POST':
@@ -42,16 +179,170 @@ def calculer(request):
 
     try:
         data = json.loads(request.body)
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'error': f"Erreur serveur : {str(e)}", 'trace': traceback.format_exc()})
+
+    # Les requêtes identiques simultanées partagent un seul calcul
+    cle = coalescence.cle_partageable(data)
+    payload, partage = coalescence.requete_unique(cle, lambda: executer_requete(data))
+    response = JsonResponse(payload)
+    if partage:
+        response['X-Requete-Partagee'] = '1'
+
+    # Résultat déterministe : relisible en GET (avec ETag) à une URL dérivée de la requête
+    if cle is not None and payload.get('status') == 'success' and _resultat_relisible(data) \
+            and len(response.content) <= getattr(settings, 'GRAPHE_RESULTAT_OCTETS_MAX', RESULTAT_OCTETS_MAX):
+        etag = quote_etag(hashlib.sha1(response.content).hexdigest())
+        resultats.put(cle, (response.content, etag))
+        response['ETag'] = etag
+        response['Content-Location'] = reverse('resultat', args=[cle])
+    return response
+
+def _resultat_relisible(data):
+    """
+    False pour les calculs dont le résultat varie d'un appel à l'autre : une
+    URL dérivée de la requête ne doit pas figer un tirage aléatoire.
+    """
+    if data.get('algo') == 'centralite' and data.get('approx'):
+        return False
+    if data.get('algo') == 'intermediarite' and data.get('echantillon') and data.get('graine') is None:
+        return False
+    return True
+
+def _lignes_ndjson(evenements):
+    """
+    Événements en lignes NDJSON, par paquets. Le statut HTTP est déjà parti :
+    une erreur en cours de diffusion termine le flux par une ligne
+    {'type': 'erreur', 'erreur': ...} au lieu de le couper sans explication.
+    """
+    paquet = []
+    premier = True
+    try:
+        for evenement in evenements:
+            paquet.append(json.dumps(evenement, ensure_ascii=False) + '\n')
+            if premier or len(paquet) >= TAILLE_PAQUET_NDJSON:
+                yield ''.join(paquet)
+                paquet = []
+                premier = False
+    except Exception as e:
+        paquet.append(json.dumps({'type': 'erreur', 'erreur': f"Erreur serveur : {e}"}, ensure_ascii=False) + '\n')
+    if paquet:
+        yield ''.join(paquet)
+
+def parcours(request):
+    """
+    Parcours BFS/DFS diffusé en NDJSON, un événement par ligne, au fur et à
+    mesure de la visite. Avec 'limite', la réponse s'arrête sur une ligne
+    'suite' portant un curseur : le renvoyer (même corps) donne la page suivante.
+
+    Les parcours suspendus restent dans le processus qui les a servis : sans
+    routage collant (même worker pour toutes les pages), une page suivante
+    rejoue le parcours jusqu'au curseur, signalé par l'en-tête
+    X-Parcours-Rejoue (nombre de visites rejouées).
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required'}, status=405)
+
+    try:
+        data = json.loads(request.body)
+        limite = int(data['limite']) if data.get('limite') else None
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'error': f"Erreur serveur : {str(e)}", 'trace': traceback.format_exc()})
+
+    matrix, labels = lire_graphe(data)
+    flux = parcours_flux.ouvrir_parcours(data.get('algo') or 'bfs', (data.get('depart') or '').strip(),
+                                         matrix=matrix, labels=labels or None, curseur=data.get('curseur'))
+    if isinstance(flux, dict):
+        return JsonResponse({'status': 'error', 'error': flux['error']})
+    response = StreamingHttpResponse(_lignes_ndjson(flux.evenements(limite)), content_type='application/x-ndjson')
+    if flux.rejoue:
+        response['X-Parcours-Rejoue'] = str(flux.rejoue)
+    return response
+
+def resultat(request, cle):
+    """Résultat d'un calcul récent, en GET, avec requêtes conditionnelles (304)."""
+    if request.method not in ('GET', 'HEAD'):
+        return JsonResponse({'error': 'GET required'}, status=405)
+    entree = resultats.get(cle)
+    if entree is None:
+        return JsonResponse({'status': 'error', 'error': "Résultat inconnu ou expiré : renvoyez la requête en POST."},
+                            status=404)
+    contenu, etag = entree
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(contenu, content_type='application/json')
+    response['ETag'] = etag
+    patch_cache_control(response, max_age=DUREE_CACHE_RESULTAT)
+    return response
+
+def lire_entier(data, champ, defaut, mini, maxi):
+    """
+    Option entière d'une requête (defaut si absente), ramenée dans
+    [mini, maxi] ; None si ce n'est pas un entier (erreur à renvoyer au client).
+    """
+    valeur = data.get(champ)
+    if valeur is None or valeur == '':
+        valeur = defaut
+    if isinstance(valeur, bool) or (isinstance(valeur, float) and not valeur.is_integer()):
+        return None
+    try:
+        entier = int(valeur)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return max(mini, min(entier, maxi))
+
+def lire_graphe(data):
+    """Matrice et labels d'une requête : (matrix, labels), ou (None, []) si absents."""
+    try:
+        matrix = parse_matrix(data.get('matrix'))
+        raw_labels = data.get('labels', '')
+        labels = [l.strip() for l in raw_labels.split(',') if l.strip()]
+    except:
+        matrix, labels = None, []
+    return matrix, labels
+
+def executer_requete(data, graphe=None):
+    """
+    Exécute une requête de calcul déjà décodée.
+
+    Args:
+        data (dict): Corps de la requête
+        graphe (tuple, optional): (matrix, labels) déjà lus par lire_graphe,
+            pour ne pas relire la même matrice à chaque requête
+
+    Returns:
+        dict: Réponse JSON ({'status': 'success', ...} ou {'status': 'error', ...})
+    """
+    try:
         algo = data.get('algo')
         depart = data.get('depart', '').strip()
         arrivee = data.get('arrivee', '').strip()
         
-        try:
-            matrix = parse_matrix(data.get('matrix'))
-            raw_labels = data.get('labels', '')
-            labels = [l.strip() for l in raw_labels.split(',') if l.strip()]
-        except:
-            matrix, labels = None, []
+        matrix, labels = graphe if graphe is not None else lire_graphe(data)
+
+        # Version d'un graphe : lecture à travers son calque de modifications
+        version = None
+        if data.get('version') and algo != 'version':
+            version = versions_graphe.versions.get(data['version'])
+            if version is None:
+                return {'status': 'error', 'error': f"Version inconnue ou expirée : '{data['version']}'. Recréez-la."}
+            matrix, labels = version.matrice, version.labels
+
+        # Graphe par défaut : réponse précalculée au démarrage (core/precalcul.py)
+        reponse = precalcul.reponse_precalculee(data, matrix, labels)
+        if reponse is not None:
+            return reponse
+
+        # --- AUTO : moteur choisi par le planificateur selon le coût estimé ---
+        if algo == 'auto':
+            plan = planificateur.planifier(data, matrix, labels)
+            if not plan['dans_budget']:
+                return {'status': 'error', 'plan': plan,
+                        'error': f"Coût estimé ({plan['cout_estime_ms']:g} ms) supérieur au budget "
+                                 f"({plan['budget_ms']:g} ms)."}
+            graphe = resoudre_graphe(matrix, labels or None)
+            reponse = executer_requete(planificateur.requete_moteur(data, plan['moteur']), graphe=graphe)
+            return dict(reponse, plan=plan)
 
         resultat = {}
         path_nodes = []
@@ -59,22 +350,36 @@ def calculer(request):
 
         # --- DIJKSTRA ---
         if algo == 'dijkstra':
-            if not depart or not arrivee:
-                return JsonResponse({'status': 'error', 'error': 'Précisez départ et arrivée.'})
-            res = dijkstra.dijkstra(depart, arrivee, matrix=matrix, labels=labels)
-            if isinstance(res, dict):
-                path_nodes = res['chemin'].split(' -> ')
-                resultat = res
-                resultat['type'] = 'Dijkstra'
+            if not depart:
+                return {'status': 'error', 'error': 'Précisez le départ.'}
+            repris_de = None
+            if version is not None:
+                # Arbre complet par version, repris d'une version ancêtre si le calque ne le change pas
+                arbre, repris_de = versions_graphe.arbre_version(version, depart)
+                if not isinstance(arbre, str) and arrivee:
+                    if arrivee not in version.index:
+                        arbre = f"Erreur : Une des villes ({depart}, {arrivee}) n'existe pas dans la liste des labels."
+                    elif not arbre.atteint(arrivee):
+                        arbre = f"Aucun chemin entre {depart} et {arrivee}"
+            else:
+                arbre = dijkstra.arbre_dijkstra(depart, matrix=matrix, labels=labels or None, ville_arrive=arrivee or None)
+            if isinstance(arbre, str):
+                return {'status': 'error', 'error': arbre}
+            if arrivee:
+                path_nodes = arbre.chemin(arrivee)
+                resultat = {'chemin': ' -> '.join(path_nodes), 'distance_totale': arbre.distance(arrivee), 'type': 'Dijkstra'}
             else:
-                return JsonResponse({'status': 'error', 'error': str(res)})
+                # Départ seul : distances vers toutes les villes (comme Bellman-Ford)
+                resultat = {'type': 'Dijkstra', 'distances': arbre.distances_dict(), 'depart': depart}
+            if repris_de:
+                resultat['arbre_repris_de'] = repris_de
 
         # --- BELLMAN-FORD ---
         elif algo == 'bellman':
-            if not depart: return JsonResponse({'status': 'error', 'error': 'Précisez le départ.'})
+            if not depart: return {'status': 'error', 'error': 'Précisez le départ.'}
             res = bellmanford.bellman_ford(depart, matrix=matrix, labels=labels)
             
-            if "error" in res: return JsonResponse({'status': 'error', 'error': res['error']})
+            if "error" in res: return {'status': 'error', 'error': res['error']}
 
             if res['type'] == 'cycle':
                 path_nodes = res['cycle']
@@ -82,55 +387,299 @@ def calculer(request):
             else:
                 resultat = {'type': 'Bellman-Ford', 'distances': res['distances_dict'], 'depart': depart}
                 if arrivee and arrivee in labels:
-                    info = bellmanford.reconstruire_chemin(depart, arrivee, res['predecesseurs'], labels)
-                    if info['existe']:
-                        path_nodes = info['chemin']
+                    # Chemin lu dans l'arbre renvoyé (vide si l'arrivée n'est pas atteinte)
+                    chemin = res['arbre'].chemin(arrivee)
+                    if chemin:
+                        path_nodes = chemin
                         resultat['chemin_texte'] = ' → '.join(path_nodes)
                         # CORRECTION ICI : On prend la distance directement dans le résultat global
                         # au lieu de chercher 'distance' dans info qui ne l'a pas.
                         resultat['dist_arrivee'] = res['distances_dict'].get(arrivee, "N/A")
 
+        # --- INSTALLATION LA PLUS PROCHE (Dijkstra multi-sources) ---
+        elif algo == 'plus_proche':
+            sources = data.get('sources') or depart
+            if isinstance(sources, str):
+                sources = [s.strip() for s in sources.split(',') if s.strip()]
+            if not sources: return {'status': 'error', 'error': 'Précisez les installations.'}
+            res = dijkstra.dijkstra_multi_sources(sources, matrix=matrix, labels=labels or None,
+                                                  vers_sources=bool(data.get('vers_sources')))
+            if "error" in res: return {'status': 'error', 'error': res['error']}
+            path_nodes = sources
+            resultat = {'type': 'Installation la plus proche', 'installations': sources,
+                        'plus_proche': res['plus_proche'],
+                        'distances': {v: (d if d != float('inf') else "∞") for v, d in res['distances'].items()},
+                        'predecesseurs': res['predecesseurs']}
+
+        # --- K PLUS COURTS CHEMINS (Yen) ---
+        elif algo == 'k_chemins':
+            if not depart or not arrivee:
+                return {'status': 'error', 'error': 'Précisez départ et arrivée.'}
+            k = lire_entier(data, 'nb_chemins', k_chemins.NB_CHEMINS_DEFAUT,
+                            1, getattr(settings, 'GRAPHE_NB_CHEMINS_MAX', k_chemins.NB_CHEMINS_MAX))
+            if k is None:
+                return {'status': 'error', 'error': 'nb_chemins doit être un entier.'}
+            res = k_chemins.k_plus_courts_chemins(depart, arrivee, k, matrix=matrix, labels=labels or None)
+            if "error" in res: return {'status': 'error', 'error': res['error']}
+            path_nodes = res['chemins'][0]['chemin']
+            resultat = {'type': f'{k} plus courts chemins (Yen)',
+                        'chemins': [{'chemin_texte': ' → '.join(c['chemin']), 'distance': c['distance']}
+                                    for c in res['chemins']]}
+
+        # --- REPÈRES ALT (pré-traitement, A* guidé, distance approchée) ---
+        elif algo in ('reperes', 'dijkstra_alt', 'distance_approchee'):
+            n = len(resoudre_graphe(matrix, labels or None)[1])
+            k = lire_entier(data, 'nb_reperes', reperes.NB_REPERES_DEFAUT,
+                            1, max(1, min(n, getattr(settings, 'GRAPHE_NB_REPERES_MAX', reperes.NB_REPERES_MAX))))
+            if k is None:
+                return {'status': 'error', 'error': 'nb_reperes doit être un entier.'}
+            if algo == 'reperes':
+                pre = reperes.pretraitement(matrix=matrix, labels=labels or None, k=k)
+                path_nodes = [pre.labels[r] for r in pre.reperes]
+                resultat = {'type': 'Repères ALT', 'reperes': path_nodes}
+            else:
+                if not depart or not arrivee:
+                    return {'status': 'error', 'error': 'Précisez départ et arrivée.'}
+                if algo == 'dijkstra_alt':
+                    res = reperes.dijkstra_alt(depart, arrivee, matrix=matrix, labels=labels or None, k=k)
+                    if not isinstance(res, dict):
+                        return {'status': 'error', 'error': str(res)}
+                    path_nodes = res['chemin'].split(' -> ')
+                    resultat = res
+                    resultat['type'] = 'Dijkstra (ALT)'
+                else:
+                    res = reperes.distance_approchee(depart, arrivee, matrix=matrix, labels=labels or None, k=k)
+                    if "error" in res: return {'status': 'error', 'error': res['error']}
+                    path_nodes = [depart, arrivee]
+                    resultat = res
+                    resultat['type'] = 'Distance approchée (repères)'
+
+        # --- DIJKSTRA DYNAMIQUE (arbre maintenu sous mises à jour) ---
+        elif algo == 'dijkstra_dynamique':
+            arbre_id = data.get('arbre_id')
+            if not depart and not arbre_id:
+                return {'status': 'error', 'error': 'Précisez le départ.'}
+            res = chemins_dynamiques.arbre_dynamique(
+                depart, matrix=matrix, labels=labels or None,
+                evenements=data.get('evenements'), arbre_id=arbre_id, ville_arrivee=arrivee or None)
+            if "error" in res: return {'status': 'error', 'error': res['error']}
+            path_nodes = res.get('chemin') or res['modifies']
+            resultat = {'type': 'Dijkstra dynamique', 'arbre_id': res['arbre_id'], 'depart': res['ville_depart'],
+                        'distances': res['distances_dict'], 'modifies': res['modifies']}
+            if 'chemin' in res:
+                resultat['chemin_texte'] = ' → '.join(res['chemin'])
+
+        # --- COMPOSANTES (fortement / faiblement connexes) ---
+        elif algo == 'composantes':
+            idx = composantes.index_composantes(matrix=matrix, labels=labels or None)
+            resultat = idx.resume()
+            resultat['type'] = 'Composantes connexes'
+            # On met en évidence la plus grande composante fortement connexe
+            if idx.nb_fortes:
+                plus_grande = max(range(idx.nb_fortes), key=lambda c: idx.tailles_fortes[c])
+                path_nodes = [v for i, v in enumerate(idx.labels) if idx.forte[i] == plus_grande]
+
+        # --- VERSION (scénario : arcs modifiés sur un graphe de base, sans copie de la base) ---
+        elif algo == 'version':
+            res = versions_graphe.creer_version(data.get('evenements'), version_id=data.get('version'),
+                                                matrix=matrix, labels=labels or None)
+            if "error" in res: return {'status': 'error', 'error': res['error']}
+            v = res['version']
+            resultat = {'type': 'Version de graphe', 'version': v.identifiant, 'parent': v.parent,
+                        'nb_arcs_modifies': len(v.delta)}
+            new_graph_data = {'highlight_edges': [(v.labels[a], v.labels[b]) for a, b in v.delta]}
+
+        # --- ACCESSIBILITÉ (fermeture transitive des CFC, réponses en O(1)) ---
+        elif algo == 'accessibilite':
+            idx = accessibilite.index_accessibilite(matrix=matrix, labels=labels or None)
+            paires = data.get('paires')
+            if paires:
+                if not isinstance(paires, list) or not all(isinstance(p, list) and len(p) == 2 for p in paires):
+                    return {'status': 'error', 'error': 'Les paires doivent être une liste de [départ, arrivée].'}
+                res = idx.accessibles(paires)
+                if "error" in res: return {'status': 'error', 'error': res['error']}
+                resultat = {'type': 'Accessibilité',
+                            'paires': [{'depart': a, 'arrivee': b, 'accessible': ok}
+                                       for (a, b), ok in zip(paires, res['accessibles'])]}
+            elif depart and arrivee:
+                res = idx.accessibles([[depart, arrivee]])
+                if "error" in res: return {'status': 'error', 'error': res['error']}
+                resultat = {'type': 'Accessibilité', 'depart': depart, 'arrivee': arrivee,
+                            'accessible': res['accessibles'][0]}
+            elif depart:
+                res = idx.accessibles_depuis(depart)
+                if "error" in res: return {'status': 'error', 'error': res['error']}
+                path_nodes = res['villes']
+                resultat = {'type': 'Accessibilité', 'depart': depart, 'villes_accessibles': res['villes']}
+            else:
+                return {'status': 'error', 'error': 'Précisez le départ ou les paires.'}
+            resultat['nb_composantes'] = idx.nb_composantes
+
         # --- FLOYD-WARSHALL ---
         elif algo == 'floyd':
-            dist_matrix = Floyd_Warshall.floyd_warshall(matrix=matrix, labels=labels)
-            min_sum, central_node = float('inf'), None
-            for i, row in enumerate(dist_matrix):
-                s = sum(d for d in row if d != float('inf'))
-                if 0 < s < min_sum:
-                    min_sum, central_node = s, labels[i]
-            
+            matrix, labels = resoudre_graphe(matrix, labels or None)
+            precision = data.get('precision') or 'float64'
+            if precision not in Floyd_Warshall.PRECISIONS:
+                return {'status': 'error', 'error': f"Précision inconnue : {precision}"}
+            dtype = Floyd_Warshall.PRECISIONS[precision]
+
+            if data.get('stockage') == 'disque':
+                # Matrice écrite sur disque (projetée en mémoire), renvoyée par pages
+                matrice_id = f"{empreinte_graphe(matrix, labels)}_{precision}"
+                fichier = _fichier_matrice(matrice_id)
+                taille_page = lire_entier(data, 'taille_page', TAILLE_PAGE_MATRICE, 1, TAILLE_PAGE_MATRICE_MAX)
+                if taille_page is None:
+                    return {'status': 'error', 'error': 'taille_page doit être un entier.'}
+                if not os.path.exists(fichier):
+                    octets = len(labels) ** 2 * np.dtype(dtype).itemsize
+                    octets_max = getattr(settings, 'GRAPHE_MATRICES_OCTETS_MAX', MATRICES_OCTETS_MAX)
+                    if octets > octets_max:
+                        return {'status': 'error',
+                                'error': f"Matrice trop grande pour le stockage disque ({octets} octets, "
+                                         f"budget {octets_max}) : réduisez la précision."}
+                    try:
+                        _stocker_matrice(fichier, matrix, labels, dtype)
+                    except ValueError as e:   # Poids non entiers en précision entière
+                        return {'status': 'error', 'error': str(e)}
+                    _evincer_matrices(garder=fichier)
+                dist_matrix = _ouvrir_matrice_stockee(fichier)
+                central_node = Floyd_Warshall.noeud_central(dist_matrix, labels)
+                col_fin = min(len(labels), max(1, CELLULES_PAGE_MATRICE_MAX // taille_page))
+                resultat = {'type': 'Floyd-Warshall', 'matrice_id': matrice_id, 'n': len(labels),
+                            'debut': 0, 'colonnes': list(labels[:col_fin]),
+                            'matrice_distances': Floyd_Warshall.lignes_lisibles(dist_matrix[:taille_page, :col_fin]),
+                            'noeud_central': central_node}
+            else:
+                try:
+                    dist_matrix = Floyd_Warshall.floyd_warshall_blocs(matrix=matrix, labels=labels, dtype=dtype)
+                except ValueError as e:   # Poids non entiers en précision entière
+                    return {'status': 'error', 'error': str(e)}
+                central_node = Floyd_Warshall.noeud_central(dist_matrix, labels)
+                readable = Floyd_Warshall.lignes_lisibles(dist_matrix)
+                resultat = {'type': 'Floyd-Warshall', 'matrice_distances': readable, 'noeud_central': central_node}
+
             if central_node: path_nodes = [central_node]
-            readable = [[("∞" if x == float('inf') else x) for x in row] for row in dist_matrix]
-            resultat = {'type': 'Floyd-Warshall', 'matrice_distances': readable, 'noeud_central': central_node}
+
+        # --- TOUTES LES PAIRES PAR DIJKSTRA (graphes creux, poids positifs) ---
+        elif algo == 'dijkstra_tous_couples':
+            matrix, labels = resoudre_graphe(matrix, labels or None)
+            dist_matrix = dijkstra.dijkstra_tous_couples(matrix=matrix, labels=labels)
+            central_node = Floyd_Warshall.noeud_central(dist_matrix, labels)
+            if central_node: path_nodes = [central_node]
+            resultat = {'type': 'Dijkstra (toutes les paires)',
+                        'matrice_distances': Floyd_Warshall.lignes_lisibles(dist_matrix),
+                        'noeud_central': central_node}
+
+        # --- CENTRALITÉ DE PROXIMITÉ (nœud central sans matrice complète) ---
+        elif algo == 'centralite':
+            if data.get('approx'):
+                echantillon = None
+                if data.get('echantillon') not in (None, ''):
+                    n = len(resoudre_graphe(matrix, labels or None)[1])
+                    echantillon = lire_entier(data, 'echantillon', None, 1, max(n, 1))
+                    if echantillon is None:
+                        return {'status': 'error', 'error': 'echantillon doit être un entier.'}
+                res = centralite.centralite_proximite_approchee(
+                    matrix=matrix, labels=labels or None, echantillon=echantillon, graine=data.get('graine'))
+                resultat = {'type': 'Centralité de proximité (approchée)', 'echantillon': res['echantillon'],
+                            'epsilon': res['epsilon'], 'erreur_max': res['erreur_max']}
+            else:
+                res = centralite.centralite_proximite(matrix=matrix, labels=labels or None)
+                resultat = {'type': 'Centralité de proximité'}
+            resultat.update({'noeud_central': res['noeud_central'], 'eloignement': res['eloignement'],
+                             'proximite': res['proximite']})
+            if res['noeud_central']: path_nodes = [res['noeud_central']]
+
+        # --- CENTRALITÉ D'INTERMÉDIARITÉ (Brandes : goulots d'étranglement) ---
+        elif algo == 'intermediarite':
+            echantillon = None
+            if data.get('echantillon') not in (None, ''):
+                n = len(resoudre_graphe(matrix, labels or None)[1])
+                echantillon = lire_entier(data, 'echantillon', None, 1, max(n, 1))
+                if echantillon is None:
+                    return {'status': 'error', 'error': 'echantillon doit être un entier.'}
+            res = centralite.centralite_intermediarite(matrix=matrix, labels=labels or None,
+                                                       echantillon=echantillon, graine=data.get('graine'))
+            goulots = sorted(res['noeuds'], key=lambda v: -res['noeuds'][v])[:3]
+            aretes_goulots = [(a['de'], a['vers']) for a in res['aretes'][:5]]
+            path_nodes = goulots
+            resultat = {'type': "Centralité d'intermédiarité (Brandes)", 'noeuds': res['noeuds'],
+                        'aretes': [{'arete': f"{a['de']}-{a['vers']}", 'score': a['score']} for a in res['aretes']],
+                        'echantillon': res['echantillon']}
+            new_graph_data = {'highlight_edges': aretes_goulots}  # Delta : le client a déjà le graphe
+
+        # --- PAGE D'UNE MATRICE FLOYD-WARSHALL STOCKÉE SUR DISQUE ---
+        elif algo == 'floyd_page':
+            matrice_id = data.get('matrice_id') or ''
+            valide = isinstance(matrice_id, str) and MATRICE_ID_VALIDE.match(matrice_id)
+            fichier = _fichier_matrice(matrice_id) if valide else None
+            if not fichier or not os.path.exists(fichier):
+                return {'status': 'error', 'error': f"Matrice inconnue : {matrice_id}"}
+            try:
+                dist_matrix = _ouvrir_matrice_stockee(fichier)
+                with open(fichier + '.labels.json', encoding='utf-8') as f:
+                    mat_labels = json.load(f)
+            except FileNotFoundError:   # Évincée entre-temps
+                return {'status': 'error', 'error': f"Matrice inconnue : {matrice_id}"}
+            # Bornes ramenées dans la matrice, une page d'au plus TAILLE_PAGE_MATRICE_MAX
+            # lignes et CELLULES_PAGE_MATRICE_MAX cases
+            n = len(mat_labels)
+            debut = lire_entier(data, 'debut', 0, 0, n)
+            col_debut = lire_entier(data, 'col_debut', 0, 0, n)
+            if debut is None or col_debut is None:
+                return {'status': 'error', 'error': 'Bornes de page invalides : entiers attendus.'}
+            fin = lire_entier(data, 'fin', debut + TAILLE_PAGE_MATRICE, debut, min(n, debut + TAILLE_PAGE_MATRICE_MAX))
+            if fin is None:
+                return {'status': 'error', 'error': 'Bornes de page invalides : entiers attendus.'}
+            col_fin = lire_entier(data, 'col_fin', n, col_debut,
+                                  min(n, col_debut + max(1, CELLULES_PAGE_MATRICE_MAX // max(1, fin - debut))))
+            if col_fin is None:
+                return {'status': 'error', 'error': 'Bornes de page invalides : entiers attendus.'}
+            resultat = {'type': 'Floyd-Warshall (page)', 'matrice_id': matrice_id, 'debut': debut,
+                        'lignes': mat_labels[debut:fin], 'colonnes': mat_labels[col_debut:col_fin],
+                        'matrice_distances': Floyd_Warshall.lignes_lisibles(dist_matrix[debut:fin, col_debut:col_fin])}
 
         # --- BFS ---
         elif algo == 'bfs':
-            if not depart: return JsonResponse({'status': 'error', 'error': 'Précisez le départ.'})
+            if not depart: return {'status': 'error', 'error': 'Précisez le départ.'}
             res = bfs_dfs.bfs(depart, matrix=matrix, labels=labels)
-            if "error" in res: return JsonResponse({'status': 'error', 'error': res['error']})
+            if "error" in res: return {'status': 'error', 'error': res['error']}
             path_nodes = res['parcours']
             resultat = {'type': 'BFS', 'ordre_visite': res['parcours'], 'aretes_arbre': [f"{u}→{v}" for u,v in res['edges']]}
-            new_graph_data = {'matrix': matrix or Matrice.M.tolist(), 'labels': labels or Matrice.villes, 'highlight_edges': res['edges']}
+            new_graph_data = {'highlight_edges': res['edges']}  # Delta : le client a déjà le graphe
+
+        # --- BFS MULTI-SOURCES (distances en nombre d'arcs, bit-parallèle) ---
+        elif algo == 'bfs_multi':
+            matrix, labels = resoudre_graphe(matrix, labels or None)
+            sources = data.get('sources') or depart
+            if isinstance(sources, str):
+                sources = [s.strip() for s in sources.split(',') if s.strip()]
+            sources = sources or labels  # Toutes les villes par défaut
+            res = bfs_dfs.bfs_multi(sources, matrix=matrix, labels=labels)
+            if "error" in res: return {'status': 'error', 'error': res['error']}
+            path_nodes = res['sources']
+            resultat = {'type': 'BFS multi-sources', 'sources': res['sources'], 'colonnes': labels,
+                        'sauts': [[(d if d >= 0 else "∞") for d in ligne] for ligne in res['distances'].tolist()]}
 
         # --- DFS ---
         elif algo == 'dfs':
-            if not depart: return JsonResponse({'status': 'error', 'error': 'Précisez le départ.'})
+            if not depart: return {'status': 'error', 'error': 'Précisez le départ.'}
             res = bfs_dfs.dfs(depart, matrix=matrix, labels=labels)
-            if "error" in res: return JsonResponse({'status': 'error', 'error': res['error']})
+            if "error" in res: return {'status': 'error', 'error': res['error']}
             path_nodes = res['parcours']
             resultat = {'type': 'DFS', 'ordre_visite': res['parcours'], 'aretes_arbre': [f"{u}→{v}" for u,v in res['edges']]}
-            new_graph_data = {'matrix': matrix or Matrice.M.tolist(), 'labels': labels or Matrice.villes, 'highlight_edges': res['edges']}
+            new_graph_data = {'highlight_edges': res['edges']}  # Delta : le client a déjà le graphe
 
         # --- PRIM ---
         elif algo == 'prim':
-            if not depart: return JsonResponse({'status': 'error', 'error': 'Précisez le départ.'})
+            if not depart: return {'status': 'error', 'error': 'Précisez le départ.'}
             res = prim_kruskal.prim(depart, matrix=matrix, labels=labels)
-            if "error" in res: return JsonResponse({'status': 'error', 'error': res['error']})
+            if "error" in res: return {'status': 'error', 'error': res['error']}
             noeuds = set([depart])
             for u, v in res['edges']: noeuds.add(u); noeuds.add(v)
             path_nodes = list(noeuds)
             resultat = {'type': 'Prim', 'poids_total': res['weight'], 'aretes': [f"{u}-{v}" for u,v in res['edges']]}
-            new_graph_data = {'matrix': matrix or Matrice.M.tolist(), 'labels': labels or Matrice.villes, 'highlight_edges': res['edges']}
+            new_graph_data = {'highlight_edges': res['edges']}  # Delta : le client a déjà le graphe
 
         # --- KRUSKAL ---
         elif algo == 'kruskal':
@@ -139,7 +688,19 @@ def calculer(request):
             for u, v in res['edges']: noeuds.add(u); noeuds.add(v)
             path_nodes = list(noeuds)
             resultat = {'type': 'Kruskal', 'poids_total': res['weight'], 'aretes': [f"{u}-{v}" for u,v in res['edges']]}
-            new_graph_data = {'matrix': matrix or Matrice.M.tolist(), 'labels': labels or Matrice.villes, 'highlight_edges': res['edges']}
+            new_graph_data = {'highlight_edges': res['edges']}  # Delta : le client a déjà le graphe
+
+        # --- ARBRE COUVRANT DYNAMIQUE (maintenu sous mises à jour) ---
+        elif algo == 'mst_dynamique':
+            res = arbre_couvrant_dynamique.arbre_couvrant_dynamique(
+                matrix=matrix, labels=labels or None,
+                evenements=data.get('evenements'), arbre_id=data.get('arbre_id'))
+            if "error" in res: return {'status': 'error', 'error': res['error']}
+            noeuds = set()
+            for u, v in res['edges']: noeuds.add(u); noeuds.add(v)
+            path_nodes = list(noeuds)
+            resultat = {'type': 'Arbre couvrant dynamique', 'arbre_id': res['arbre_id'],
+                        'poids_total': res['weight'], 'aretes': [f"{u}-{v}" for u,v in res['edges']]}
 
         # --- PERT ---
         elif algo == 'pert':
@@ -147,7 +708,7 @@ def calculer(request):
             taches_input = json.loads(custom_tasks) if custom_tasks else None
             
             res_pert = MethodePert.calcul_pert(taches_input)
-            if 'erreur' in res_pert: return JsonResponse({'status': 'error', 'error': res_pert['erreur']})
+            if 'erreur' in res_pert: return {'status': 'error', 'error': res_pert['erreur']}
             
             path_nodes = res_pert['chemin_critique']
             resultat = res_pert
@@ -155,24 +716,20 @@ def calculer(request):
             # CORRECTION ICI : On envoie le chemin critique tel quel (Liste) au lieu de stringifier
             # Le frontend gérera l'affichage.
 
-            # Construction graphe PERT
+            # Construction graphe PERT : liste d'arcs (prédécesseur, tâche, durée du prédécesseur)
             taches = taches_input if taches_input else MethodePert.default_taches
             pert_lbls = list(taches.keys())
-            sz = len(pert_lbls)
-            p_mat = [[0]*sz for _ in range(sz)]
-            for idx, t in enumerate(pert_lbls):
-                for p in taches[t].get('predecesseurs', []):
-                    if p in pert_lbls:
-                        p_idx = pert_lbls.index(p)
-                        p_mat[p_idx][idx] = taches[p]['duree']
-            new_graph_data = {'matrix': p_mat, 'labels': pert_lbls}
-
-        return JsonResponse(clean_data({
+            taches_connues = set(pert_lbls)
+            aretes = [[p, t, taches[p]['duree']]
+                      for t in pert_lbls for p in taches[t].get('predecesseurs', []) if p in taches_connues]
+            new_graph_data = {'labels': pert_lbls, 'edges': aretes}
+
+        return clean_data({
             'status': 'success',
             'result': resultat,
             'path': path_nodes,
             'new_graph': new_graph_data
-        }))
+        })
 
     except Exception as e:
-        return JsonResponse({'status': 'error', 'error': f"Erreur serveur : {str(e)}", 'trace': traceback.format_exc()})
\ No newline at end of file
+        return {'status': 'error', 'error': f"Erreur serveur : {str(e)}", 'trace': traceback.format_exc()}
\ No newline at end of file
@@ -6,4 +6,6 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('', views.index, name='index'),               # Page d'accueil
     path('api/calculer/', views.calculer, name='calculer'), # Notre lien "caché" pour les calculs
+    path('api/resultat/<str:cle>/', views.resultat, name='resultat'),  # Résultat relisible en GET (ETag)
+    path('api/parcours/', views.parcours, name='parcours'),  # Parcours BFS/DFS diffusé en NDJSON (curseurs)
 ]
\ No newline at end of file